@@ -0,0 +1,276 @@
+"""Per-API health scoreboard and per-appid availability memory for manifest APIs."""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, List
+
+from config import (
+    API_HEALTH_FILE,
+    API_HEALTH_HALF_LIFE_SECONDS,
+    API_HEALTH_SAVE_INTERVAL_SECONDS,
+    API_MISS_CACHE_FILE,
+    API_MISS_TTL_SECONDS,
+)
+from logger import logger
+from paths import data_path
+from utils import read_json, write_json_atomic
+
+# Weight of the newest sample in the latency/throughput moving averages.
+_EWMA_ALPHA = 0.3
+# Latency assumed for an API that has never been measured.
+_DEFAULT_ATTEMPT_SECONDS = 1.0
+
+_HEALTH_LOCK = threading.Lock()
+_HEALTH: Dict[str, Dict[str, float]] | None = None
+_DIRTY = False
+_LAST_SAVE = 0.0
+
+# "<api name>|<appid>" -> [expires_at, api url template]
+_MISSES_LOCK = threading.Lock()
+_MISSES: Dict[str, List[Any]] | None = None
+_MISSES_DIRTY = False
+_MISSES_LAST_SAVE = 0.0
+
+
+def _health_path() -> str:
+    return data_path(API_HEALTH_FILE)
+
+
+def _load_locked() -> Dict[str, Dict[str, float]]:
+    global _HEALTH
+    if _HEALTH is None:
+        raw = read_json(_health_path())
+        apis = raw.get("apis") if isinstance(raw, dict) else None
+        _HEALTH = {}
+        if isinstance(apis, dict):
+            for name, entry in apis.items():
+                if isinstance(entry, dict):
+                    _HEALTH[str(name)] = {k: float(v) for k, v in entry.items() if isinstance(v, (int, float))}
+    return _HEALTH
+
+
+def _decay(entry: Dict[str, float], now: float) -> None:
+    """Age the outcome counters so old failures stop dominating the ranking."""
+    updated = entry.get("updated", now)
+    elapsed = max(0.0, now - updated)
+    if elapsed and API_HEALTH_HALF_LIFE_SECONDS > 0:
+        factor = 0.5 ** (elapsed / API_HEALTH_HALF_LIFE_SECONDS)
+        for key in ("attempts", "successes", "misses", "errors"):
+            entry[key] = entry.get(key, 0.0) * factor
+    entry["updated"] = now
+
+
+def _entry_locked(name: str, now: float) -> Dict[str, float]:
+    health = _load_locked()
+    entry = health.get(name)
+    if entry is None:
+        entry = {"attempts": 0.0, "successes": 0.0, "misses": 0.0, "errors": 0.0, "updated": now}
+        health[name] = entry
+    _decay(entry, now)
+    return entry
+
+
+def _ewma(entry: Dict[str, float], key: str, value: float) -> None:
+    previous = entry.get(key)
+    entry[key] = value if previous is None else previous + _EWMA_ALPHA * (value - previous)
+
+
+def _save_locked(force: bool = False) -> None:
+    global _DIRTY, _LAST_SAVE
+    if not _DIRTY or _HEALTH is None:
+        return
+    now = time.time()
+    if not force and now - _LAST_SAVE < API_HEALTH_SAVE_INTERVAL_SECONDS:
+        return
+    if write_json_atomic(_health_path(), {"version": 1, "apis": _HEALTH}):
+        _DIRTY = False
+        _LAST_SAVE = now
+    else:
+        logger.warn("LuaTools: Failed to persist API health scoreboard")
+
+
+def record_api_result(name: str, outcome: str, seconds: float) -> None:
+    """Record how a single API attempt ended.
+
+    ``outcome`` is ``"success"`` (answered with its success code),
+    ``"miss"`` (answered with its unavailable code), ``"slow"`` (abandoned
+    because another API answered first) or ``"error"`` (any other status,
+    timeout or connection failure). ``seconds`` is the time spent before the
+    answer arrived or the attempt was abandoned; for ``"slow"`` it is only a
+    lower bound, so it can raise the attempt cost but never lower it.
+    """
+    global _DIRTY
+    now = time.time()
+    with _HEALTH_LOCK:
+        entry = _entry_locked(name, now)
+        entry["attempts"] += 1.0
+        if outcome == "success":
+            entry["successes"] += 1.0
+            _ewma(entry, "ttfb", max(0.0, seconds))
+        elif outcome == "miss":
+            entry["misses"] += 1.0
+        elif outcome != "slow":
+            entry["errors"] += 1.0
+        if outcome == "slow":
+            entry["attemptSeconds"] = max(entry.get("attemptSeconds", _DEFAULT_ATTEMPT_SECONDS), seconds)
+        else:
+            _ewma(entry, "attemptSeconds", max(0.0, seconds))
+        _DIRTY = True
+        _save_locked()
+
+
+def record_api_throughput(name: str, num_bytes: int, seconds: float) -> None:
+    """Record the body throughput (bytes/second) of a completed download."""
+    global _DIRTY
+    if num_bytes <= 0 or seconds <= 0:
+        return
+    now = time.time()
+    with _HEALTH_LOCK:
+        entry = _entry_locked(name, now)
+        _ewma(entry, "throughput", num_bytes / seconds)
+        _DIRTY = True
+        _save_locked()
+
+
+def flush_api_health() -> None:
+    """Persist pending scoreboard and miss-cache updates immediately."""
+    with _HEALTH_LOCK:
+        _save_locked(force=True)
+    with _MISSES_LOCK:
+        _save_misses_locked(force=True)
+
+
+def _miss_key(name: str, appid: int) -> str:
+    return f"{name}|{int(appid)}"
+
+
+def _load_misses_locked() -> Dict[str, List[Any]]:
+    global _MISSES
+    if _MISSES is None:
+        raw = read_json(data_path(API_MISS_CACHE_FILE))
+        entries = raw.get("misses") if isinstance(raw, dict) else None
+        now = time.time()
+        _MISSES = {}
+        if isinstance(entries, dict):
+            for key, value in entries.items():
+                try:
+                    expires, reason = float(value[0]), str(value[1])
+                except (TypeError, ValueError, IndexError, KeyError):
+                    continue
+                if expires > now:
+                    _MISSES[str(key)] = [expires, reason]
+    return _MISSES
+
+
+def _save_misses_locked(force: bool = False) -> None:
+    global _MISSES_DIRTY, _MISSES_LAST_SAVE
+    if not _MISSES_DIRTY or _MISSES is None:
+        return
+    now = time.time()
+    if not force and now - _MISSES_LAST_SAVE < API_HEALTH_SAVE_INTERVAL_SECONDS:
+        return
+    for key in [key for key, value in _MISSES.items() if value[0] <= now]:
+        del _MISSES[key]
+    if write_json_atomic(data_path(API_MISS_CACHE_FILE), {"version": 1, "misses": _MISSES}):
+        _MISSES_DIRTY = False
+        _MISSES_LAST_SAVE = now
+    else:
+        logger.warn("LuaTools: Failed to persist API miss cache")
+
+
+def is_known_miss(name: str, url_template: str, appid: int) -> bool:
+    """True if ``name`` recently answered "unavailable" for ``appid``.
+
+    Entries are tied to the API's URL template so changing an API key or
+    endpoint forgets what the old endpoint answered.
+    """
+    with _MISSES_LOCK:
+        entry = _load_misses_locked().get(_miss_key(name, appid))
+        return bool(entry) and entry[0] > time.time() and entry[1] == url_template
+
+
+def record_api_miss(name: str, url_template: str, appid: int) -> None:
+    """Remember that ``name`` does not have ``appid`` for API_MISS_TTL_SECONDS."""
+    global _MISSES_DIRTY
+    with _MISSES_LOCK:
+        _load_misses_locked()[_miss_key(name, appid)] = [time.time() + API_MISS_TTL_SECONDS, url_template]
+        _MISSES_DIRTY = True
+        _save_misses_locked()
+
+
+def forget_api_misses(appid: int, name: str = "") -> int:
+    """Drop remembered misses for ``appid`` (optionally only for one API)."""
+    global _MISSES_DIRTY
+    suffix = f"|{int(appid)}"
+    with _MISSES_LOCK:
+        misses = _load_misses_locked()
+        keys = [
+            key for key in misses
+            if key.endswith(suffix) and (not name or key == _miss_key(name, appid))
+        ]
+        for key in keys:
+            del misses[key]
+        if keys:
+            _MISSES_DIRTY = True
+            _save_misses_locked()
+        return len(keys)
+
+
+def _expected_seconds_to_success(entry: Dict[str, float] | None) -> float:
+    """Cost/probability rank: trying APIs in ascending order minimises the
+    expected time until one succeeds."""
+    if not entry:
+        return _DEFAULT_ATTEMPT_SECONDS / 0.5
+    # Beta(1, 1) prior keeps unknown and recovered APIs in contention.
+    p_success = (entry.get("successes", 0.0) + 1.0) / (entry.get("attempts", 0.0) + 2.0)
+    cost = entry.get("attemptSeconds", _DEFAULT_ATTEMPT_SECONDS)
+    return cost / p_success
+
+
+def rank_apis(apis: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """Return ``apis`` ordered by expected time to success (stable for ties)."""
+    now = time.time()
+    with _HEALTH_LOCK:
+        health = _load_locked()
+        scores = []
+        for api in apis:
+            entry = health.get(str(api.get("name", "")))
+            if entry is not None:
+                _decay(entry, now)
+            scores.append(_expected_seconds_to_success(entry))
+    order = sorted(range(len(apis)), key=lambda index: scores[index])
+    return [apis[index] for index in order]
+
+
+def get_api_health_snapshot() -> Dict[str, Dict[str, float]]:
+    """Return decayed per-API statistics with derived rates."""
+    now = time.time()
+    snapshot: Dict[str, Dict[str, float]] = {}
+    with _HEALTH_LOCK:
+        for name, entry in _load_locked().items():
+            _decay(entry, now)
+            attempts = entry.get("attempts", 0.0)
+            snapshot[name] = {
+                "attempts": round(attempts, 3),
+                "successRate": round(entry.get("successes", 0.0) / attempts, 3) if attempts else 0.0,
+                "missRate": round(entry.get("misses", 0.0) / attempts, 3) if attempts else 0.0,
+                "errorRate": round(entry.get("errors", 0.0) / attempts, 3) if attempts else 0.0,
+                "ttfbSeconds": round(entry.get("ttfb", 0.0), 3),
+                "throughputBytesPerSecond": round(entry.get("throughput", 0.0), 1),
+                "expectedSecondsToSuccess": round(_expected_seconds_to_success(entry), 3),
+            }
+    return snapshot
+
+
+__all__ = [
+    "flush_api_health",
+    "forget_api_misses",
+    "get_api_health_snapshot",
+    "is_known_miss",
+    "rank_apis",
+    "record_api_miss",
+    "record_api_result",
+    "record_api_throughput",
+]
@@ -4,7 +4,8 @@ from __future__ import annotations
 
 import json
 import os
-from typing import Any, Dict, List
+import threading
+from typing import Any, Dict, List, Optional, Tuple
 
 from config import (
     API_JSON_FILE,
@@ -12,8 +13,10 @@ from config import (
     API_MANIFEST_URL,
     HTTP_PROXY_TIMEOUT_SECONDS,
 )
-from http_client import ensure_http_client, get_http_client
+from api_health import rank_apis
+from http_client import get_http_client
 from logger import logger
+from remote_resources import RemoteResource
 from utils import (
     backend_path,
     count_apis,
@@ -25,6 +28,29 @@ from utils import (
 _APIS_INIT_DONE = False
 _INIT_APIS_LAST_MESSAGE = ""
 
+# (mtime_ns, size) of api.json -> enabled API entries parsed from it
+_MANIFEST_CACHE: Optional[Tuple[Tuple[int, int], List[Dict[str, Any]]]] = None
+_MANIFEST_LOCK = threading.Lock()
+
+
+def _validate_manifest(part_path: str) -> str:
+    normalized = normalize_manifest_text(read_text(part_path))
+    if not normalized:
+        raise ValueError("empty manifest")
+    return normalized
+
+
+# api.json also holds user-added APIs and keys, so it is only fetched when it
+# is missing or on an explicit FetchFreeApisNow, never in the background.
+API_MANIFEST_RESOURCE = RemoteResource(
+    "api-manifest",
+    [API_MANIFEST_URL, API_MANIFEST_PROXY_URL],
+    backend_path(API_JSON_FILE),
+    timeout=HTTP_PROXY_TIMEOUT_SECONDS,
+    validate=_validate_manifest,
+    on_change=write_text,  # store the normalized manifest
+)
+
 
 def init_apis(content_script_query: str = "") -> str:
     """Initialise the free API manifest if it has not been loaded yet."""
@@ -34,7 +60,6 @@ def init_apis(content_script_query: str = "") -> str:
         logger.log("InitApis: already completed this session, skipping")
         return json.dumps({"success": True, "message": _INIT_APIS_LAST_MESSAGE})
 
-    client = ensure_http_client("InitApis")
     api_json_path = backend_path(API_JSON_FILE)
     message = ""
 
@@ -42,42 +67,15 @@ def init_apis(content_script_query: str = "") -> str:
         logger.log(f"InitApis: Local file exists -> {api_json_path}; skipping remote fetch")
     else:
         logger.log(f"InitApis: Local file not found -> {api_json_path}")
-        manifest_text = ""
-        try:
-            # Try primary URL first
-            try:
-                logger.log(f"InitApis: Fetching manifest from {API_MANIFEST_URL}")
-                resp = client.get(API_MANIFEST_URL)
-                resp.raise_for_status()
-                manifest_text = resp.text
-                logger.log(
-                    f"InitApis: Fetched manifest, status={resp.status_code}, length={len(manifest_text)}"
-                )
-            except Exception as primary_err:
-                logger.warn(f"InitApis: Primary URL failed ({primary_err}), trying proxy...")
-                try:
-                    logger.log(f"InitApis: Fetching manifest from proxy {API_MANIFEST_PROXY_URL}")
-                    resp = client.get(API_MANIFEST_PROXY_URL, timeout=HTTP_PROXY_TIMEOUT_SECONDS)
-                    resp.raise_for_status()
-                    manifest_text = resp.text
-                    logger.log(
-                        f"InitApis: Fetched manifest from proxy, status={resp.status_code}, length={len(manifest_text)}"
-                    )
-                except Exception as proxy_err:
-                    logger.warn(f"InitApis: Proxy also failed: {proxy_err}")
-                    raise primary_err
-        except Exception as fetch_err:
-            logger.warn(f"InitApis: Failed to fetch free API manifest: {fetch_err}")
-
-        normalized = normalize_manifest_text(manifest_text) if manifest_text else ""
-        if normalized:
-            write_text(api_json_path, normalized)
-            count = count_apis(normalized)
+        # A recent failure is not retried here, so offline boots do not wait on it.
+        result = API_MANIFEST_RESOURCE.refresh()
+        if result == "updated":
+            count = count_apis(read_text(api_json_path))
             message = f"No API's Configured, Loaded {count} Free Ones :D"
             logger.log(f"InitApis: Wrote new api.json with {count} entries")
         else:
             message = "No API's Configured and failed to load free ones"
-            logger.warn("InitApis: Manifest empty, nothing written")
+            logger.warn(f"InitApis: Free API manifest not loaded ({result})")
 
     _APIS_INIT_DONE = True
     _INIT_APIS_LAST_MESSAGE = message
@@ -104,38 +102,14 @@ def store_last_message(message: str) -> None:
 
 def fetch_free_apis_now(content_script_query: str = "") -> str:
     """Force refresh of the free API manifest."""
-    client = ensure_http_client("LuaTools: FetchFreeApisNow")
     try:
         logger.log("LuaTools: FetchFreeApisNow invoked")
-        manifest_text = ""
+        result = API_MANIFEST_RESOURCE.refresh(force=True)
+        if result not in ("updated", "unchanged"):
+            error = API_MANIFEST_RESOURCE.stats().get("lastError") or result
+            return json.dumps({"success": False, "error": f"Failed to fetch manifest: {error}"})
 
-        try:
-            resp = client.get(API_MANIFEST_URL, follow_redirects=True)
-            resp.raise_for_status()
-            manifest_text = resp.text
-            logger.log("LuaTools: Fetched manifest from primary URL")
-        except Exception as primary_err:
-            logger.warn(f"LuaTools: Primary manifest URL failed ({primary_err}), trying proxy...")
-            try:
-                resp = client.get(
-                    API_MANIFEST_PROXY_URL,
-                    follow_redirects=True,
-                    timeout=HTTP_PROXY_TIMEOUT_SECONDS,
-                )
-                resp.raise_for_status()
-                manifest_text = resp.text
-                logger.log("LuaTools: Fetched manifest from proxy URL")
-            except Exception as proxy_err:
-                logger.warn(f"LuaTools: Proxy manifest URL also failed: {proxy_err}")
-                return json.dumps(
-                    {"success": False, "error": f"Both URLs failed: {primary_err}, {proxy_err}"}
-                )
-
-        normalized = normalize_manifest_text(manifest_text) if manifest_text else ""
-        if not normalized:
-            return json.dumps({"success": False, "error": "Empty manifest"})
-
-        write_text(backend_path(API_JSON_FILE), normalized)
+        normalized = normalize_manifest_text(read_text(backend_path(API_JSON_FILE)))
         try:
             data = json.loads(normalized)
             count = len([entry for entry in data.get("api_list", [])])
@@ -148,24 +122,45 @@ def fetch_free_apis_now(content_script_query: str = "") -> str:
         return json.dumps({"success": False, "error": str(exc)})
 
 
-def load_api_manifest() -> List[Dict[str, Any]]:
-    """Return the list of enabled APIs from api.json."""
+def _load_manifest_entries() -> List[Dict[str, Any]]:
+    """Parse api.json, reusing the previous result while the file is unchanged."""
+    global _MANIFEST_CACHE
     path = backend_path(API_JSON_FILE)
-    text = read_text(path)
-    normalized = normalize_manifest_text(text)
-    if normalized and normalized != text:
+    try:
+        stat = os.stat(path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+    except OSError:
+        signature = None
+
+    with _MANIFEST_LOCK:
+        if signature is not None and _MANIFEST_CACHE is not None and _MANIFEST_CACHE[0] == signature:
+            return _MANIFEST_CACHE[1]
+
+        text = read_text(path)
+        normalized = normalize_manifest_text(text)
+        if normalized and normalized != text:
+            try:
+                write_text(path, normalized)
+                logger.log("LuaTools: Normalized api.json to valid JSON")
+                stat = os.stat(path)
+                signature = (stat.st_mtime_ns, stat.st_size)
+            except Exception:
+                pass
+            text = normalized
+
         try:
-            write_text(path, normalized)
-            logger.log("LuaTools: Normalized api.json to valid JSON")
-        except Exception:
-            pass
-        text = normalized
+            data = json.loads(text or "{}")
+            apis = data.get("api_list", [])
+            enabled = [api for api in apis if api.get("enabled", False)]
+        except Exception as exc:
+            logger.error(f"LuaTools: Failed to parse api.json: {exc}")
+            return []
 
-    try:
-        data = json.loads(text or "{}")
-        apis = data.get("api_list", [])
-        return [api for api in apis if api.get("enabled", False)]
-    except Exception as exc:
-        logger.error(f"LuaTools: Failed to parse api.json: {exc}")
-        return []
+        if signature is not None:
+            _MANIFEST_CACHE = (signature, enabled)
+        return enabled
 
+
+def load_api_manifest() -> List[Dict[str, Any]]:
+    """Return the enabled APIs from api.json, fastest expected success first."""
+    return rank_apis([dict(api) for api in _load_manifest_entries()])
@@ -0,0 +1,425 @@
+"""Game-name search over the applist index and the games database.
+
+The search index is built in the background from ``applist.idx`` and
+``games.json`` and persisted to ``backend/data/search_index.bin`` so later
+boots only map it. It holds:
+
+* documents (one per app) ordered by games-DB membership, name length and
+  appid, so a lower document id is a better match among equals, plus an
+  appid-sorted view of them for numeric queries;
+* a sorted token list with posting lists, for exact and prefix matches;
+* a trigram inverted index, for typo-tolerant matches.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import re
+import struct
+import threading
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left
+from collections import Counter
+from heapq import merge
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from applist_index import ApplistIndex, source_signature
+from config import APPLIST_INDEX_FILE, GAMES_DB_FILE_NAME, SEARCH_INDEX_FILE
+from logger import logger
+from paths import data_path
+from remote_resources import get_resource
+from utils import ensure_temp_download_dir, parse_flag, read_json
+
+_MAGIC = b"LTSX"
+_VERSION = 1
+_BYTE_ORDER_MARK = 0x01020304
+# magic, version, byte-order mark, docs, tokens, trigrams, applist mtime/size, games DB mtime/size
+_HEADER = struct.Struct("=4sIIIIIqqqq")
+_SECTION = struct.Struct("=Q")
+_SECTIONS = 12
+_FLAG_GAMES_DB = 1
+
+_SPLIT_RE = re.compile(r"[\W_]+")
+# Dropped before NFKD, which would otherwise glue "TM" onto the preceding word
+_MARKS_RE = re.compile("[\u2122\u00ae\u00a9]")
+# Caps that keep a single query within a few milliseconds
+_MAX_PREFIX_TOKENS = 256
+_MAX_SCANNED_DOCS = 5000
+_MAX_TRIGRAM_POSTINGS = 40_000
+_DEFAULT_LIMIT = 20
+_MAX_LIMIT = 100
+
+SourceKey = Tuple[int, int, int, int]
+
+
+def normalize_name(text: str) -> str:
+    """Lowercase ``text``, strip accents and collapse punctuation into single spaces."""
+    text = str(text or "")
+    if not text.isascii():
+        text = _MARKS_RE.sub(" ", text)
+        text = "".join(ch for ch in unicodedata.normalize("NFKD", text) if not unicodedata.combining(ch))
+    return _SPLIT_RE.sub(" ", text.lower()).strip()
+
+
+def _trigrams(normalized: str) -> set:
+    padded = f" {normalized} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def _games_db_path() -> str:
+    """The games DB copy in use (downloaded, else bundled); '' if there is none."""
+    resource = get_resource("games-db")
+    if resource is None:
+        return os.path.join(ensure_temp_download_dir(), GAMES_DB_FILE_NAME)
+    return resource.path()
+
+
+def current_source_key() -> SourceKey:
+    """Signatures of the applist index and games DB the search index is built from."""
+    applist = source_signature(data_path(APPLIST_INDEX_FILE)) or (0, 0)
+    games = source_signature(_games_db_path()) or (0, 0)
+    return (*applist, *games)
+
+
+class SearchIndex:
+    """Read-only view over a file written by :func:`build_search_index`."""
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as handle:
+            self._mm = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            header = _HEADER.unpack_from(self._mm, 0)
+            magic, version, mark, docs, tokens, trigrams = header[:6]
+            if magic != _MAGIC or version != _VERSION or mark != _BYTE_ORDER_MARK:
+                raise ValueError("unsupported search index format")
+            self.source: SourceKey = tuple(header[6:])  # type: ignore[assignment]
+            view = memoryview(self._mm)
+            offset = _HEADER.size
+            sections = []
+            for _ in range(_SECTIONS):
+                (length,) = _SECTION.unpack_from(self._mm, offset)
+                offset += _SECTION.size
+                if offset + length > len(self._mm):
+                    raise ValueError("truncated search index")
+                sections.append(view[offset:offset + length])
+                offset += length
+        except Exception:
+            self._mm.close()
+            raise
+        (appids, flags, name_offsets, self._names, sorted_appids, appid_docs,
+         token_blob, token_offsets, token_postings,
+         trigram_blob, trigram_offsets, trigram_postings) = sections
+        self.count = docs
+        self._appids = appids.cast("I")
+        self._flags = flags
+        self._name_offsets = name_offsets.cast("I")
+        self._sorted_appids = sorted_appids.cast("I")
+        self._appid_docs = appid_docs.cast("I")
+        self._tokens = str(token_blob, "utf-8").split("\n") if tokens else []
+        self._token_offsets = token_offsets.cast("I")
+        self._token_postings = token_postings.cast("I")
+        trigram_keys = str(trigram_blob, "utf-8").split("\n") if trigrams else []
+        self._trigrams = {key: position for position, key in enumerate(trigram_keys)}
+        self._trigram_offsets = trigram_offsets.cast("I")
+        self._trigram_postings = trigram_postings.cast("I")
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _name(self, doc: int) -> str:
+        return str(self._names[self._name_offsets[doc]:self._name_offsets[doc + 1]], "utf-8", "replace")
+
+    def _token_postings_at(self, position: int) -> memoryview:
+        return self._token_postings[self._token_offsets[position]:self._token_offsets[position + 1]]
+
+    def _token_docs(self, token: str, prefix: bool) -> List[memoryview]:
+        """Posting lists of ``token`` (or of every token it prefixes)."""
+        position = bisect_left(self._tokens, token)
+        found: List[memoryview] = []
+        while position < len(self._tokens) and len(found) < _MAX_PREFIX_TOKENS:
+            candidate = self._tokens[position]
+            if candidate == token or (prefix and candidate.startswith(token)):
+                found.append(self._token_postings_at(position))
+            else:
+                break
+            position += 1
+            if not prefix:
+                break
+        return found
+
+    def _token_matches(self, tokens: List[str], wanted: int) -> List[int]:
+        """Docs (best first) with a name token matching every query token.
+
+        The last query token may be incomplete and matches as a prefix.
+        Docs are walked from the rarest query token's postings and the other
+        tokens are checked against the doc's own name.
+        """
+        postings = []
+        for i, token in enumerate(tokens):
+            lists = self._token_docs(token, prefix=i == len(tokens) - 1)
+            if not lists:
+                return []
+            postings.append((sum(len(docs) for docs in lists), i, lists))
+        postings.sort(key=lambda item: item[0])
+        _, driver_index, driver_lists = postings[0]
+        others = [(token, i == len(tokens) - 1) for i, token in enumerate(tokens) if i != driver_index]
+
+        docs = merge(*driver_lists) if len(driver_lists) > 1 else iter(driver_lists[0])
+        matches: List[int] = []
+        previous = -1
+        for scanned, doc in enumerate(docs):
+            if scanned >= _MAX_SCANNED_DOCS or len(matches) >= wanted:
+                break
+            if doc == previous:
+                continue
+            previous = doc
+            if others:
+                name_tokens = normalize_name(self._name(doc)).split()
+                if not all(
+                    any(part.startswith(token) if prefix else part == token for part in name_tokens)
+                    for token, prefix in others
+                ):
+                    continue
+            matches.append(doc)
+        return matches
+
+    def _fuzzy_matches(self, normalized: str, wanted: int) -> Dict[int, float]:
+        """Docs sharing trigrams with the query, scored by Dice similarity."""
+        grams = []
+        for gram in _trigrams(normalized):
+            position = self._trigrams.get(gram)
+            if position is not None:
+                start, end = self._trigram_offsets[position], self._trigram_offsets[position + 1]
+                grams.append((end - start, start, end))
+        if not grams:
+            return {}
+        grams.sort()
+        counts: Counter = Counter()
+        budget = _MAX_TRIGRAM_POSTINGS
+        used = 0
+        for size, start, end in grams:
+            if used and size > budget:
+                break
+            counts.update(self._trigram_postings[start:end])
+            budget -= size
+            used += 1
+        query_grams = len(_trigrams(normalized))
+        needed = max(1, (used + 1) // 2)
+        scored: Dict[int, float] = {}
+        for doc, shared in counts.most_common(wanted * 4):
+            if shared < needed:
+                break
+            name_grams = len(_trigrams(normalize_name(self._name(doc))))
+            scored[doc] = 2.0 * shared / (query_grams + name_grams)
+        return scored
+
+    def _doc_for_appid(self, appid: int) -> Optional[int]:
+        position = bisect_left(self._sorted_appids, appid)
+        if position < len(self._sorted_appids) and self._sorted_appids[position] == appid:
+            return self._appid_docs[position]
+        return None
+
+    def search(self, query: str, limit: int = _DEFAULT_LIMIT) -> List[Dict[str, Any]]:
+        """Ranked ``{"appid", "name", "inGamesDb", "score"}`` matches for ``query``."""
+        normalized = normalize_name(query)
+        if not normalized:
+            return []
+        limit = max(1, min(int(limit), _MAX_LIMIT))
+        scores: Dict[int, float] = {}
+        if normalized.isdigit():
+            doc = self._doc_for_appid(int(normalized)) if int(normalized) <= 0xFFFFFFFF else None
+            if doc is not None:
+                scores[doc] = 3.0
+        for doc in self._token_matches(normalized.split(), limit * 3):
+            name = normalize_name(self._name(doc))
+            bonus = 1.0 if name == normalized else 0.5 if name.startswith(normalized) else 0.0
+            scores[doc] = max(scores.get(doc, 0.0), 1.0 + bonus)
+        if len(scores) < limit and len(normalized) >= 3:
+            for doc, similarity in self._fuzzy_matches(normalized, limit).items():
+                if similarity > scores.get(doc, 0.0):
+                    scores[doc] = similarity
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+        return [
+            {
+                "appid": int(self._appids[doc]),
+                "name": self._name(doc),
+                "inGamesDb": bool(self._flags[doc] & _FLAG_GAMES_DB),
+                "score": round(score, 3),
+            }
+            for doc, score in ranked
+        ]
+
+
+def _write_section(handle, data) -> None:
+    payload = data.tobytes() if isinstance(data, array) else bytes(data)
+    handle.write(_SECTION.pack(len(payload)))
+    handle.write(payload)
+
+
+def _flatten_postings(postings: Dict[str, array]) -> Tuple[List[str], array, array]:
+    keys = sorted(postings)
+    offsets = array("I", [0])
+    flat = array("I")
+    for key in keys:
+        flat.extend(postings[key])
+        offsets.append(len(flat))
+    return keys, offsets, flat
+
+
+def build_search_index(entries: Iterable[Tuple[int, str, bool]], index_path: str, source: SourceKey) -> int:
+    """Write a search index for ``(appid, name, in_games_db)`` entries; returns the doc count."""
+    docs = sorted(
+        ((appid, name.strip(), in_games_db) for appid, name, in_games_db in entries if name and name.strip()),
+        key=lambda doc: (not doc[2], len(doc[1]), doc[0]),
+    )
+    appids = array("I")
+    flags = bytearray()
+    name_offsets = array("I", [0])
+    names = bytearray()
+    tokens: Dict[str, array] = {}
+    trigrams: Dict[str, array] = {}
+    for doc, (appid, name, in_games_db) in enumerate(docs):
+        appids.append(appid)
+        flags.append(_FLAG_GAMES_DB if in_games_db else 0)
+        names += name.encode("utf-8")
+        name_offsets.append(len(names))
+        normalized = normalize_name(name)
+        for token in set(normalized.split()):
+            postings = tokens.get(token)
+            if postings is None:
+                postings = tokens[token] = array("I")
+            postings.append(doc)
+        for gram in _trigrams(normalized) if normalized else ():
+            postings = trigrams.get(gram)
+            if postings is None:
+                postings = trigrams[gram] = array("I")
+            postings.append(doc)
+
+    appid_docs = array("I", sorted(range(len(appids)), key=appids.__getitem__))
+    sorted_appids = array("I", (appids[doc] for doc in appid_docs))
+    token_keys, token_offsets, token_postings = _flatten_postings(tokens)
+    del tokens
+    trigram_keys, trigram_offsets, trigram_postings = _flatten_postings(trigrams)
+    del trigrams
+
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as handle:
+            handle.write(_HEADER.pack(
+                _MAGIC, _VERSION, _BYTE_ORDER_MARK, len(appids), len(token_keys), len(trigram_keys), *source
+            ))
+            for section in (
+                appids, flags, name_offsets, names, sorted_appids, appid_docs,
+                "\n".join(token_keys).encode("utf-8"), token_offsets, token_postings,
+                "\n".join(trigram_keys).encode("utf-8"), trigram_offsets, trigram_postings,
+            ):
+                _write_section(handle, section)
+        os.replace(tmp_path, index_path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return len(appids)
+
+
+def _search_entries() -> Iterator[Tuple[int, str, bool]]:
+    """Apps from the games DB (flagged) followed by the rest of the applist."""
+    games = read_json(_games_db_path())
+    seen = set()
+    if isinstance(games, dict):
+        for appid, entry in games.items():
+            name = entry.get("name") if isinstance(entry, dict) else None
+            try:
+                appid = int(appid)
+            except (TypeError, ValueError):
+                continue
+            if isinstance(name, str) and name.strip() and 0 < appid <= 0xFFFFFFFF:
+                seen.add(appid)
+                yield appid, name, True
+    applist_path = data_path(APPLIST_INDEX_FILE)
+    if os.path.exists(applist_path):
+        for appid, name in ApplistIndex(applist_path).items():
+            if appid not in seen:
+                yield appid, name, False
+
+
+_INDEX_LOCK = threading.Lock()
+_INDEX: Optional[SearchIndex] = None
+_BUILD_THREAD: Optional[threading.Thread] = None
+
+
+def _build_worker(source: SourceKey) -> None:
+    global _INDEX
+    started = time.monotonic()
+    try:
+        index_path = data_path(SEARCH_INDEX_FILE)
+        count = build_search_index(_search_entries(), index_path, source)
+        index = SearchIndex(index_path)
+        with _INDEX_LOCK:
+            _INDEX = index
+        logger.log(f"LuaTools: Built search index with {count} apps in {time.monotonic() - started:.1f}s")
+    except Exception as exc:
+        logger.warn(f"LuaTools: Failed to build search index: {exc}")
+
+
+def ensure_search_index(wait: bool = False) -> Optional[SearchIndex]:
+    """Return the search index, (re)building it in the background when missing or stale.
+
+    A stale index keeps answering queries until the rebuilt one is swapped in.
+    With ``wait`` the call blocks until a pending build has finished.
+    """
+    global _INDEX, _BUILD_THREAD
+    source = current_source_key()
+    with _INDEX_LOCK:
+        index = _INDEX
+        if index is None:
+            try:
+                index = _INDEX = SearchIndex(data_path(SEARCH_INDEX_FILE))
+            except FileNotFoundError:
+                pass
+            except Exception as exc:
+                logger.warn(f"LuaTools: Discarding unreadable search index: {exc}")
+        if index is not None and index.source == source:
+            return index
+        thread = _BUILD_THREAD
+        if thread is None or not thread.is_alive():
+            thread = _BUILD_THREAD = threading.Thread(
+                target=_build_worker, args=(source,), daemon=True, name="LuaTools-search-index"
+            )
+            thread.start()
+    if wait:
+        thread.join()
+        with _INDEX_LOCK:
+            return _INDEX
+    return index
+
+
+def search_apps(query: str, limit: int = _DEFAULT_LIMIT, wait: bool = False) -> str:
+    """Search app names. ``ready`` is False while the first index is still being built."""
+    try:
+        limit = int(limit)
+    except (TypeError, ValueError):
+        limit = _DEFAULT_LIMIT
+    try:
+        started = time.perf_counter()
+        index = ensure_search_index(wait=parse_flag(wait))
+        results = index.search(query, limit) if index is not None else []
+        return json.dumps({
+            "success": True,
+            "ready": index is not None,
+            "results": results,
+            "ms": round((time.perf_counter() - started) * 1000, 2),
+        })
+    except Exception as exc:
+        logger.warn(f"LuaTools: Search failed for {query!r}: {exc}")
+        return json.dumps({"success": False, "error": str(exc)})
+
+
+__all__ = ["SearchIndex", "build_search_index", "ensure_search_index", "normalize_name", "search_apps"]
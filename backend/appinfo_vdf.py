@@ -0,0 +1,267 @@
+"""App names from Steam's local ``appcache/appinfo.vdf`` cache.
+
+``appinfo.vdf`` is a binary KeyValues file holding the PICS data of every
+app the client has seen. :func:`iter_appinfo` streams it one app at a time
+(v27, v28 and v29 layouts) and only decodes each app's ``common`` section.
+:class:`AppInfoCache` keeps the extracted names and type/parent data in two
+memory-mapped index files under ``backend/data`` that are rebuilt in the
+background whenever appinfo.vdf's mtime or size changes.
+"""
+
+from __future__ import annotations
+
+import os
+import struct
+import threading
+import time
+from dataclasses import dataclass
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from applist_index import ApplistIndex, build_applist_index, source_signature
+from config import APPINFO_META_FILE, APPINFO_NAMES_FILE
+from logger import logger
+from paths import data_path
+from steam_utils import detect_steam_install_path
+
+_MAGIC_V27 = 0x07564427
+_MAGIC_V28 = 0x07564428
+_MAGIC_V29 = 0x07564429
+# info_state, last_updated, pics_token, text sha1, change_number (+ binary sha1 from v28)
+_ENTRY_HEADER_V27 = 4 + 4 + 8 + 20 + 4
+_ENTRY_HEADER_V28 = _ENTRY_HEADER_V27 + 20
+
+# Binary KeyValues value types
+_KV_SECTION = 0x00
+_KV_STRING = 0x01
+_KV_INT32 = 0x02
+_KV_FLOAT32 = 0x03
+_KV_POINTER = 0x04
+_KV_WSTRING = 0x05
+_KV_COLOR = 0x06
+_KV_UINT64 = 0x07
+_KV_END = 0x08
+_KV_INT64 = 0x0A
+_KV_END_ALT = 0x0B
+_KV_FIXED_SIZES = {_KV_INT32: 4, _KV_FLOAT32: 4, _KV_POINTER: 4, _KV_COLOR: 4, _KV_UINT64: 8, _KV_INT64: 8}
+
+_UINT32 = struct.Struct("<I")
+_INT32 = struct.Struct("<i")
+_UINT64 = struct.Struct("<Q")
+# How often lookups re-check appinfo.vdf for changes
+_RECHECK_SECONDS = 30.0
+
+
+@dataclass
+class AppInfo:
+    appid: int
+    name: str = ""
+    type: str = ""
+    parent: int = 0
+
+
+def appinfo_path() -> str:
+    """Location of appinfo.vdf in the detected Steam installation ('' if unknown)."""
+    steam = detect_steam_install_path()
+    return os.path.join(steam, "appcache", "appinfo.vdf") if steam else ""
+
+
+class _KVReader:
+    """Cursor over one app's binary KeyValues blob."""
+
+    __slots__ = ("buf", "pos", "strings")
+
+    def __init__(self, buf: bytes, pos: int, strings: Optional[List[bytes]]) -> None:
+        self.buf = buf
+        self.pos = pos
+        self.strings = strings
+
+    def cstring(self) -> bytes:
+        end = self.buf.index(b"\0", self.pos)
+        value = self.buf[self.pos:end]
+        self.pos = end + 1
+        return value
+
+    def key(self) -> bytes:
+        if self.strings is None:
+            return self.cstring()
+        (index,) = _UINT32.unpack_from(self.buf, self.pos)
+        self.pos += 4
+        return self.strings[index] if index < len(self.strings) else b""
+
+    def skip_wstring(self) -> None:
+        while self.buf[self.pos:self.pos + 2] != b"\0\0":
+            if self.pos >= len(self.buf):
+                raise ValueError("unterminated wide string")
+            self.pos += 2
+        self.pos += 2
+
+
+def _read_common(reader: _KVReader, appid: int) -> AppInfo:
+    """Walk the blob until ``appinfo/common`` has been read and pick its fields."""
+    info = AppInfo(appid)
+    path: List[bytes] = []
+    buf = reader.buf
+    while reader.pos < len(buf):
+        kind = buf[reader.pos]
+        reader.pos += 1
+        if kind in (_KV_END, _KV_END_ALT):
+            if not path:
+                break
+            closed = path.pop()
+            if closed == b"common" and len(path) == 1:
+                break  # the rest of the app's data is not needed
+            continue
+        key = reader.key().lower()
+        if kind == _KV_SECTION:
+            path.append(key)
+            continue
+        in_common = len(path) == 2 and path[1] == b"common"
+        if kind == _KV_STRING:
+            value = reader.cstring()
+            if in_common:
+                if key == b"name":
+                    info.name = value.decode("utf-8", "replace").strip()
+                elif key == b"type":
+                    info.type = value.decode("utf-8", "replace").strip()
+                elif key == b"parent" and value.isdigit():
+                    info.parent = int(value)
+        elif kind in _KV_FIXED_SIZES:
+            if in_common and key == b"parent" and kind == _KV_INT32:
+                info.parent = max(0, _INT32.unpack_from(buf, reader.pos)[0])
+            reader.pos += _KV_FIXED_SIZES[kind]
+        elif kind == _KV_WSTRING:
+            reader.skip_wstring()
+        else:
+            raise ValueError(f"unknown KeyValues type 0x{kind:02x}")
+    return info
+
+
+def iter_appinfo(path: str) -> Iterator[AppInfo]:
+    """Yield the ``common`` name/type/parent of every app in ``appinfo.vdf``.
+
+    Entries are read one at a time, so memory use is bounded by the largest
+    single app (plus the v29 key string table).
+    """
+    with open(path, "rb") as handle:
+        header = handle.read(8)
+        if len(header) < 8:
+            raise ValueError("appinfo.vdf is truncated")
+        magic = _UINT32.unpack_from(header, 0)[0]
+        if magic not in (_MAGIC_V27, _MAGIC_V28, _MAGIC_V29):
+            raise ValueError(f"unsupported appinfo.vdf version 0x{magic:08x}")
+        strings: Optional[List[bytes]] = None
+        if magic == _MAGIC_V29:
+            (table_offset,) = _UINT64.unpack(handle.read(8))
+            entries_start = handle.tell()
+            handle.seek(table_offset)
+            (count,) = _UINT32.unpack(handle.read(4))
+            strings = [value.lower() for value in handle.read().split(b"\0")[:count]]
+            handle.seek(entries_start)
+        entry_header = _ENTRY_HEADER_V27 if magic == _MAGIC_V27 else _ENTRY_HEADER_V28
+
+        while True:
+            head = handle.read(8)
+            if len(head) < 4:
+                return
+            appid = _UINT32.unpack_from(head, 0)[0]
+            if appid == 0 or len(head) < 8:
+                return
+            size = _UINT32.unpack_from(head, 4)[0]
+            blob = handle.read(size)
+            if len(blob) < size:
+                raise ValueError(f"appinfo.vdf entry for {appid} is truncated")
+            try:
+                yield _read_common(_KVReader(blob, entry_header, strings), appid)
+            except (ValueError, IndexError, struct.error) as exc:
+                logger.warn(f"LuaTools: Skipping unreadable appinfo entry {appid}: {exc}")
+
+
+def build_appinfo_index(path: str, names_path: str, meta_path: str) -> int:
+    """Index ``path`` into a name index and a ``"type:parent"`` index; returns the app count."""
+    source = source_signature(path)
+    if source is None:
+        raise FileNotFoundError(path)
+    meta: List[Tuple[int, str]] = []
+
+    def _names() -> Iterator[Tuple[int, str]]:
+        for info in iter_appinfo(path):
+            if info.type or info.parent:
+                meta.append((info.appid, f"{info.type}:{info.parent}"))
+            if info.name:
+                yield info.appid, info.name
+
+    count = build_applist_index(_names(), names_path, source)
+    build_applist_index(meta, meta_path, source)
+    return count
+
+
+class AppInfoCache:
+    """Lazily built, self-refreshing lookups over appinfo.vdf."""
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._names: Optional[ApplistIndex] = None
+        self._meta: Optional[ApplistIndex] = None
+        self._checked = 0.0
+        self._thread: Optional[threading.Thread] = None
+
+    def _build(self, path: str) -> None:
+        started = time.monotonic()
+        try:
+            names_path, meta_path = data_path(APPINFO_NAMES_FILE), data_path(APPINFO_META_FILE)
+            count = build_appinfo_index(path, names_path, meta_path)
+            names, meta = ApplistIndex(names_path), ApplistIndex(meta_path)
+            with self._lock:
+                self._names, self._meta = names, meta
+            logger.log(f"LuaTools: Indexed {count} app names from appinfo.vdf in {time.monotonic() - started:.1f}s")
+        except Exception as exc:
+            logger.warn(f"LuaTools: Failed to index appinfo.vdf: {exc}")
+
+    def _current(self) -> Tuple[Optional[ApplistIndex], Optional[ApplistIndex]]:
+        """The mapped indexes, starting a rebuild if appinfo.vdf changed since they were built."""
+        now = time.monotonic()
+        with self._lock:
+            if now - self._checked < _RECHECK_SECONDS:
+                return self._names, self._meta
+            self._checked = now
+            path = appinfo_path()
+            source = source_signature(path) if path else None
+            if source is None or (self._names is not None and self._names.source == source):
+                return self._names, self._meta
+            if self._names is None:
+                try:
+                    names = ApplistIndex(data_path(APPINFO_NAMES_FILE))
+                    meta = ApplistIndex(data_path(APPINFO_META_FILE))
+                    if names.source == source and meta.source == source:
+                        self._names, self._meta = names, meta
+                        return names, meta
+                except Exception:
+                    pass
+            if self._thread is None or not self._thread.is_alive():
+                self._thread = threading.Thread(
+                    target=self._build, args=(path,), daemon=True, name="LuaTools-appinfo"
+                )
+                self._thread.start()
+            return self._names, self._meta
+
+    def name(self, appid: int) -> str:
+        """Name of ``appid`` from appinfo.vdf, or '' (also while the index is being built)."""
+        names, _ = self._current()
+        return names.get(appid) if names is not None else ""
+
+    def info(self, appid: int) -> Optional[Dict[str, object]]:
+        """``{"name", "type", "parent"}`` for ``appid``, or None if Steam doesn't know it."""
+        names, meta = self._current()
+        if names is None:
+            return None
+        name = names.get(appid)
+        kind, _, parent = (meta.get(appid) if meta is not None else "").partition(":")
+        if not name and not kind:
+            return None
+        return {"name": name, "type": kind, "parent": int(parent) if parent.isdigit() else 0}
+
+
+APPINFO_CACHE = AppInfoCache()
+
+
+__all__ = ["APPINFO_CACHE", "AppInfo", "AppInfoCache", "appinfo_path", "build_appinfo_index", "iter_appinfo"]
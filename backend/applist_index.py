@@ -0,0 +1,286 @@
+"""Compact, memory-mapped appid -> name index built from ``all-appids.json``.
+
+The index file holds a header, a sorted ``uint32`` appid array, a ``uint32``
+offsets array (one entry per app plus an end sentinel) and a UTF-8 blob with
+every name. Lookups bisect the mapped appid array and decode a single name,
+so the applist costs a few megabytes of page cache instead of a Python dict
+with hundreds of thousands of entries.
+"""
+
+from __future__ import annotations
+
+import json
+import mmap
+import os
+import struct
+from array import array
+from bisect import bisect_left
+from typing import Any, Iterable, Iterator, Optional, TextIO, Tuple
+
+from logger import logger
+
+_MAGIC = b"LTAI"
+_VERSION = 1
+_BYTE_ORDER_MARK = 0x01020304
+# magic, version, byte-order mark, entry count, source st_mtime_ns, source st_size
+_HEADER = struct.Struct("=4sIIIqq")
+_READ_CHUNK_SIZE = 256 * 1024
+_WHITESPACE = " \t\r\n"
+_DELIMITERS = _WHITESPACE + ",]"
+
+SourceSignature = Tuple[int, int]
+
+
+def source_signature(path: str) -> Optional[SourceSignature]:
+    """``(st_mtime_ns, st_size)`` of ``path``, or None if it does not exist."""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_mtime_ns, stat.st_size)
+
+
+class ApplistIndex:
+    """Read-only view over an index file written by :func:`build_applist_index`."""
+
+    def __init__(self, path: str) -> None:
+        with open(path, "rb") as handle:
+            self._mm = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            magic, version, mark, count, mtime_ns, size = _HEADER.unpack_from(self._mm, 0)
+            if magic != _MAGIC or version != _VERSION or mark != _BYTE_ORDER_MARK:
+                raise ValueError("unsupported applist index format")
+            appids_start = _HEADER.size
+            offsets_start = appids_start + 4 * count
+            names_start = offsets_start + 4 * (count + 1)
+            if len(self._mm) < names_start:
+                raise ValueError("truncated applist index")
+            view = memoryview(self._mm)
+            self._appids = view[appids_start:offsets_start].cast("I")
+            self._offsets = view[offsets_start:names_start].cast("I")
+            self._names = view[names_start:]
+            if len(self._names) < (self._offsets[count] if count else 0):
+                raise ValueError("truncated applist index")
+        except Exception:
+            self._mm.close()
+            raise
+        self.count = count
+        self.source = (mtime_ns, size)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def _name_at(self, position: int) -> str:
+        start = self._offsets[position]
+        end = self._offsets[position + 1]
+        return str(self._names[start:end], "utf-8", "replace")
+
+    def get(self, appid: int) -> str:
+        """Name of ``appid`` or an empty string."""
+        try:
+            appid = int(appid)
+        except (TypeError, ValueError):
+            return ""
+        if appid < 0 or appid > 0xFFFFFFFF:
+            return ""
+        position = bisect_left(self._appids, appid)
+        if position < self.count and self._appids[position] == appid:
+            return self._name_at(position)
+        return ""
+
+    def items(self) -> Iterator[Tuple[int, str]]:
+        """All ``(appid, name)`` pairs in appid order."""
+        for position in range(self.count):
+            yield self._appids[position], self._name_at(position)
+
+
+def build_applist_index(
+    entries: Iterable[Tuple[int, str]], index_path: str, source: SourceSignature
+) -> int:
+    """Write an index for ``entries`` to ``index_path`` and return its size.
+
+    Entries are accumulated in flat arrays rather than a dict, so building
+    costs little more than the index itself. When an appid appears more
+    than once the last name wins. The file is written next to
+    ``index_path`` and renamed into place, so open readers are never torn.
+    """
+    appids = array("I")
+    starts = array("I")
+    names = bytearray()
+    for appid, name in entries:
+        appids.append(appid)
+        starts.append(len(names))
+        names += name.encode("utf-8")
+    starts.append(len(names))
+
+    count = len(appids)
+    if all(appids[i] < appids[i + 1] for i in range(count - 1)):
+        # The published applist is already sorted: write the arrays as they are.
+        out_appids, out_offsets, out_names = appids, starts, names
+    else:
+        ordered = sorted(range(count), key=appids.__getitem__)
+        out_appids = array("I")
+        out_offsets = array("I", [0])
+        out_names = bytearray()
+        for i, position in enumerate(ordered):
+            # Stable sort: keep the last occurrence of duplicated appids.
+            if i + 1 < count and appids[ordered[i + 1]] == appids[position]:
+                continue
+            out_appids.append(appids[position])
+            out_names += names[starts[position]:starts[position + 1]]
+            out_offsets.append(len(out_names))
+        del appids, starts, names, ordered
+
+    os.makedirs(os.path.dirname(index_path), exist_ok=True)
+    tmp_path = f"{index_path}.{os.getpid()}.tmp"
+    try:
+        with open(tmp_path, "wb") as handle:
+            handle.write(_HEADER.pack(_MAGIC, _VERSION, _BYTE_ORDER_MARK, len(out_appids), *source))
+            out_appids.tofile(handle)
+            out_offsets.tofile(handle)
+            handle.write(out_names)
+        os.replace(tmp_path, index_path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    return len(out_appids)
+
+
+def iter_json_array(handle: TextIO, chunk_size: int = _READ_CHUNK_SIZE) -> Iterator[Any]:
+    """Yield the elements of the top-level JSON array in ``handle`` one at a time.
+
+    Only the element being decoded and one read chunk are held in memory, so
+    the cost does not grow with the length of the array.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ""
+    position = 0
+    eof = False
+    # "open": before '[', "first": after '[', "value": after ',', "next": after a value
+    state = "open"
+
+    def _fill() -> bool:
+        nonlocal buffer, position, eof
+        chunk = handle.read(chunk_size)
+        if not chunk:
+            eof = True
+            return False
+        buffer = buffer[position:] + chunk
+        position = 0
+        return True
+
+    while True:
+        while position < len(buffer) and buffer[position] in _WHITESPACE:
+            position += 1
+        if position >= len(buffer):
+            if not _fill():
+                raise ValueError("unexpected end of JSON array")
+            continue
+        char = buffer[position]
+        if state == "open":
+            if char != "[":
+                raise ValueError("expected a JSON array")
+            state = "first"
+            position += 1
+            continue
+        if state == "next":
+            if char == "]":
+                return
+            if char != ",":
+                raise ValueError(f"expected ',' or ']' in JSON array, got {char!r}")
+            state = "value"
+            position += 1
+            continue
+        if state == "first" and char == "]":
+            return
+        try:
+            value, end = decoder.raw_decode(buffer, position)
+        except json.JSONDecodeError:
+            if not _fill():
+                raise
+            continue
+        if not eof and (end >= len(buffer) or buffer[end] not in _DELIMITERS) and _fill():
+            # A number may continue in the next chunk; decode it again.
+            continue
+        position = end
+        state = "next"
+        yield value
+
+
+def iter_applist_entries(source_path: str) -> Iterator[Tuple[int, str]]:
+    """``(appid, name)`` pairs from an applist JSON array of ``{"appid", "name"}``."""
+    with open(source_path, "r", encoding="utf-8") as handle:
+        for entry in iter_json_array(handle):
+            if not isinstance(entry, dict):
+                continue
+            appid = entry.get("appid")
+            name = entry.get("name")
+            if not appid or not isinstance(name, str) or not name.strip():
+                continue
+            try:
+                appid = int(appid)
+            except (TypeError, ValueError):
+                continue
+            if 0 < appid <= 0xFFFFFFFF:
+                yield appid, name.strip()
+
+
+def merge_applist_index(
+    index: ApplistIndex, changes: Iterable[Tuple[int, str]], index_path: str, source: SourceSignature
+) -> int:
+    """Write ``index`` with ``changes`` (new or renamed apps) applied to ``index_path``.
+
+    Apps missing from ``changes`` keep their current names. Both sides are
+    walked in appid order, so the result is written without re-sorting.
+    """
+    updates = sorted(dict(changes).items())
+
+    def _merged() -> Iterator[Tuple[int, str]]:
+        position = 0
+        for appid, name in index.items():
+            while position < len(updates) and updates[position][0] < appid:
+                yield updates[position]
+                position += 1
+            if position < len(updates) and updates[position][0] == appid:
+                yield updates[position]
+                position += 1
+            else:
+                yield appid, name
+        yield from updates[position:]
+
+    return build_applist_index(_merged(), index_path, source)
+
+
+def open_applist_index(source_path: str, index_path: str) -> Optional[ApplistIndex]:
+    """Map the index for ``source_path``, rebuilding it only if the source changed.
+
+    Returns None when there is no source file and no usable index.
+    """
+    source = source_signature(source_path)
+    if os.path.exists(index_path):
+        try:
+            index = ApplistIndex(index_path)
+            if source is None or index.source == source:
+                return index
+        except Exception as exc:
+            logger.warn(f"LuaTools: Discarding unreadable applist index: {exc}")
+    if source is None:
+        return None
+    logger.log("LuaTools: Building applist index...")
+    count = build_applist_index(iter_applist_entries(source_path), index_path, source)
+    logger.log(f"LuaTools: Built applist index with {count} app names")
+    return ApplistIndex(index_path)
+
+
+__all__ = [
+    "ApplistIndex",
+    "build_applist_index",
+    "iter_json_array",
+    "merge_applist_index",
+    "iter_applist_entries",
+    "open_applist_index",
+    "source_signature",
+]
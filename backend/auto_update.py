@@ -14,14 +14,17 @@ from typing import Any, Dict, Optional
 
 from api_manifest import store_last_message
 from config import (
+    HTTP_TIMEOUT_SECONDS,
     UPDATE_CHECK_INTERVAL_SECONDS,
     UPDATE_CONFIG_FILE,
+    UPDATE_MANIFEST_FILE,
     UPDATE_PENDING_INFO,
     UPDATE_PENDING_ZIP,
 )
 from http_client import ensure_http_client, get_http_client
 from logger import logger
-from paths import backend_path, get_plugin_dir
+from paths import backend_path, data_path, get_plugin_dir
+from remote_resources import RemoteResource
 from steam_utils import detect_steam_install_path
 from utils import (
     get_plugin_version,
@@ -65,6 +68,37 @@ def apply_pending_update_if_any() -> str:
         return ""
 
 
+def _validate_update_manifest(part_path: str) -> None:
+    with open(part_path, "r", encoding="utf-8") as handle:
+        if not isinstance(json.load(handle), dict):
+            raise ValueError("update manifest is not an object")
+
+
+# Release manifest (GitHub release or update.json's manifest_url), kept under
+# data/ so checks revalidate it with a conditional request
+UPDATE_MANIFEST_RESOURCE = RemoteResource(
+    "update-manifest",
+    [],
+    data_path(UPDATE_MANIFEST_FILE),
+    timeout=HTTP_TIMEOUT_SECONDS,
+    validate=_validate_update_manifest,
+)
+
+
+def _load_update_manifest() -> Dict[str, Any]:
+    """Revalidate the release manifest, falling back to the last copy fetched."""
+    result = UPDATE_MANIFEST_RESOURCE.refresh()
+    if result in ("failed", "backoff"):
+        stats = UPDATE_MANIFEST_RESOURCE.stats()
+        if stats.get("url") not in UPDATE_MANIFEST_RESOURCE.urls:
+            logger.warn(f"AutoUpdate: Manifest request failed ({stats.get('lastError') or result})")
+            return {}
+        logger.warn(f"AutoUpdate: Manifest request failed ({stats.get('lastError') or result}); using last fetched copy")
+    else:
+        logger.log(f"AutoUpdate: Manifest request successful ({result})")
+    return read_json(UPDATE_MANIFEST_RESOURCE.path()) if UPDATE_MANIFEST_RESOURCE.path() else {}
+
+
 def _fetch_github_latest(cfg: Dict[str, Any]) -> Dict[str, Any]:
     owner = str(cfg.get("owner", "")).strip()
     repo = str(cfg.get("repo", "")).strip()
@@ -77,7 +111,6 @@ def _fetch_github_latest(cfg: Dict[str, Any]) -> Dict[str, Any]:
         logger.warn("AutoUpdate: github config missing owner or repo")
         return {}
 
-    client = ensure_http_client("AutoUpdate: GitHub")
     endpoint = f"https://api.github.com/repos/{owner}/{repo}/releases/latest"
     if tag:
         endpoint = f"https://api.github.com/repos/{owner}/{repo}/releases/tags/{tag}"
@@ -89,23 +122,12 @@ def _fetch_github_latest(cfg: Dict[str, Any]) -> Dict[str, Any]:
     if token:
         headers["Authorization"] = f"Bearer {token}"
 
-    data: Optional[Dict[str, Any]] = None
-    tag_name = ""
-
-    # Primary GitHub API (Sem Proxy Fallback!)
-    try:
-        resp = client.get(endpoint, headers=headers, follow_redirects=True)
-        resp.raise_for_status()
-        data = resp.json()
-        tag_name = str(data.get("tag_name", "")).strip()
-        logger.log("AutoUpdate: GitHub API request successful")
-    except Exception as api_err:
-        # Se falhar, avisa no log e para por aqui. Sem baixar lixo do Windows!
-        logger.warn(f"AutoUpdate: GitHub API failed ({api_err}). No proxy fallback.")
-        return {}
-
+    # Primary GitHub API (Sem Proxy Fallback!); an unchanged release costs a 304
+    UPDATE_MANIFEST_RESOURCE.configure([endpoint], headers)
+    data = _load_update_manifest()
     if not data:
         return {}
+    tag_name = str(data.get("tag_name", "")).strip()
 
     version = tag_name or str(data.get("name", "")).strip()
     if tag_prefix and version.startswith(tag_prefix):
@@ -150,7 +172,6 @@ def _download_and_extract_update(zip_url: str, pending_zip: str) -> bool:
 def check_for_update_once() -> str:
     """Check remote manifest (if configured) and download a newer version.
     Returns a message for the user if an update was downloaded/applied."""
-    client = ensure_http_client("AutoUpdate")
     cfg_path = backend_path(UPDATE_CONFIG_FILE)
     cfg = read_json(cfg_path)
 
@@ -166,16 +187,13 @@ def check_for_update_once() -> str:
         manifest_url = str(cfg.get("manifest_url", "")).strip()
         if not manifest_url:
             return ""
-        try:
-            logger.log(f"AutoUpdate: Fetching manifest {manifest_url}")
-            resp = client.get(manifest_url, follow_redirects=True)
-            resp.raise_for_status()
-            manifest = resp.json()
-            latest_version = str(manifest.get("version", "")).strip()
-            zip_url = str(manifest.get("zip_url", "")).strip()
-        except Exception as exc:
-            logger.warn(f"AutoUpdate: Failed to fetch manifest: {exc}")
+        logger.log(f"AutoUpdate: Fetching manifest {manifest_url}")
+        UPDATE_MANIFEST_RESOURCE.configure([manifest_url])
+        manifest = _load_update_manifest()
+        if not manifest:
             return ""
+        latest_version = str(manifest.get("version", "")).strip()
+        zip_url = str(manifest.get("zip_url", "")).strip()
 
     if not latest_version or not zip_url:
         logger.warn("AutoUpdate: Manifest missing version or zip_url")
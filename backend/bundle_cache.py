@@ -0,0 +1,165 @@
+"""Content-addressed LRU cache of validated manifest bundles.
+
+Bundles that installed successfully are kept under ``backend/data/bundles``
+as ``<appid>-<sha256>.zip`` so re-adding a game does not download it again.
+The index records where each bundle came from and the server validators
+(ETag / Last-Modified) used to revalidate it once its TTL has passed.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import os
+import threading
+import time
+from typing import Any, BinaryIO, Dict, Optional
+
+from config import BUNDLE_CACHE_DIR, BUNDLE_CACHE_INDEX_FILE, BUNDLE_CACHE_MAX_BYTES, BUNDLE_CACHE_TTL_SECONDS
+from logger import logger
+from paths import data_path
+from utils import read_json, write_json_atomic
+
+_CACHE_LOCK = threading.Lock()
+# appid (str) -> {"file", "sha256", "size", "stored", "lastUsed", "api", "url", "etag", "lastModified"}
+_INDEX: Dict[str, Dict[str, Any]] | None = None
+
+
+def _cache_dir() -> str:
+    return data_path(BUNDLE_CACHE_DIR)
+
+
+def _load_index_locked() -> Dict[str, Dict[str, Any]]:
+    global _INDEX
+    if _INDEX is None:
+        raw = read_json(data_path(BUNDLE_CACHE_INDEX_FILE))
+        entries = raw.get("bundles") if isinstance(raw, dict) else None
+        _INDEX = {}
+        if isinstance(entries, dict):
+            for appid, entry in entries.items():
+                if isinstance(entry, dict) and entry.get("file"):
+                    if os.path.isfile(os.path.join(_cache_dir(), str(entry["file"]))):
+                        _INDEX[str(appid)] = entry
+    return _INDEX
+
+
+def _save_index_locked() -> None:
+    if _INDEX is None:
+        return
+    if not write_json_atomic(data_path(BUNDLE_CACHE_INDEX_FILE), {"version": 1, "bundles": _INDEX}):
+        logger.warn("LuaTools: Failed to persist bundle cache index")
+
+
+def _remove_file(filename: str) -> None:
+    try:
+        os.remove(os.path.join(_cache_dir(), filename))
+    except FileNotFoundError:
+        pass
+    except Exception as exc:
+        logger.warn(f"LuaTools: Failed to remove cached bundle {filename}: {exc}")
+
+
+def _evict_locked(index: Dict[str, Dict[str, Any]]) -> None:
+    """Drop least recently used bundles until the cache fits BUNDLE_CACHE_MAX_BYTES."""
+    total = sum(int(entry.get("size", 0)) for entry in index.values())
+    for appid in sorted(index, key=lambda key: float(index[key].get("lastUsed", 0))):
+        if total <= BUNDLE_CACHE_MAX_BYTES:
+            break
+        entry = index.pop(appid)
+        total -= int(entry.get("size", 0))
+        _remove_file(str(entry["file"]))
+        logger.log(f"LuaTools: Evicted cached bundle for appid={appid}")
+
+
+def lookup_bundle(appid: int) -> Optional[Dict[str, Any]]:
+    """Return the cache entry for ``appid`` with its ``path`` and ``fresh`` flag, or None.
+
+    ``fresh`` is False once the entry is older than BUNDLE_CACHE_TTL_SECONDS;
+    such entries should be revalidated with the server before use.
+    """
+    with _CACHE_LOCK:
+        entry = _load_index_locked().get(str(int(appid)))
+        if entry is None:
+            return None
+        result = dict(entry)
+    result["path"] = os.path.join(_cache_dir(), str(result["file"]))
+    result["fresh"] = time.time() - float(result.get("stored", 0)) < BUNDLE_CACHE_TTL_SECONDS
+    return result
+
+
+def touch_bundle(appid: int, revalidated: bool = False) -> None:
+    """Mark ``appid``'s bundle as recently used (and fresh again after a 304)."""
+    with _CACHE_LOCK:
+        entry = _load_index_locked().get(str(int(appid)))
+        if entry is None:
+            return
+        now = time.time()
+        entry["lastUsed"] = now
+        if revalidated:
+            entry["stored"] = now
+        _save_index_locked()
+
+
+def store_bundle(appid: int, bundle: BinaryIO, api: str, url: str, validator: Dict[str, str]) -> bool:
+    """Copy a validated bundle into the cache and record where it came from."""
+    if BUNDLE_CACHE_MAX_BYTES <= 0:
+        return False
+    appid = int(appid)
+    cache_dir = _cache_dir()
+    tmp_path = os.path.join(cache_dir, f".{appid}.{threading.get_ident()}.tmp")
+    digest = hashlib.sha256()
+    size = 0
+    try:
+        os.makedirs(cache_dir, exist_ok=True)
+        bundle.seek(0)
+        with open(tmp_path, "wb") as output:
+            for block in iter(lambda: bundle.read(1024 * 1024), b""):
+                digest.update(block)
+                output.write(block)
+                size += len(block)
+    except Exception as exc:
+        logger.warn(f"LuaTools: Failed to cache bundle for appid={appid}: {exc}")
+        try:
+            os.remove(tmp_path)
+        except Exception:
+            pass
+        return False
+    if size > BUNDLE_CACHE_MAX_BYTES:
+        os.remove(tmp_path)
+        return False
+
+    sha256 = digest.hexdigest()
+    filename = f"{appid}-{sha256[:32]}.zip"
+    now = time.time()
+    with _CACHE_LOCK:
+        index = _load_index_locked()
+        previous = index.get(str(appid))
+        os.replace(tmp_path, os.path.join(cache_dir, filename))
+        if previous and previous.get("file") != filename:
+            _remove_file(str(previous["file"]))
+        index[str(appid)] = {
+            "file": filename,
+            "sha256": sha256,
+            "size": size,
+            "stored": now,
+            "lastUsed": now,
+            "api": api,
+            "url": url,
+            **validator,
+        }
+        _evict_locked(index)
+        _save_index_locked()
+    return True
+
+
+def forget_bundle(appid: int) -> bool:
+    """Remove ``appid``'s bundle from the cache."""
+    with _CACHE_LOCK:
+        entry = _load_index_locked().pop(str(int(appid)), None)
+        if entry is None:
+            return False
+        _remove_file(str(entry["file"]))
+        _save_index_locked()
+        return True
+
+
+__all__ = ["forget_bundle", "lookup_bundle", "store_bundle", "touch_bundle"]
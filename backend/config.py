@@ -25,7 +25,108 @@ UPDATE_PENDING_INFO = "update_pending.json"
 HTTP_TIMEOUT_SECONDS = 15
 HTTP_PROXY_TIMEOUT_SECONDS = 15
 
+# Requests per second and burst size for third-party hosts, shared by all callers
+HOST_RATE_LIMITS = {
+    "store.steampowered.com": (3.0, 3),
+    "api.steamcmd.net": (5.0, 5),
+    "protondb.com": (5.0, 5),
+}
+RATE_LIMIT_DEFAULT_BACKOFF_SECONDS = 30  # after a 429 without Retry-After
+RATE_LIMIT_MAX_WAIT_SECONDS = 15  # fail fast instead of waiting longer for a slot
+
+# How manifest APIs are tried when adding a game:
+#   "sequential" - one at a time, in manifest order
+#   "hedged"     - start the next API if the current one has not answered
+#                  within API_HEDGE_DELAY_SECONDS
+#   "parallel"   - probe every enabled API at once
+API_RACE_MODE = "hedged"
+API_HEDGE_DELAY_SECONDS = 2.0
+API_DOWNLOAD_TIMEOUT_SECONDS = 30
+# Resume attempts (HTTP Range) on the same API after a dropped connection
+API_RESUME_ATTEMPTS = 3
+
+# Per-API success/latency scoreboard (stored under backend/data/)
+API_HEALTH_FILE = "api_health.json"
+API_HEALTH_HALF_LIFE_SECONDS = 6 * 60 * 60  # old outcomes weigh half after 6 hours
+API_HEALTH_SAVE_INTERVAL_SECONDS = 5
+
+# Remember "not available" answers per (API, appid) so retries skip them
+API_MISS_CACHE_FILE = "api_misses.json"
+API_MISS_TTL_SECONDS = 12 * 60 * 60
+
+# Concurrent add downloads (single adds and batches share the pipeline)
+ADD_MAX_CONCURRENCY = 4
+ADD_BATCH_HISTORY = 20
+# Add pipeline: downloads run ADD_MAX_CONCURRENCY wide, then launcher
+# (LAUNCHER_MAX_CONCURRENCY) and install stages behind queues of
+# ADD_STAGE_QUEUE_SIZE bundles
+ADD_INSTALL_WORKERS = 2
+ADD_STAGE_QUEUE_SIZE = 4
+
+# ACCELA / Bifrost launcher processes
+LAUNCHER_MAX_CONCURRENCY = 1
+LAUNCHER_TIMEOUT_SECONDS = 180
+LAUNCHER_KILL_GRACE_SECONDS = 5  # between SIGTERM and SIGKILL
+LAUNCHER_OUTPUT_TAIL_LINES = 20
+
+# Parallel writers when copying bundle manifests into Steam's depotcache
+DEPOTCACHE_WRITE_WORKERS = 4
+
+# Samples kept per add phase / API for the p50/p95/max timing stats
+PERF_STATS_WINDOW = 200
+
+# Downloaded bundles up to this size are processed in memory without temp files
+ADD_SPOOL_MAX_BYTES = 16 * 1024 * 1024
+
+# Installed bundles kept under backend/data/ for instant re-adds (LRU, size-capped)
+BUNDLE_CACHE_DIR = "bundles"
+BUNDLE_CACHE_INDEX_FILE = "bundle_cache.json"
+BUNDLE_CACHE_MAX_BYTES = 256 * 1024 * 1024
+BUNDLE_CACHE_TTL_SECONDS = 7 * 24 * 60 * 60  # revalidated with the API after a week
+
+# Binary applist name index under backend/data/, rebuilt when all-appids.json changes
+APPLIST_INDEX_FILE = "applist.idx"
+APPLIST_META_FILE = "applist_meta.json"  # ETag / Last-Modified of the last applist fetch
+APPLIST_REFRESH_INTERVAL_SECONDS = 24 * 60 * 60
+
+# Cached games database (temp_dl/) and the persisted name search index (data/)
+GAMES_DB_FILE_NAME = "games.json"
+GAMES_DB_REFRESH_INTERVAL_SECONDS = 6 * 60 * 60
+SEARCH_INDEX_FILE = "search_index.bin"
+
+# Name and type:parent indexes built from Steam's appcache/appinfo.vdf
+APPINFO_NAMES_FILE = "appinfo_names.idx"
+APPINFO_META_FILE = "appinfo_meta.idx"
+
+# Resolved app names, persisted under backend/data/ (LRU-bounded in memory)
+APP_NAME_STORE_FILE = "app_names.json"
+APP_NAME_CACHE_MAX_ENTRIES = 5000
+APP_NAME_TTL_SECONDS = 30 * 24 * 60 * 60
+APP_NAME_NEGATIVE_TTL_SECONDS = 60 * 60  # failed lookups are retried after an hour
+APP_NAME_FLUSH_SECONDS = 30
+
+# Store name lookups arriving within the window are sent as one appdetails request
+NAME_BATCH_WINDOW_SECONDS = 0.05
+NAME_BATCH_SIZE = 20
+
+# HEAD results for fix archives on files.luatools.work, persisted under backend/data/
+FIX_CACHE_FILE = "fix_cache.json"
+FIX_CACHE_TTL_SECONDS = 6 * 60 * 60  # fix found
+FIX_CACHE_NEGATIVE_TTL_SECONDS = 60 * 60  # 404: no fix for this app (yet)
+FIX_CACHE_MAX_ENTRIES = 20000
+FIX_CACHE_FLUSH_SECONDS = 10
+FIX_PROBE_TIMEOUT_SECONDS = 10
+FIX_SCAN_CONCURRENCY = 32  # HEAD requests in flight during a library scan
+FIX_SCAN_HISTORY = 8  # finished scans kept for status polling
+
+# Remote files (applist, games DB, api.json, update manifest) are read from
+# their local copy and revalidated in the background; failed fetches back off
+# exponentially between these bounds
+REMOTE_RETRY_BASE_SECONDS = 60
+REMOTE_RETRY_MAX_SECONDS = 6 * 60 * 60
+
 UPDATE_CHECK_INTERVAL_SECONDS = 2 * 60 * 60  # 2 hours
+UPDATE_MANIFEST_FILE = "update_manifest.json"  # last fetched release manifest (data/)
 
 USER_AGENT = "luatools-v61-stplugin-hoe"
 
@@ -0,0 +1,133 @@
+"""Extraction of depot manifests from bundles into Steam's depotcache."""
+
+from __future__ import annotations
+
+import os
+import shutil
+import threading
+import zipfile
+import zlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+
+from config import DEPOTCACHE_WRITE_WORKERS
+from logger import logger
+
+_COPY_CHUNK_SIZE = 1024 * 1024
+
+# path -> (st_mtime_ns, st_size, crc32) of depotcache files we wrote or checked
+_CRC_CACHE: Dict[str, Tuple[int, int, int]] = {}
+_CRC_LOCK = threading.Lock()
+
+
+def _file_crc32(path: str) -> int:
+    crc = 0
+    with open(path, "rb") as handle:
+        for block in iter(lambda: handle.read(_COPY_CHUNK_SIZE), b""):
+            crc = zlib.crc32(block, crc)
+    return crc & 0xFFFFFFFF
+
+
+def _remember_crc(path: str, crc: int) -> None:
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return
+    with _CRC_LOCK:
+        _CRC_CACHE[path] = (stat.st_mtime_ns, stat.st_size, crc)
+
+
+def _is_identical(path: str, info: zipfile.ZipInfo) -> bool:
+    """True if ``path`` already holds ``info``'s content (same size and CRC32).
+
+    The size check needs only a stat; the CRC is read from disk once and
+    then remembered against the file's mtime.
+    """
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return False
+    if stat.st_size != info.file_size:
+        return False
+    with _CRC_LOCK:
+        cached = _CRC_CACHE.get(path)
+    if cached is not None and cached[0] == stat.st_mtime_ns and cached[1] == stat.st_size:
+        return cached[2] == info.CRC
+    try:
+        crc = _file_crc32(path)
+    except OSError:
+        return False
+    with _CRC_LOCK:
+        _CRC_CACHE[path] = (stat.st_mtime_ns, stat.st_size, crc)
+    return crc == info.CRC
+
+
+def _write_member(archive: zipfile.ZipFile, info: zipfile.ZipInfo, out_path: str) -> None:
+    """Stream one member to ``out_path`` through a temp file and atomic rename."""
+    tmp_path = f"{out_path}.{threading.get_ident()}.tmp"
+    try:
+        with archive.open(info) as source, open(tmp_path, "wb") as target:
+            shutil.copyfileobj(source, target, _COPY_CHUNK_SIZE)
+        os.replace(tmp_path, out_path)
+    except Exception:
+        try:
+            os.remove(tmp_path)
+        except OSError:
+            pass
+        raise
+    _remember_crc(out_path, info.CRC)
+
+
+def extract_manifests(
+    archive: zipfile.ZipFile,
+    depotcache_dir: str,
+    should_stop: Optional[Callable[[], bool]] = None,
+) -> Dict[str, int]:
+    """Copy every ``.manifest`` in ``archive`` into ``depotcache_dir``.
+
+    Members whose size and CRC32 match the file already in depotcache are
+    skipped; the rest are streamed to disk, several at a time. Returns
+    counts of ``written``, ``skipped`` and ``failed`` members.
+    """
+    os.makedirs(depotcache_dir, exist_ok=True)
+    pending: List[Tuple[zipfile.ZipInfo, str]] = []
+    skipped = 0
+    for info in archive.infolist():
+        if info.is_dir() or not info.filename.lower().endswith(".manifest"):
+            continue
+        out_path = os.path.join(depotcache_dir, os.path.basename(info.filename))
+        if _is_identical(out_path, info):
+            skipped += 1
+            continue
+        pending.append((info, out_path))
+
+    def _extract(item: Tuple[zipfile.ZipInfo, str]) -> Optional[bool]:
+        info, out_path = item
+        if should_stop is not None and should_stop():
+            return None
+        try:
+            _write_member(archive, info, out_path)
+            logger.log(f"LuaTools: Extracted manifest -> {out_path}")
+            return True
+        except Exception as manifest_exc:
+            logger.warn(f"LuaTools: Failed to extract manifest {info.filename}: {manifest_exc}")
+            return False
+
+    workers = max(1, min(int(DEPOTCACHE_WRITE_WORKERS), len(pending)))
+    if workers > 1:
+        # ZipFile serialises member reads on the shared file handle, so the
+        # decompression and writes of different members overlap safely.
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="LuaTools-depotcache") as pool:
+            results = list(pool.map(_extract, pending))
+    else:
+        results = [_extract(item) for item in pending]
+    if skipped:
+        logger.log(f"LuaTools: Skipped {skipped} depotcache manifests that were already up to date")
+    return {
+        "written": sum(1 for ok in results if ok),
+        "skipped": skipped,
+        "failed": sum(1 for ok in results if ok is False),
+    }
+
+
+__all__ = ["extract_manifests"]
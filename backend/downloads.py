@@ -3,44 +3,110 @@
 from __future__ import annotations
 
 import base64
+import hashlib
 import json
 import os
 import re
 import threading
 import time
+import shutil
 import subprocess
-from typing import Dict, Any
+import tempfile
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from typing import Any, BinaryIO, Dict, List, Optional, Tuple
+
+import httpx  # type: ignore
 
 from platform_bridge import Millennium
 
+from api_health import (
+    flush_api_health,
+    forget_api_misses,
+    is_known_miss,
+    record_api_miss,
+    record_api_result,
+    record_api_throughput,
+)
 from api_manifest import load_api_manifest
+from appinfo_vdf import APPINFO_CACHE
+from applist_index import (
+    ApplistIndex,
+    build_applist_index,
+    iter_applist_entries,
+    merge_applist_index,
+    open_applist_index,
+    source_signature,
+)
+from bundle_cache import forget_bundle, lookup_bundle, store_bundle, touch_bundle
 from config import (
+    ADD_BATCH_HISTORY,
+    ADD_INSTALL_WORKERS,
+    ADD_MAX_CONCURRENCY,
+    ADD_STAGE_QUEUE_SIZE,
+    ADD_SPOOL_MAX_BYTES,
+    API_DOWNLOAD_TIMEOUT_SECONDS,
+    API_HEDGE_DELAY_SECONDS,
+    API_RACE_MODE,
+    API_RESUME_ATTEMPTS,
     APPID_LOG_FILE,
+    APPLIST_INDEX_FILE,
+    APPLIST_META_FILE,
+    APPLIST_REFRESH_INTERVAL_SECONDS,
+    GAMES_DB_FILE_NAME,
+    GAMES_DB_REFRESH_INTERVAL_SECONDS,
+    LAUNCHER_MAX_CONCURRENCY,
+    LAUNCHER_OUTPUT_TAIL_LINES,
+    LAUNCHER_TIMEOUT_SECONDS,
     LOADED_APPS_FILE,
+    NAME_BATCH_SIZE,
+    NAME_BATCH_WINDOW_SECONDS,
     USER_AGENT,
     WEBKIT_DIR_NAME,
     WEB_UI_ICON_FILE,
     WEB_UI_JS_FILE,
 )
-from http_client import ensure_http_client
+from depotcache import extract_manifests
+from http_client import RateLimitedError, ensure_http_client, limited_get, race_streams
+from games_db import EMPTY_GAMES_TABLE, GamesTable
+from job_progress import JobProgressTable
+from launcher_runner import run_launcher
+from perf_stats import get_perf_snapshot, record_sample, reset_perf_stats
+from pipeline import PipelineStage
 from logger import logger
-from paths import backend_path, public_path
+from name_resolver import NameResolver
+from name_store import APP_NAME_STORE
+from paths import backend_path, data_path, public_path
+from remote_resources import RemoteResource, start_background_refresh
 from steam_utils import detect_steam_install_path, has_lua_for_app
-from utils import count_apis, ensure_temp_download_dir, normalize_manifest_text, read_text, write_text
+from utils import (
+    count_apis,
+    ensure_temp_download_dir,
+    normalize_manifest_text,
+    parse_appid_list,
+    parse_flag,
+    read_json,
+    read_text,
+    write_json_atomic,
+    write_text,
+)
 
-DOWNLOAD_STATE: Dict[int, Dict[str, Any]] = {}
-DOWNLOAD_LOCK = threading.Lock()
+# Add status per appid; byte counters and cancellation live in per-job JobProgress
+DOWNLOAD_JOBS = JobProgressTable()
 
-# Cache for app names to avoid repeated API calls
-APP_NAME_CACHE: Dict[int, str] = {}
-APP_NAME_CACHE_LOCK = threading.Lock()
+# Add jobs flow download -> launcher -> install; ADD_JOBS maps appid -> in-flight job
+ADD_PIPELINE: Optional[Dict[str, PipelineStage]] = None
+ADD_JOBS: Dict[int, "AddJob"] = {}
+ADD_BATCHES: "OrderedDict[str, List[int]]" = OrderedDict()
+ADD_JOBS_LOCK = threading.Lock()
 
-# Rate limiting for Steam API calls
-LAST_API_CALL_TIME = 0
-API_CALL_MIN_INTERVAL = 0.3  # 300ms between calls to avoid 429 errors
+# Set once the store answers a multi-appid appdetails request with an empty body
+# (store requests themselves are paced per host by http_client.RATE_LIMITER)
+_STORE_BATCHES_UNSUPPORTED = False
 
-# In-memory applist for fallback app name lookup
-APPLIST_DATA: Dict[int, str] = {}
+# Memory-mapped applist index for fallback app name lookup
+APPLIST_INDEX: Optional[ApplistIndex] = None
 APPLIST_LOADED = False
 APPLIST_LOCK = threading.Lock()
 APPLIST_FILE_NAME = "all-appids.json"
@@ -48,13 +114,21 @@ APPLIST_URL = "https://applist.morrenus.xyz/"
 APPLIST_DOWNLOAD_TIMEOUT = 300  # 5 minutes for large file
 
 # --- STATUS PILL: Games Database Config ---
-GAMES_DB_FILE_NAME = "games.json"
 GAMES_DB_URL = "https://toolsdb.piqseu.cc/games.json"
 
-# In-memory games database cache and lock
-GAMES_DB_DATA: Dict[str, Any] = {}
+# In-memory games database (immutable; replaced as a whole on reload) and lock
+GAMES_DB: GamesTable = EMPTY_GAMES_TABLE
 GAMES_DB_LOADED = False
 GAMES_DB_LOCK = threading.Lock()
+# Content hash of the loaded games.json and its source signature
+_GAMES_DB_VERSION = ""
+_GAMES_DB_SOURCE: Optional[Tuple[int, int]] = None
+# How often lookups re-check games.json on disk for changes
+_GAMES_DB_RECHECK_SECONDS = 30.0
+_GAMES_DB_CHECKED = 0.0
+# GAMES_DB serialized on the first GetGamesDatabase of each version
+_GAMES_DB_DUMP: Optional[str] = None
+GAMES_DB_QUERY_MAX_LIMIT = 500
 
 
 def _get_cookie_path() -> str:
@@ -159,15 +233,11 @@ def update_morrenus_key(key_content: str) -> str:
 
 
 def _set_download_state(appid: int, update: dict) -> None:
-    with DOWNLOAD_LOCK:
-        state = DOWNLOAD_STATE.get(appid) or {}
-        state.update(update)
-        DOWNLOAD_STATE[appid] = state
+    DOWNLOAD_JOBS.update(appid, update)
 
 
 def _get_download_state(appid: int) -> dict:
-    with DOWNLOAD_LOCK:
-        return DOWNLOAD_STATE.get(appid, {}).copy()
+    return DOWNLOAD_JOBS.get(appid)
 
 
 def _loaded_apps_path() -> str:
@@ -180,50 +250,108 @@ def _appid_log_path() -> str:
 
 def _fetch_app_name(appid: int) -> str:
     """Fetch app name with rate limiting and caching."""
-    global LAST_API_CALL_TIME
+    # Check the persistent name store first
+    cached = APP_NAME_STORE.get(appid)
+    if cached:
+        return cached
 
-    # Check cache first
-    with APP_NAME_CACHE_LOCK:
-        if appid in APP_NAME_CACHE:
-            cached = APP_NAME_CACHE[appid]
-            if cached:  # Only return if not empty
-                return cached
+    # Steam's own appinfo.vdf knows every owned and recently seen app
+    appinfo_name = APPINFO_CACHE.name(appid)
+    if appinfo_name:
+        return appinfo_name
 
     # Check applist file before making web requests
     applist_name = _get_app_name_from_applist(appid)
     if applist_name:
-        with APP_NAME_CACHE_LOCK:
-            APP_NAME_CACHE[appid] = applist_name
         return applist_name
 
-    # Steam API as final resort (web request)
-    with APP_NAME_CACHE_LOCK:
-        time_since_last_call = time.time() - LAST_API_CALL_TIME
-        if time_since_last_call < API_CALL_MIN_INTERVAL:
-            time.sleep(API_CALL_MIN_INTERVAL - time_since_last_call)
-        LAST_API_CALL_TIME = time.time()
+    # A recent lookup failed; don't ask the store again until it expires
+    if cached == "":
+        return ""
+
+    # Steam API as final resort (web request), shared with concurrent callers
+    name = NAME_RESOLVER.resolve(appid)
+    if name is None:
+        return ""  # transient failure: not cached, the next call asks again
+    APP_NAME_STORE.put(appid, name)
+    return name
+
+
+def _fetch_store_names(appids: List[int]) -> Dict[int, str]:
+    """Names of ``appids`` from one ``appdetails?appids=a,b,c&filters=basic`` request.
+
+    The store does not always honour multi-appid requests; when it answers
+    one with an empty body, this and later batches are looked up one by one.
+    Apps the store answered for without a name map to ``""``. Apps left out
+    of the result could not be looked up, because the local rate limit
+    refused the request or the store was unreachable or failing, and are
+    not cached as misses.
+    """
+    global _STORE_BATCHES_UNSUPPORTED
+
+    if len(appids) > 1 and _STORE_BATCHES_UNSUPPORTED:
+        names: Dict[int, str] = {}
+        for appid in appids:
+            names.update(_fetch_store_names([appid]))
+        return names
 
     client = ensure_http_client("LuaTools: _fetch_app_name")
+    ids_str = ",".join(str(appid) for appid in appids)
+    url = f"https://store.steampowered.com/api/appdetails?appids={ids_str}&filters=basic"
+    try:
+        resp = limited_get(client, url, follow_redirects=True, timeout=10)
+    except RateLimitedError as exc:
+        logger.log(f"LuaTools: Deferring name lookup for {ids_str}: {exc}")
+        return {}
+    except httpx.HTTPError as exc:
+        logger.warn(f"LuaTools: _fetch_app_name failed for {ids_str}: {exc}")
+        return {}
+    if resp.status_code != 200:
+        logger.warn(f"LuaTools: _fetch_app_name got HTTP {resp.status_code} for {ids_str}")
+        return {}
     try:
-        url = f"https://store.steampowered.com/api/appdetails?appids={appid}"
-        resp = client.get(url, follow_redirects=True, timeout=10)
-        resp.raise_for_status()
         data = resp.json()
-        entry = data.get(str(appid)) or data.get(int(appid)) or {}
-        if isinstance(entry, dict):
-            inner = entry.get("data") or {}
-            name = inner.get("name")
-            if isinstance(name, str) and name.strip():
-                name = name.strip()
-                with APP_NAME_CACHE_LOCK:
-                    APP_NAME_CACHE[appid] = name
-                return name
-    except Exception as exc:
-        logger.warn(f"LuaTools: _fetch_app_name failed for {appid}: {exc}")
-
-    with APP_NAME_CACHE_LOCK:
-        APP_NAME_CACHE[appid] = ""
-    return ""
+    except ValueError as exc:
+        logger.warn(f"LuaTools: _fetch_app_name got an unreadable answer for {ids_str}: {exc}")
+        return {}
+    if not isinstance(data, dict):
+        if len(appids) > 1:
+            logger.log("LuaTools: Store rejected a multi-appid lookup, resolving names one by one")
+            _STORE_BATCHES_UNSUPPORTED = True
+            return _fetch_store_names(appids)
+        return {}
+
+    names = {}
+    for appid in appids:
+        entry = data.get(str(appid))
+        if not isinstance(entry, dict):
+            continue  # not part of the answer
+        inner = entry.get("data") or {}
+        name = inner.get("name") if isinstance(inner, dict) else None
+        names[appid] = name.strip() if isinstance(name, str) else ""
+    return names
+
+
+NAME_RESOLVER = NameResolver(_fetch_store_names, NAME_BATCH_WINDOW_SECONDS, NAME_BATCH_SIZE)
+
+
+def fetch_app_names(appids: List[int]) -> Dict[int, str]:
+    """Resolve several app names at once; network misses go out in batched requests."""
+    names: Dict[int, str] = {}
+    missing: List[int] = []
+    for appid in dict.fromkeys(int(appid) for appid in appids):
+        cached = APP_NAME_STORE.get(appid)
+        name = cached or APPINFO_CACHE.name(appid) or _get_app_name_from_applist(appid)
+        if name or cached == "":
+            names[appid] = name
+        else:
+            missing.append(appid)
+    if missing:
+        resolved = NAME_RESOLVER.resolve_many(missing)
+        # Failed lookups (None) are not cached, so a later call asks again.
+        APP_NAME_STORE.put_many((appid, name) for appid, name in resolved.items() if name is not None)
+        names.update((appid, name or "") for appid, name in resolved.items())
+    return names
 
 
 def _append_loaded_app(appid: int, name: str) -> None:
@@ -268,7 +396,9 @@ def _log_appid_event(action: str, appid: int, name: str) -> None:
         logger.warn(f"LuaTools: _log_appid_event failed: {exc}")
 
 
-def _preload_app_names_cache() -> None:
+def _seed_name_store_from_logs() -> None:
+    """Fill the name store from appidlogs.txt / loadedappids.txt (installs that predate it)."""
+    seeded: Dict[int, str] = {}
     try:
         log_path = _appid_log_path()
         if os.path.exists(log_path):
@@ -285,12 +415,11 @@ def _preload_app_names_cache() -> None:
                                 name = content_parts[1].strip()
                                 appid = int(appid_str)
                                 if name and not name.startswith("Unknown") and not name.startswith("UNKNOWN"):
-                                    with APP_NAME_CACHE_LOCK:
-                                        APP_NAME_CACHE[appid] = name
+                                    seeded[appid] = name
                         except (ValueError, IndexError):
                             continue
     except Exception as exc:
-        logger.warn(f"LuaTools: _preload_app_names_cache from logs failed: {exc}")
+        logger.warn(f"LuaTools: Seeding app names from logs failed: {exc}")
 
     try:
         path = _loaded_apps_path()
@@ -303,15 +432,25 @@ def _preload_app_names_cache() -> None:
                             appid = int(parts[0].strip())
                             name = parts[1].strip()
                             if name:
-                                with APP_NAME_CACHE_LOCK:
-                                    APP_NAME_CACHE[appid] = name
+                                seeded[appid] = name
                         except (ValueError, IndexError):
                             continue
     except Exception as exc:
-        logger.warn(f"LuaTools: _preload_app_names_cache from loaded_apps failed: {exc}")
+        logger.warn(f"LuaTools: Seeding app names from loaded_apps failed: {exc}")
+
+    APP_NAME_STORE.put_many(seeded.items())
+    APP_NAME_STORE.flush()
+    logger.log(f"LuaTools: Seeded app name store with {len(seeded)} names from logs")
+
+
+def _preload_app_names_cache() -> None:
+    # The name store is persisted and warm on boot; the logs are only read
+    # once, to seed it.
+    if not APP_NAME_STORE.persisted:
+        _seed_name_store_from_logs()
 
     try:
-        _load_applist_into_memory()
+        _load_applist_index()
     except Exception as exc:
         logger.warn(f"LuaTools: _preload_app_names_cache from applist failed: {exc}")
 
@@ -331,174 +470,298 @@ def _get_loaded_app_name(appid: int) -> str:
     return _get_app_name_from_applist(appid)
 
 
+def _applist_local_path() -> str:
+    return os.path.join(ensure_temp_download_dir(), APPLIST_FILE_NAME)
+
+
 def _applist_file_path() -> str:
-    temp_dir = ensure_temp_download_dir()
-    return os.path.join(temp_dir, APPLIST_FILE_NAME)
+    """The applist copy to index: the downloaded one, else a bundled snapshot ('' if none)."""
+    return APPLIST_RESOURCE.path()
 
 
-def _load_applist_into_memory() -> None:
-    global APPLIST_DATA, APPLIST_LOADED
+def _load_applist_index() -> None:
+    global APPLIST_INDEX, APPLIST_LOADED
     with APPLIST_LOCK:
         if APPLIST_LOADED: return
         file_path = _applist_file_path()
-        if not os.path.exists(file_path):
-            logger.log("LuaTools: Applist file not found, skipping load")
-            APPLIST_LOADED = True
-            return
         try:
-            logger.log("LuaTools: Loading applist into memory...")
-            with open(file_path, "r", encoding="utf-8") as handle:
-                data = json.load(handle)
-            if isinstance(data, list):
-                count = 0
-                for entry in data:
-                    if isinstance(entry, dict):
-                        appid = entry.get("appid")
-                        name = entry.get("name")
-                        if appid and name and isinstance(name, str) and name.strip():
-                            APPLIST_DATA[int(appid)] = name.strip()
-                            count += 1
-                logger.log(f"LuaTools: Loaded {count} app names from applist into memory")
+            APPLIST_INDEX = open_applist_index(file_path, data_path(APPLIST_INDEX_FILE))
+            if APPLIST_INDEX is None:
+                logger.log("LuaTools: Applist file not found, skipping load")
             else:
-                logger.warn("LuaTools: Applist file has invalid format (expected array)")
-            APPLIST_LOADED = True
+                logger.log(f"LuaTools: Mapped applist index with {len(APPLIST_INDEX)} app names")
         except Exception as exc:
-            logger.warn(f"LuaTools: Failed to load applist into memory: {exc}")
-            APPLIST_LOADED = True
+            logger.warn(f"LuaTools: Failed to load applist index: {exc}")
+        APPLIST_LOADED = True
 
 
 def _get_app_name_from_applist(appid: int) -> str:
-    global APPLIST_DATA, APPLIST_LOADED
-    if not APPLIST_LOADED: _load_applist_into_memory()
+    if not APPLIST_LOADED: _load_applist_index()
+    index = APPLIST_INDEX
+    if index is None:
+        return ""
+    return index.get(appid)
+
+
+def _prepare_applist(part_path: str) -> int:
+    """Index a downloaded applist before it replaces the local copy.
+
+    Parsing the download also validates it. Only new or renamed apps are
+    merged into the current index; the rename keeps the download's mtime,
+    so the index written here stays current. Returns the number of changes.
+    """
+    _load_applist_index()
+    current = APPLIST_INDEX
+    index_path = data_path(APPLIST_INDEX_FILE)
+    if current is None:
+        return build_applist_index(iter_applist_entries(part_path), index_path, source_signature(part_path))
+    changes = [(appid, name) for appid, name in iter_applist_entries(part_path) if current.get(appid) != name]
+    merge_applist_index(current, changes, index_path, source_signature(part_path))
+    return len(changes)
+
+
+def _applist_changed(file_path: str, changed: int) -> None:
+    global APPLIST_INDEX, APPLIST_LOADED
+    # Lookups in progress keep using the previous mapping.
+    refreshed = ApplistIndex(data_path(APPLIST_INDEX_FILE))
     with APPLIST_LOCK:
-        return APPLIST_DATA.get(int(appid), "")
-
-
-def _ensure_applist_file() -> None:
-    file_path = _applist_file_path()
-    if os.path.exists(file_path):
-        logger.log("LuaTools: Applist file already exists, skipping download")
-        return
-    logger.log("LuaTools: Applist file not found, downloading...")
-    client = ensure_http_client("LuaTools: DownloadApplist")
-    try:
-        resp = client.get(APPLIST_URL, follow_redirects=True, timeout=APPLIST_DOWNLOAD_TIMEOUT)
-        resp.raise_for_status()
-        try:
-            data = resp.json()
-            if not isinstance(data, list):
-                logger.warn("LuaTools: Downloaded applist has invalid format")
-                return
-        except json.JSONDecodeError as exc:
-            logger.warn(f"LuaTools: Downloaded applist is not valid JSON: {exc}")
-            return
-        with open(file_path, "w", encoding="utf-8") as handle:
-            json.dump(data, handle)
-        logger.log(f"LuaTools: Successfully downloaded and saved applist file ({len(data)} entries)")
-    except Exception as exc:
-        logger.warn(f"LuaTools: Failed to download applist file: {exc}")
+        APPLIST_INDEX = refreshed
+        APPLIST_LOADED = True
+    logger.log(f"LuaTools: Applist refreshed ({changed} new or renamed apps, {len(refreshed)} total)")
+
+
+APPLIST_RESOURCE = RemoteResource(
+    "applist",
+    [APPLIST_URL],
+    _applist_local_path,
+    snapshot_path=backend_path(APPLIST_FILE_NAME),
+    meta_file=APPLIST_META_FILE,
+    max_age=APPLIST_REFRESH_INTERVAL_SECONDS,
+    timeout=APPLIST_DOWNLOAD_TIMEOUT,
+    validate=_prepare_applist,
+    on_change=_applist_changed,
+)
 
 
 def init_applist() -> None:
+    """Map the applist index from the copy on disk; downloads and refreshes run in the background."""
     try:
-        _ensure_applist_file()
-        _load_applist_into_memory()
+        _load_applist_index()
     except Exception as exc:
         logger.warn(f"LuaTools: Applist initialization failed: {exc}")
+    start_background_refresh()
 
 
 # --- START GAMES DB LOGIC ---
 
+def _games_db_local_path() -> str:
+    return os.path.join(ensure_temp_download_dir(), GAMES_DB_FILE_NAME)
+
+
 def _games_db_file_path() -> str:
-    """Get the path to the games database JSON file."""
-    temp_dir = ensure_temp_download_dir()
-    return os.path.join(temp_dir, GAMES_DB_FILE_NAME)
+    """The games database to read: the downloaded copy, else the one bundled in backend/."""
+    return GAMES_DB_RESOURCE.path()
 
 
 def _load_games_db_into_memory() -> None:
-    """Load the games database JSON file into memory."""
-    global GAMES_DB_DATA, GAMES_DB_LOADED
+    """Load the games database JSON file into memory.
+
+    The file is re-read only when it changed since the last load, which also
+    drops the cached dump so the next GetGamesDatabase sees the new version.
+    """
+    global GAMES_DB, GAMES_DB_LOADED, _GAMES_DB_VERSION, _GAMES_DB_SOURCE, _GAMES_DB_DUMP
 
     with GAMES_DB_LOCK:
-        if GAMES_DB_LOADED:
+        file_path = _games_db_file_path()
+        source = source_signature(file_path) if file_path else None
+        if GAMES_DB_LOADED and source == _GAMES_DB_SOURCE:
             return
 
-        file_path = _games_db_file_path()
-        if not os.path.exists(file_path):
+        if source is None:
             logger.log("LuaTools: Games DB file not found, skipping load")
             GAMES_DB_LOADED = True
             return
 
         try:
             logger.log("LuaTools: Loading Games DB into memory...")
-            with open(file_path, "r", encoding="utf-8") as handle:
-                GAMES_DB_DATA = json.load(handle)
-
-            logger.log(f"LuaTools: Loaded Games DB ({len(GAMES_DB_DATA)} entries)")
+            with open(file_path, "rb") as handle:
+                raw = handle.read()
+            version = hashlib.sha1(raw).hexdigest()[:16]
+            data = json.loads(raw.decode("utf-8"))
+            del raw
+            if not isinstance(data, dict):
+                raise ValueError("games.json is not an object")
+            # The parsed dicts are only needed until the columns are built.
+            table = GamesTable.from_json(data)
+            del data
+
+            if version != _GAMES_DB_VERSION:
+                _GAMES_DB_DUMP = None
+            GAMES_DB = table
+            _GAMES_DB_VERSION = version
+            _GAMES_DB_SOURCE = source
+            logger.log(f"LuaTools: Loaded Games DB ({len(table)} entries, version {version})")
             GAMES_DB_LOADED = True
         except Exception as exc:
             logger.warn(f"LuaTools: Failed to load Games DB: {exc}")
+            _GAMES_DB_SOURCE = source
             GAMES_DB_LOADED = True
 
 
-def _ensure_games_db_file() -> None:
-    """Download the games database file."""
-    file_path = _games_db_file_path()
+def _validate_games_db(part_path: str) -> None:
+    with open(part_path, "r", encoding="utf-8") as handle:
+        if not isinstance(json.load(handle), dict):
+            raise ValueError("games.json is not an object")
 
-    logger.log("LuaTools: Downloading Games DB...")
-    client = ensure_http_client("LuaTools: DownloadGamesDB")
-
-    try:
-        logger.log(f"LuaTools: Downloading Games DB from {GAMES_DB_URL}")
-        resp = client.get(GAMES_DB_URL, follow_redirects=True, timeout=60)
-        logger.log(f"LuaTools: Games DB download response: status={resp.status_code}")
-        resp.raise_for_status()
 
-        data = resp.json()
-
-        with open(file_path, "w", encoding="utf-8") as handle:
-            json.dump(data, handle)
-
-        logger.log(f"LuaTools: Successfully downloaded Games DB")
-    except Exception as exc:
-        logger.warn(f"LuaTools: Failed to download Games DB: {exc}")
+GAMES_DB_RESOURCE = RemoteResource(
+    "games-db",
+    [GAMES_DB_URL],
+    _games_db_local_path,
+    snapshot_path=backend_path(GAMES_DB_FILE_NAME),
+    max_age=GAMES_DB_REFRESH_INTERVAL_SECONDS,
+    timeout=60,
+    validate=_validate_games_db,
+    on_change=lambda path, _: _load_games_db_into_memory(),
+)
 
 
 def init_games_db() -> None:
-    """Initialize the games database: download if needed, then load into memory."""
+    """Load the games database from disk; a stale copy is refreshed in the background."""
     try:
-        _ensure_games_db_file()
         _load_games_db_into_memory()
     except Exception as exc:
         logger.warn(f"LuaTools: Games DB initialization failed: {exc}")
+    start_background_refresh()
 
 
-def get_games_database() -> str:
-    """Get the games database as JSON string."""
+def _ensure_games_db_loaded() -> None:
+    """Load the games DB on first use, then pick up changes to games.json on disk."""
+    global _GAMES_DB_CHECKED
     if not GAMES_DB_LOADED:
+        _GAMES_DB_CHECKED = time.monotonic()
         init_games_db()
+        return
+    now = time.monotonic()
+    if now - _GAMES_DB_CHECKED >= _GAMES_DB_RECHECK_SECONDS:
+        _GAMES_DB_CHECKED = now
+        _load_games_db_into_memory()
+
+
+def get_games_database(known_version: str = "") -> str:
+    """Get the games database as JSON string.
+
+    The dump is serialized once per database version. A caller that passes the
+    version it already holds gets a small ``notModified`` reply instead.
+    """
+    global _GAMES_DB_DUMP
+    _ensure_games_db_loaded()
 
     with GAMES_DB_LOCK:
-        return json.dumps(GAMES_DB_DATA)
+        if known_version and str(known_version) == _GAMES_DB_VERSION:
+            return json.dumps({"success": True, "version": _GAMES_DB_VERSION, "notModified": True})
+        if _GAMES_DB_DUMP is None:
+            _GAMES_DB_DUMP = GAMES_DB.to_json()
+        return _GAMES_DB_DUMP
 
-# --- END GAMES DB LOGIC ---
 
+def _games_db_snapshot() -> Tuple[GamesTable, str]:
+    _ensure_games_db_loaded()
+    with GAMES_DB_LOCK:
+        return GAMES_DB, _GAMES_DB_VERSION
 
-def fetch_app_name(appid: int) -> str:
-    return _fetch_app_name(appid)
 
+def get_games_database_version() -> str:
+    table, version = _games_db_snapshot()
+    return json.dumps({"success": True, "version": version, "count": len(table)})
 
-def _process_and_install_lua(appid: int, zip_path: str) -> None:
-    """Process downloaded zip via BIFROST and install lua file into stplug-in directory."""
-    import zipfile
 
-    if _is_download_cancelled(appid):
-        raise RuntimeError("cancelled")
+def get_game_status(appid: int) -> str:
+    """Games DB entry for one appid (``status`` is null when the game is not listed)."""
+    try:
+        appid = int(appid)
+    except (TypeError, ValueError):
+        return json.dumps({"success": False, "error": "Invalid appid"})
+    table, version = _games_db_snapshot()
+    entry = table.get(appid)
+    return json.dumps({
+        "success": True,
+        "version": version,
+        "appid": appid,
+        "found": entry is not None,
+        "status": entry,
+    })
+
+
+def get_game_statuses(appids: Any) -> str:
+    """Games DB entries for several appids, keyed by appid; unlisted appids map to null."""
+    parsed = parse_appid_list(appids)
+    if not parsed:
+        return json.dumps({"success": False, "error": "No valid appids"})
+    table, version = _games_db_snapshot()
+    statuses = {str(appid): table.get(appid) for appid in parsed}
+    return json.dumps({"success": True, "version": version, "statuses": statuses})
+
+
+def _parse_optional_flag(value: Any) -> Optional[bool]:
+    if value is None or (isinstance(value, str) and not value.strip()):
+        return None
+    return parse_flag(value)
+
+
+def _parse_playable_levels(playable: Any) -> Optional[List[int]]:
+    """Accept a level, a list of levels or a comma separated string of levels."""
+    if playable is None or (isinstance(playable, str) and not playable.strip()):
+        return None
+    if isinstance(playable, str):
+        playable = re.split(r"[\s,\[\]]+", playable.strip())
+    if not isinstance(playable, (list, tuple)):
+        playable = [playable]
+    return [int(str(level).strip()) for level in playable if str(level).strip()]
+
+
+def query_games_db(
+    playable: Any = None,
+    denuvo: Any = None,
+    of_available: Any = None,
+    offset: int = 0,
+    limit: int = 50,
+) -> str:
+    """Page through the games DB in appid order, filtered by status.
+
+    ``playable`` is one level or a list of levels (0, 1, 2); ``denuvo`` and
+    ``of_available`` filter on their flags. Omitted filters match everything.
+    """
+    try:
+        levels = _parse_playable_levels(playable)
+        wants_denuvo = _parse_optional_flag(denuvo)
+        wants_of = _parse_optional_flag(of_available)
+        offset = max(0, int(offset or 0))
+        limit = max(1, min(int(limit or 50), GAMES_DB_QUERY_MAX_LIMIT))
+    except (TypeError, ValueError) as exc:
+        return json.dumps({"success": False, "error": f"Invalid query: {exc}"})
+    table, version = _games_db_snapshot()
+    total, page = table.query(levels, wants_denuvo, wants_of, offset, limit)
+    results = [dict(entry, appid=appid) for appid, entry in page]
+
+    return json.dumps({
+        "success": True,
+        "version": version,
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "results": results,
+    })
+
+# --- END GAMES DB LOGIC ---
+
+
+def fetch_app_name(appid: int) -> str:
+    return _fetch_app_name(appid)
 
-    base_path = detect_steam_install_path() or Millennium.steam_path()
-    target_dir = os.path.join(base_path or "", "config", "stplug-in")
-    os.makedirs(target_dir, exist_ok=True)
 
+def _run_launcher(appid: int, zip_path: str, bundle: Optional[BinaryIO] = None) -> None:
+    """Hand the bundle to the configured launcher (ACCELA / Bifrost), if installed."""
     # --- INTEGRAÇÃO LAUNCHER CUSTOMIZÁVEL ---
     # Carrega o caminho salvo ou usa o padrão
     launcher_bin = load_launcher_path()
@@ -508,30 +771,39 @@ def _process_and_install_lua(appid: int, zip_path: str) -> None:
     if os.path.exists(launcher_bin):
         logger.log(f"LuaTools: Enviando {zip_path} para o Launcher...")
         try:
+            if bundle is not None:
+                bundle.seek(0)
+                with open(zip_path, "wb") as zip_file:
+                    shutil.copyfileobj(bundle, zip_file)
+
             # Garante permissão de execução
             if not os.access(launcher_bin, os.X_OK):
                  os.chmod(launcher_bin, 0o755)
 
-            # --- CORREÇÃO: Limpar ambiente para evitar conflito Qt6/Steam ---
-            clean_env = os.environ.copy()
-            clean_env.pop("LD_LIBRARY_PATH", None) # Remove libs da Steam (corrige erro do Qt6)
-            clean_env.pop("LD_PRELOAD", None)      # Remove overlay do Millennium (corrige spam ld.so)
-            clean_env.pop("STEAM_RUNTIME", None)   # Garante que use libs do sistema
-            # -------------------------------------------------------------
-
-            proc = subprocess.Popen([launcher_bin, zip_path],
-                                    stdout=subprocess.PIPE,
-                                    stderr=subprocess.PIPE,
-                                    text=True,
-                                    env=clean_env) # <--- APLICA O AMBIENTE LIMPO
-
-            stdout, stderr = proc.communicate()
-
-            if stdout: logger.log(f"Launcher Output: {stdout[:200]}...")
-            if stderr: logger.warn(f"Launcher Stderr: {stderr}")
+            output: List[str] = []
 
-            if proc.returncode != 0:
-                logger.warn(f"Launcher terminou com código de erro: {proc.returncode}")
+            def _on_line(stream: str, line: str) -> None:
+                output.append(line)
+                del output[:-LAUNCHER_OUTPUT_TAIL_LINES]
+                _set_download_state(appid, {"launcherOutput": list(output)})
+                if stream == "stderr":
+                    logger.warn(f"Launcher Stderr: {line}")
+                else:
+                    logger.log(f"Launcher Output: {line}")
+
+            _set_download_state(appid, {"launcherOutput": []})
+            result = run_launcher(
+                launcher_bin, [zip_path], on_line=_on_line, should_stop=lambda: _is_download_cancelled(appid)
+            )
+            _set_download_state(appid, {"launcherSeconds": round(result.seconds, 3)})
+
+            if result.cancelled:
+                logger.log(f"LuaTools: Launcher stopped, add for appid={appid} was cancelled")
+            elif result.timed_out:
+                logger.warn(f"LuaTools: Launcher excedeu {LAUNCHER_TIMEOUT_SECONDS}s e foi encerrado")
+                _set_download_state(appid, {"launcherTimedOut": True})
+            elif result.returncode != 0:
+                logger.warn(f"Launcher terminou com código de erro: {result.returncode}")
             else:
                 logger.log("Launcher finalizado com sucesso.")
 
@@ -541,38 +813,30 @@ def _process_and_install_lua(appid: int, zip_path: str) -> None:
         logger.warn(f"LuaTools: Launcher não encontrado em {launcher_bin}")
     # --------------------------
 
-    # Extração do arquivo .lua (Mantida como garantia e para registro)
-    with zipfile.ZipFile(zip_path, "r") as archive:
-        names = archive.namelist()
 
-        try:
-            depotcache_dir = os.path.join(base_path or "", "depotcache")
-            os.makedirs(depotcache_dir, exist_ok=True)
-            for name in names:
-                try:
-                    if _is_download_cancelled(appid):
-                        raise RuntimeError("cancelled")
-                    if name.lower().endswith(".manifest"):
-                        pure = os.path.basename(name)
-                        data = archive.read(name)
-                        out_path = os.path.join(depotcache_dir, pure)
-                        with open(out_path, "wb") as manifest_file:
-                            manifest_file.write(data)
-                        logger.log(f"LuaTools: Extracted manifest -> {out_path}")
-                except Exception as manifest_exc:
-                    logger.warn(f"LuaTools: Failed to extract manifest {name}: {manifest_exc}")
-        except Exception as depot_exc:
-            logger.warn(f"LuaTools: depotcache extraction failed: {depot_exc}")
+def _install_lua_from_bundle(appid: int, zip_path: str, bundle: Optional[BinaryIO] = None) -> None:
+    """Extract depotcache manifests and install the bundle's lua into stplug-in."""
+    import zipfile
+
+    if _is_download_cancelled(appid):
+        raise RuntimeError("cancelled")
 
+    base_path = detect_steam_install_path() or Millennium.steam_path()
+    target_dir = os.path.join(base_path or "", "config", "stplug-in")
+    os.makedirs(target_dir, exist_ok=True)
+
+    # Extração do arquivo .lua (Mantida como garantia e para registro)
+    if bundle is not None:
+        bundle.seek(0)
+    # "validating": open the archive and read the lua it must contain
+    started = time.monotonic()
+    with zipfile.ZipFile(bundle if bundle is not None else zip_path, "r") as archive:
         candidates = []
-        for name in names:
+        for name in archive.namelist():
             pure = os.path.basename(name)
             if re.fullmatch(r"\d+\.lua", pure):
                 candidates.append(name)
 
-        if _is_download_cancelled(appid):
-            raise RuntimeError("cancelled")
-
         chosen = None
         preferred = f"{appid}.lua"
         for name in candidates:
@@ -589,7 +853,23 @@ def _process_and_install_lua(appid: int, zip_path: str) -> None:
             text = data.decode("utf-8")
         except Exception:
             text = data.decode("utf-8", errors="replace")
+        _record_phase(appid, "validating", time.monotonic() - started)
+
+        started = time.monotonic()
+        try:
+            depotcache_dir = os.path.join(base_path or "", "depotcache")
+            counts = extract_manifests(archive, depotcache_dir, should_stop=lambda: _is_download_cancelled(appid))
+            _set_download_state(
+                appid, {"manifestsWritten": counts["written"], "manifestsSkipped": counts["skipped"]}
+            )
+        except Exception as depot_exc:
+            logger.warn(f"LuaTools: depotcache extraction failed: {depot_exc}")
+        _record_phase(appid, "depotcache", time.monotonic() - started)
 
+        if _is_download_cancelled(appid):
+            raise RuntimeError("cancelled")
+
+        started = time.monotonic()
         processed_lines = []
         for line in text.splitlines(True):
             if re.match(r"^\s*setManifestid\(", line) and not re.match(r"^\s*--", line):
@@ -605,7 +885,10 @@ def _process_and_install_lua(appid: int, zip_path: str) -> None:
             output.write(processed_text)
         logger.log(f"LuaTools: Installed lua -> {dest_file}")
         _set_download_state(appid, {"installedPath": dest_file})
+        _record_phase(appid, "luaInstall", time.monotonic() - started)
 
+    if not os.path.exists(zip_path):
+        return
     try:
         os.remove(zip_path)
     except Exception:
@@ -621,194 +904,816 @@ def _process_and_install_lua(appid: int, zip_path: str) -> None:
             pass
 
 
+def _record_phase(appid: int, phase: str, seconds: float) -> None:
+    """Add a phase duration to the job's ``timings`` and the rolling histograms."""
+    record_sample(phase, seconds)
+    timings = dict(_get_download_state(appid).get("timings") or {})
+    timings[phase] = round(timings.get(phase, 0.0) + seconds, 3)
+    _set_download_state(appid, {"timings": timings})
+
+
 def _is_download_cancelled(appid: int) -> bool:
+    return DOWNLOAD_JOBS.is_cancelled(appid)
+
+
+def _api_request_headers(name: str, url: str) -> Dict[str, str]:
+    headers = {"User-Agent": USER_AGENT}
+
+    # --- LÓGICA DO FORCED RYU (COOKIE) ---
+    if "ryuu.lol" in url:
+        cookie_content = load_ryu_cookie()
+        if cookie_content:
+            logger.log(f"LuaTools: Injetando cookie do Ryuu para a API '{name}'")
+            # O arquivo já contém 'session=...', então usamos direto
+            headers["Cookie"] = cookie_content
+            # Headers adicionais para simular navegador e evitar bloqueio
+            headers["Referer"] = "https://generator.ryuu.lol/"
+            headers["Authority"] = "generator.ryuu.lol"
+            headers["Accept"] = "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8"
+            headers["Upgrade-Insecure-Requests"] = "1"
+            headers["Sec-Fetch-Dest"] = "document"
+            headers["Sec-Fetch-Mode"] = "navigate"
+            headers["Sec-Fetch-Site"] = "same-origin"
+        else:
+            logger.warn("LuaTools: API Ryuu detectada, mas 'data/ryuu_cookie.txt' não encontrado ou vazio!")
+    # -------------------------------------
+    return headers
+
+
+_ZIP_MAGICS = (b"PK\x03\x04", b"PK\x05\x06", b"PK\x07\x08")
+
+
+def _api_hedge_delay():
+    """Translate API_RACE_MODE into a race_streams hedge delay."""
+    mode = str(API_RACE_MODE or "").lower()
+    if mode == "parallel":
+        return 0.0
+    if mode == "hedged":
+        return max(0.0, float(API_HEDGE_DELAY_SECONDS))
+    return None
+
+
+def _partial_paths(dest_path: str):
+    """Return the partial download path and its resume sidecar for ``dest_path``."""
+    part_path = f"{dest_path}.part"
+    return part_path, f"{part_path}.json"
+
+
+def _discard_partial(dest_path: str) -> None:
+    for path in _partial_paths(dest_path):
+        try:
+            if os.path.exists(path):
+                os.remove(path)
+        except Exception:
+            pass
+
+
+def _resume_validator(headers) -> Dict[str, str]:
+    """Validators usable with If-Range: a strong ETag and/or Last-Modified."""
+    validator: Dict[str, str] = {}
+    etag = str(headers.get("ETag", "") or "").strip()
+    if etag and not etag.startswith("W/"):
+        validator["etag"] = etag
+    last_modified = str(headers.get("Last-Modified", "") or "").strip()
+    if last_modified:
+        validator["lastModified"] = last_modified
+    return validator
+
+
+def _load_resume_info(dest_path: str) -> Optional[Dict[str, Any]]:
+    """Return the sidecar of a resumable partial download, if one is usable."""
+    part_path, sidecar_path = _partial_paths(dest_path)
+    info = read_json(sidecar_path)
+    if not isinstance(info, dict) or not info.get("url"):
+        return None
+    if not (info.get("etag") or info.get("lastModified")):
+        return None
+    try:
+        size = os.path.getsize(part_path)
+    except OSError:
+        return None
+    if size <= 0:
+        return None
+    # The partial file itself is authoritative for how much was written.
+    info["bytes"] = size
+    return info
+
+
+def _save_resume_info(dest_path: str, url: str, validator: Dict[str, str]) -> bool:
+    part_path, sidecar_path = _partial_paths(dest_path)
     try:
-        return _get_download_state(appid).get("status") == "cancelled"
+        size = os.path.getsize(part_path)
+    except OSError:
+        return False
+    if size <= 0 or not validator:
+        return False
+    return write_json_atomic(sidecar_path, {"url": url, "bytes": size, **validator})
+
+
+def _persist_partial(spool: BinaryIO, dest_path: str, url: str, validator: Dict[str, str]) -> bool:
+    """Write a dropped download's bytes to ``<dest>.part`` so a retry can resume it."""
+    if not validator:
+        return False
+    part_path, _ = _partial_paths(dest_path)
+    try:
+        spool.seek(0)
+        with open(part_path, "wb") as output:
+            shutil.copyfileobj(spool, output)
+    except OSError:
+        return False
+    return _save_resume_info(dest_path, url, validator)
+
+
+def _resume_headers(info: Dict[str, Any]) -> Dict[str, str]:
+    return {
+        "Range": f"bytes={int(info['bytes'])}-",
+        "If-Range": str(info.get("etag") or info.get("lastModified")),
+    }
+
+
+def _content_range_start(resp) -> int:
+    """Start offset from a ``Content-Range: bytes <start>-<end>/<total>`` header, or -1."""
+    match = re.match(r"\s*bytes\s+(\d+)-\d+/(\d+|\*)", str(resp.headers.get("Content-Range", "") or ""))
+    return int(match.group(1)) if match else -1
+
+
+def _warn_non_zip(name: str, head: bytes) -> None:
+    content_preview = head[:100].decode("utf-8", errors="ignore")
+    logger.warn(
+        f"LuaTools: API '{name}' returned non-zip file (magic={head[:4].hex()}, preview={content_preview[:50]})"
+    )
+    if "Login required" in content_preview or "Sign in" in content_preview:
+        logger.error("LuaTools: O site Ryuu pediu login. O cookie é inválido.")
+
+
+@dataclass
+class FetchedBundle:
+    """A downloaded (or cached) manifest bundle that passed validation."""
+
+    api: str
+    url: str
+    dest_path: str
+    bundle: BinaryIO
+    validator: Dict[str, str] = field(default_factory=dict)
+    cached: bool = False
+
+    def close(self) -> None:
+        try:
+            self.bundle.close()
+        except Exception:
+            pass
+
+
+def _launcher_step(appid: int, fetched: FetchedBundle) -> None:
+    if _is_download_cancelled(appid):
+        logger.log(f"LuaTools: Processing aborted due to cancellation for appid={appid}")
+        raise RuntimeError("cancelled")
+    _set_download_state(appid, {"status": "processing"})
+    started = time.monotonic()
+    _run_launcher(appid, fetched.dest_path, fetched.bundle)
+    _record_phase(appid, "launcher", time.monotonic() - started)
+
+
+def _install_step(appid: int, fetched: FetchedBundle) -> None:
+    _install_lua_from_bundle(appid, fetched.dest_path, fetched.bundle)
+    if _is_download_cancelled(appid):
+        logger.log(f"LuaTools: Installation complete but marked cancelled for appid={appid}")
+        raise RuntimeError("cancelled")
+    started = time.monotonic()
+    try:
+        fetched_name = _fetch_app_name(appid) or f"UNKNOWN ({appid})"
+        _append_loaded_app(appid, fetched_name)
+        _log_appid_event(f"ADDED - {fetched.api}", appid, fetched_name)
     except Exception:
+        pass
+    _record_phase(appid, "nameResolution", time.monotonic() - started)
+    if fetched.cached:
+        touch_bundle(appid)
+    else:
+        store_bundle(appid, fetched.bundle, fetched.api, fetched.url, fetched.validator)
+    _set_download_state(appid, {"status": "done", "success": True, "api": fetched.api})
+
+
+def _install_failed(appid: int, fetched: FetchedBundle, install_exc: Exception) -> bool:
+    """Clean up after a failed launcher/install step.
+
+    Returns True when the bundle came from the local cache and the add
+    should be retried from the APIs (the cached copy is dropped).
+    """
+    dest_path = fetched.dest_path
+    if isinstance(install_exc, RuntimeError) and str(install_exc) == "cancelled":
+        try:
+            if os.path.exists(dest_path):
+                os.remove(dest_path)
+        except Exception:
+            pass
+        _discard_partial(dest_path)
+        logger.log(f"LuaTools: Cancelled download cleanup complete for appid={appid}")
         return False
+    logger.warn(f"LuaTools: Processing failed -> {install_exc}")
+    _set_download_state(
+        appid, {"status": "failed", "error": f"Processing failed: {install_exc}"}
+    )
+    try:
+        os.remove(dest_path)
+    except Exception:
+        pass
+    if fetched.cached:
+        # A cached bundle that no longer installs is dropped and fetched again.
+        forget_bundle(appid)
+        return True
+    return False
+
+
+def _consume_api_response(
+    appid: int, name: str, url: str, resp, dest_path: str, resume_offset: int = 0
+) -> Tuple[str, Optional[FetchedBundle]]:
+    """Stream a winning API response into memory and validate it.
+
+    The body is spooled in memory (spilling to disk above
+    ADD_SPOOL_MAX_BYTES) and checked for the zip magic as the first bytes
+    arrive. A 206 answer matching ``resume_offset`` continues the partial
+    ``<dest>.part`` file left by a dropped attempt; anything else starts over.
+
+    Returns ``("ready", bundle)`` with a validated bundle that the caller
+    now owns, ``"done"`` when the add flow is finished (failed or
+    cancelled), ``"resume"`` when the connection dropped mid-body and the
+    partial file can be resumed from the same URL, and ``"next"`` when the
+    remaining APIs should be tried.
+    """
+    part_path, sidecar_path = _partial_paths(dest_path)
+    spool = tempfile.SpooledTemporaryFile(max_size=ADD_SPOOL_MAX_BYTES, dir=os.path.dirname(dest_path))
+    handed_off = False
+    try:
+        offset = 0
+        if resp.status_code == 206:
+            offset = _content_range_start(resp)
+            if offset != resume_offset or offset <= 0:
+                logger.warn(
+                    f"LuaTools: API '{name}' answered an unexpected range (offset={offset}, wanted={resume_offset})"
+                )
+                _discard_partial(dest_path)
+                return "next", None
+            logger.log(f"LuaTools: Resuming download for appid={appid} from byte {offset}")
+        elif resume_offset:
+            logger.log(f"LuaTools: API '{name}' ignored the resume request, downloading from the start")
+
+        total = int(resp.headers.get("Content-Length", "0") or "0")
+        _set_download_state(
+            appid,
+            {"status": "downloading", "currentApi": name, "bytesRead": offset, "totalBytes": offset + total if total else 0},
+        )
+
+        validator = _resume_validator(resp.headers)
+        head = b""
+        if offset:
+            # Keep the validator the partial file was started with.
+            stored = read_json(sidecar_path)
+            validator = {key: stored[key] for key in ("etag", "lastModified") if stored.get(key)} or validator
+            with open(part_path, "rb") as partial:
+                head = partial.read(512)
+                partial.seek(0)
+                shutil.copyfileobj(partial, spool)
+
+        progress = DOWNLOAD_JOBS.progress(appid)
+        cancelled = progress.cancelled
+        body_started = time.monotonic()
+        try:
+            for chunk in resp.iter_bytes():
+                if not chunk:
+                    continue
+                if cancelled.is_set():
+                    logger.log(f"LuaTools: Download cancelled mid-stream for appid={appid}")
+                    raise RuntimeError("cancelled")
+                if len(head) < 4:
+                    head += chunk[:512]
+                    if len(head) >= 4 and head[:4] not in _ZIP_MAGICS:
+                        _warn_non_zip(name, head)
+                        _discard_partial(dest_path)
+                        return "next", None
+                spool.write(chunk)
+                progress.bytes_read += len(chunk)
+        except httpx.TransportError as drop_exc:
+            if _persist_partial(spool, dest_path, url, validator):
+                logger.warn(
+                    f"LuaTools: Connection to API '{name}' dropped at byte {progress.bytes_read} for appid={appid}, keeping partial file: {drop_exc}"
+                )
+                return "resume", None
+            raise
+        if head[:4] not in _ZIP_MAGICS:
+            _warn_non_zip(name, head)
+            _discard_partial(dest_path)
+            return "next", None
+        body_seconds = time.monotonic() - body_started
+        record_api_throughput(name, progress.bytes_read - offset, body_seconds)
+        _record_phase(appid, "downloading", body_seconds)
+        if body_seconds > 0:
+            record_sample("bytesPerSecond", (progress.bytes_read - offset) / body_seconds, name)
+        _discard_partial(dest_path)
+        logger.log(f"LuaTools: Download complete for appid={appid} ({progress.bytes_read} bytes)")
+
+        if _is_download_cancelled(appid):
+            logger.log(f"LuaTools: Download marked cancelled after completion for appid={appid}")
+            raise RuntimeError("cancelled")
+
+        handed_off = True
+        return "ready", FetchedBundle(name, url, dest_path, spool, validator)
+    except RuntimeError as cancel_exc:
+        if str(cancel_exc) == "cancelled":
+            try:
+                if os.path.exists(dest_path):
+                    os.remove(dest_path)
+            except Exception:
+                pass
+            _discard_partial(dest_path)
+            logger.log(f"LuaTools: Download cancelled and cleaned up for appid={appid}")
+            return "done", None
+        logger.warn(f"LuaTools: Runtime error during download for appid={appid}: {cancel_exc}")
+        _set_download_state(appid, {"status": "failed", "error": str(cancel_exc)})
+        return "done", None
+    except Exception as err:
+        logger.warn(f"LuaTools: API '{name}' failed with error: {err}")
+        return "next", None
+    finally:
+        if not handed_off:
+            spool.close()
+
+
+def _revalidate_cached_bundle(
+    appid: int, entry: Dict[str, Any], dest_path: str
+) -> Tuple[str, Optional[FetchedBundle]]:
+    """Ask the bundle's API whether an expired cache entry is still current.
+
+    Returns ``"cached"`` when the cached copy should be installed (304, or
+    the API is unreachable), ``("ready", bundle)`` when the API sent a new
+    bundle, ``"done"`` when the add failed or was cancelled meanwhile, and
+    ``"miss"`` when the APIs should be raced as usual.
+    """
+    validator = {key: entry[key] for key in ("etag", "lastModified") if entry.get(key)}
+    api = next(
+        (
+            api for api in load_api_manifest()
+            if api.get("name") == entry.get("api")
+            and api.get("url", "").replace("<appid>", str(appid)) == entry.get("url")
+        ),
+        None,
+    )
+    if api is None or not validator:
+        return "miss", None
+
+    name = api.get("name", "Unknown")
+    url = str(entry["url"])
+    headers = _api_request_headers(name, url)
+    if validator.get("etag"):
+        headers["If-None-Match"] = validator["etag"]
+    if validator.get("lastModified"):
+        headers["If-Modified-Since"] = validator["lastModified"]
+
+    _set_download_state(appid, {"status": "checking", "currentApi": name})
+    client = ensure_http_client("LuaTools: download")
+    try:
+        resp = client.send(
+            client.build_request("GET", url, headers=headers, timeout=API_DOWNLOAD_TIMEOUT_SECONDS), stream=True
+        )
+    except Exception as exc:
+        logger.warn(f"LuaTools: Could not revalidate cached bundle for appid={appid}, using it anyway: {exc}")
+        return "cached", None
+    try:
+        if resp.status_code == 304:
+            logger.log(f"LuaTools: Cached bundle for appid={appid} is still current on '{name}'")
+            touch_bundle(appid, revalidated=True)
+            return "cached", None
+        if resp.status_code == int(api.get("success_code", 200)):
+            logger.log(f"LuaTools: Cached bundle for appid={appid} changed on '{name}', downloading it")
+            result, fetched = _consume_api_response(appid, name, url, resp, dest_path)
+            return (result, fetched) if result in ("ready", "done") else ("miss", None)
+        logger.log(f"LuaTools: Revalidating cached bundle for appid={appid} returned {resp.status_code}")
+        return "miss", None
+    finally:
+        resp.close()
+
+
+def _open_cached_bundle(appid: int, entry: Dict[str, Any], dest_path: str) -> Optional[FetchedBundle]:
+    try:
+        bundle = open(entry["path"], "rb")
+    except OSError as exc:
+        logger.warn(f"LuaTools: Cached bundle for appid={appid} is unreadable: {exc}")
+        forget_bundle(appid)
+        return None
+    size = int(entry.get("size", 0))
+    logger.log(f"LuaTools: Installing appid={appid} from cached bundle {entry['file']}")
+    _set_download_state(
+        appid,
+        {"status": "processing", "currentApi": entry.get("api"), "cached": True, "dest": dest_path,
+         "bytesRead": size, "totalBytes": size},
+    )
+    validator = {key: entry[key] for key in ("etag", "lastModified") if entry.get(key)}
+    return FetchedBundle(str(entry.get("api") or "cache"), str(entry.get("url") or ""), dest_path, bundle, validator, True)
+
+
+def _fetch_bundle(appid: int, force_reprobe: bool = False, offline: bool = False) -> Optional[FetchedBundle]:
+    """Get a validated bundle for ``appid`` from the local cache or the APIs.
+
+    Returns None when the add already finished (failed or cancelled); the
+    job state says why.
+    """
+    if offline or not force_reprobe:
+        entry = lookup_bundle(appid)
+        if entry is not None:
+            dest_path = os.path.join(ensure_temp_download_dir(), f"{appid}.zip")
+            if not entry["fresh"] and not offline:
+                result, fetched = _revalidate_cached_bundle(appid, entry, dest_path)
+                if result in ("ready", "done"):
+                    return fetched
+                if result == "miss":
+                    entry = None
+            if entry is not None:
+                fetched = _open_cached_bundle(appid, entry, dest_path)
+                if fetched is not None:
+                    return fetched
+    if offline:
+        _set_download_state(appid, {"status": "failed", "error": "Not in the local bundle cache (offline mode)"})
+        return None
+    try:
+        return _race_apis_for_app(appid, force_reprobe)
+    finally:
+        flush_api_health()
 
 
-def _download_zip_for_app(appid: int):
+def _race_apis_for_app(appid: int, force_reprobe: bool = False) -> Optional[FetchedBundle]:
     client = ensure_http_client("LuaTools: download")
     apis = load_api_manifest()
     if not apis:
         logger.warn("LuaTools: No enabled APIs in manifest")
         _set_download_state(appid, {"status": "failed", "error": "No APIs available"})
-        return
+        return None
+
+    if force_reprobe:
+        forgotten = forget_api_misses(appid)
+        if forgotten:
+            logger.log(f"LuaTools: Forced re-probe for appid={appid}, forgot {forgotten} cached misses")
+    else:
+        skipped = [
+            api.get("name", "Unknown")
+            for api in apis
+            if is_known_miss(api.get("name", "Unknown"), api.get("url", ""), appid)
+        ]
+        if skipped:
+            logger.log(f"LuaTools: Skipping APIs that recently had no bundle for appid={appid}: {', '.join(skipped)}")
+            apis = [api for api in apis if api.get("name", "Unknown") not in skipped]
+        if not apis:
+            _set_download_state(
+                appid, {"status": "failed", "error": "Not available on any API", "skippedApis": skipped}
+            )
+            return None
 
     dest_root = ensure_temp_download_dir()
     dest_path = os.path.join(dest_root, f"{appid}.zip")
     _set_download_state(
         appid,
-        {"status": "checking", "currentApi": None, "bytesRead": 0, "totalBytes": 0, "dest": dest_path},
+        {"status": "checking", "currentApi": None, "cached": False, "bytesRead": 0, "totalBytes": 0, "dest": dest_path},
     )
 
-    for api in apis:
-        name = api.get("name", "Unknown")
-        template = api.get("url", "")
-        success_code = int(api.get("success_code", 200))
-        unavailable_code = int(api.get("unavailable_code", 404))
-        url = template.replace("<appid>", str(appid))
-        _set_download_state(
-            appid, {"status": "checking", "currentApi": name, "bytesRead": 0, "totalBytes": 0}
+    hedge_delay = _api_hedge_delay()
+    remaining = list(apis)
+    resume_attempts = 0
+    race_started = time.monotonic()
+    while remaining:
+        if _is_download_cancelled(appid):
+            logger.log(f"LuaTools: Download cancelled before contacting remaining APIs for appid={appid}")
+            return None
+
+        names = [api.get("name", "Unknown") for api in remaining]
+        urls = [api.get("url", "").replace("<appid>", str(appid)) for api in remaining]
+        success_codes = [int(api.get("success_code", 200)) for api in remaining]
+        unavailable_codes = [int(api.get("unavailable_code", 404)) for api in remaining]
+
+        # A partial file from an earlier attempt is only resumable from the same URL.
+        resume_info = _load_resume_info(dest_path)
+        resume_index = urls.index(resume_info["url"]) if resume_info and resume_info["url"] in urls else -1
+        resume_offset = int(resume_info["bytes"]) if resume_index >= 0 else 0
+
+        requests = []
+        for index, (name, url) in enumerate(zip(names, urls)):
+            headers = _api_request_headers(name, url)
+            if index == resume_index:
+                headers.update(_resume_headers(resume_info))
+            requests.append(
+                client.build_request("GET", url, headers=headers, timeout=API_DOWNLOAD_TIMEOUT_SECONDS)
+            )
+
+        def _on_start(index: int) -> None:
+            logger.log(f"LuaTools: Trying API '{names[index]}' -> {urls[index]}")
+            _set_download_state(appid, {"status": "checking", "currentApi": names[index]})
+
+        outcome = race_streams(
+            requests,
+            accept=lambda index, resp: resp.status_code == success_codes[index]
+            or (index == resume_index and resp.status_code == 206),
+            hedge_delay=hedge_delay,
+            should_stop=lambda: _is_download_cancelled(appid),
+            on_start=_on_start,
         )
-        logger.log(f"LuaTools: Trying API '{name}' -> {url}")
-
-        try:
-            headers = {"User-Agent": USER_AGENT}
-
-            # --- LÓGICA DO FORCED RYU (COOKIE) ---
-            if "ryuu.lol" in url:
-                cookie_content = load_ryu_cookie()
-                if cookie_content:
-                    logger.log(f"LuaTools: Injetando cookie do Ryuu para a API '{name}'")
-                    # O arquivo já contém 'session=...', então usamos direto
-                    headers["Cookie"] = cookie_content
-                    # Headers adicionais para simular navegador e evitar bloqueio
-                    headers["Referer"] = "https://generator.ryuu.lol/"
-                    headers["Authority"] = "generator.ryuu.lol"
-                    headers["Accept"] = "text/html,application/xhtml+xml,application/xml;q=0.9,image/avif,image/webp,image/apng,*/*;q=0.8"
-                    headers["Upgrade-Insecure-Requests"] = "1"
-                    headers["Sec-Fetch-Dest"] = "document"
-                    headers["Sec-Fetch-Mode"] = "navigate"
-                    headers["Sec-Fetch-Site"] = "same-origin"
-                else:
-                    logger.warn("LuaTools: API Ryuu detectada, mas 'data/ryuu_cookie.txt' não encontrado ou vazio!")
-            # -------------------------------------
 
+        for index, code in outcome.statuses.items():
+            logger.log(f"LuaTools: API '{names[index]}' status={code}")
+            if code == unavailable_codes[index]:
+                record_api_result(names[index], "miss", outcome.elapsed.get(index, 0.0))
+                record_api_miss(names[index], remaining[index].get("url", ""), appid)
+                continue
+            record_api_result(names[index], "error", outcome.elapsed.get(index, 0.0))
+            if index == resume_index and code == 416:
+                _discard_partial(dest_path)
+            if "ryuu.lol" in urls[index] and code in (401, 403):
+                logger.warn(f"LuaTools: Acesso negado no Ryuu ({code}). Verifique se o cookie expirou.")
+        for index, error in outcome.errors.items():
+            logger.warn(f"LuaTools: API '{names[index]}' failed with error: {error}")
+            record_api_result(names[index], "error", outcome.elapsed.get(index, 0.0))
+        for index in outcome.pending:
+            if index in outcome.elapsed:
+                record_api_result(names[index], "slow", outcome.elapsed[index])
+
+        if outcome.winner is None or outcome.response is None:
             if _is_download_cancelled(appid):
-                logger.log(f"LuaTools: Download cancelled before contacting API '{name}'")
-                return
+                logger.log(f"LuaTools: Download cancelled while probing APIs for appid={appid}")
+                return None
+            break
+
+        winner = outcome.winner
+        logger.log(f"LuaTools: API '{names[winner]}' status={outcome.response.status_code} (selected)")
+        _record_phase(appid, "checking", time.monotonic() - race_started)
+        if winner in outcome.elapsed:
+            _record_phase(appid, "ttfb", outcome.elapsed[winner])
+            record_sample("ttfbSeconds", outcome.elapsed[winner], names[winner])
+        try:
+            result, fetched = _consume_api_response(
+                appid,
+                names[winner],
+                urls[winner],
+                outcome.response,
+                dest_path,
+                resume_offset if winner == resume_index else 0,
+            )
+        finally:
+            outcome.response.close()
+        # A winner whose body was unusable counts against the API like any other error.
+        record_api_result(
+            names[winner], "success" if result in ("ready", "done") else "error", outcome.elapsed.get(winner, 0.0)
+        )
+        if result in ("ready", "done"):
+            return fetched
 
-            with client.stream("GET", url, headers=headers, follow_redirects=True, timeout=30) as resp:
-                code = resp.status_code
-                logger.log(f"LuaTools: API '{name}' status={code}")
-                if code == unavailable_code:
-                    continue
-                if code != success_code:
-                    if "ryuu.lol" in url and (code == 403 or code == 401):
-                        logger.warn(f"LuaTools: Acesso negado no Ryuu ({code}). Verifique se o cookie expirou.")
-                    continue
+        pending = [api for index, api in enumerate(remaining) if index in outcome.pending]
+        if result == "resume" and resume_attempts < API_RESUME_ATTEMPTS:
+            resume_attempts += 1
+            remaining = [remaining[winner]] + pending
+        else:
+            remaining = pending
 
-                total = int(resp.headers.get("Content-Length", "0") or "0")
-                _set_download_state(appid, {"status": "downloading", "bytesRead": 0, "totalBytes": total})
+    _set_download_state(appid, {"status": "failed", "error": "Not available on any API"})
+    return None
+
+
+@dataclass
+class AddJob:
+    """One appid moving through the add pipeline."""
+
+    appid: int
+    force_reprobe: bool = False
+    offline: bool = False
+    fetched: Optional[FetchedBundle] = None
+    stage_seconds: Dict[str, float] = field(default_factory=dict)
+    finished: threading.Event = field(default_factory=threading.Event)
+
+    def done(self) -> bool:
+        return self.finished.is_set()
+
+
+def _get_add_pipeline() -> Dict[str, PipelineStage]:
+    """Start the add stages on first use.
+
+    Downloads run ADD_MAX_CONCURRENCY wide; the launcher and install stages
+    sit behind bounded queues so a batch keeps downloading the next appids
+    while earlier ones are in the launcher or being written to stplug-in,
+    without buffering more than a few bundles ahead of a slow stage.
+    """
+    global ADD_PIPELINE
+    if ADD_PIPELINE is None:
+        ADD_PIPELINE = {
+            "download": PipelineStage(
+                "download", _download_stage, ADD_MAX_CONCURRENCY, on_drop=_finish_add_job
+            ).start(),
+            "launcher": PipelineStage(
+                "launcher", _launcher_stage, LAUNCHER_MAX_CONCURRENCY, ADD_STAGE_QUEUE_SIZE, on_drop=_finish_add_job
+            ).start(),
+            "install": PipelineStage(
+                "install", _install_stage, ADD_INSTALL_WORKERS, ADD_STAGE_QUEUE_SIZE, on_drop=_finish_add_job
+            ).start(),
+        }
+    return ADD_PIPELINE
+
+
+def _forward_add_job(job: AddJob, stage: str) -> None:
+    pipeline = ADD_PIPELINE
+    if pipeline is None or not pipeline[stage].put(job):
+        _finish_add_job(job)
+
+
+def _time_add_stage(job: AddJob, stage: str, started: float) -> None:
+    job.stage_seconds[stage] = round(job.stage_seconds.get(stage, 0.0) + time.monotonic() - started, 3)
+    _set_download_state(job.appid, {"stageSeconds": dict(job.stage_seconds)})
+
+
+def _finish_add_job(job: AddJob) -> None:
+    if job.fetched is not None:
+        job.fetched.close()
+        job.fetched = None
+    with ADD_JOBS_LOCK:
+        if ADD_JOBS.get(job.appid) is job:
+            del ADD_JOBS[job.appid]
+    job.finished.set()
+
+
+def _install_stage_failed(job: AddJob, exc: Exception) -> None:
+    retry = _install_failed(job.appid, job.fetched, exc) and not job.offline
+    job.fetched.close()
+    job.fetched = None
+    if retry:
+        logger.log(f"LuaTools: Retrying appid={job.appid} from the APIs after the cached bundle failed")
+        _set_download_state(job.appid, {"status": "queued", "cached": False, "error": None})
+        _forward_add_job(job, "download")
+        return
+    _finish_add_job(job)
 
-                with open(dest_path, "wb") as output:
-                    for chunk in resp.iter_bytes():
-                        if not chunk:
-                            continue
-                        if _is_download_cancelled(appid):
-                            logger.log(f"LuaTools: Download cancelled mid-stream for appid={appid}")
-                            raise RuntimeError("cancelled")
-                        output.write(chunk)
-                        state = _get_download_state(appid)
-                        read = int(state.get("bytesRead", 0)) + len(chunk)
-                        _set_download_state(appid, {"bytesRead": read})
-                        if _is_download_cancelled(appid):
-                            logger.log(f"LuaTools: Download cancelled after writing chunk for appid={appid}")
-                            raise RuntimeError("cancelled")
-                logger.log(f"LuaTools: Download complete -> {dest_path}")
-
-                if _is_download_cancelled(appid):
-                    logger.log(f"LuaTools: Download marked cancelled after completion for appid={appid}")
-                    raise RuntimeError("cancelled")
 
-                try:
-                    with open(dest_path, "rb") as fh:
-                        magic = fh.read(4)
-                        if magic not in (b"PK\x03\x04", b"PK\x05\x06", b"PK\x07\x08"):
-                            file_size = os.path.getsize(dest_path)
-                            with open(dest_path, "rb") as check_f:
-                                preview = check_f.read(512)
-                                content_preview = preview[:100].decode("utf-8", errors="ignore")
-                            logger.warn(
-                                f"LuaTools: API '{name}' returned non-zip file (magic={magic.hex()}, size={file_size}, preview={content_preview[:50]})"
-                            )
-                            if "Login required" in content_preview or "Sign in" in content_preview:
-                                logger.error("LuaTools: O site Ryuu pediu login. O cookie é inválido.")
-                            try:
-                                os.remove(dest_path)
-                            except Exception:
-                                pass
-                            continue
-                except FileNotFoundError:
-                    logger.warn("LuaTools: Downloaded file not found after download")
-                    continue
-                except Exception as validation_exc:
-                    logger.warn(f"LuaTools: File validation failed for API '{name}': {validation_exc}")
-                    try:
-                        os.remove(dest_path)
-                    except Exception:
-                        pass
-                    continue
+def _download_stage(job: AddJob) -> None:
+    appid = job.appid
+    if _is_download_cancelled(appid):
+        logger.log(f"LuaTools: Skipping queued add for appid={appid}, it was cancelled")
+        _finish_add_job(job)
+        return
+    _set_download_state(appid, {"stage": "download"})
+    started = time.monotonic()
+    try:
+        job.fetched = _fetch_bundle(appid, job.force_reprobe, job.offline)
+    except Exception as exc:
+        logger.warn(f"LuaTools: Add job crashed for appid={appid}: {exc}")
+        _set_download_state(appid, {"status": "failed", "error": str(exc)})
+    finally:
+        _time_add_stage(job, "download", started)
+    if job.fetched is None:
+        _finish_add_job(job)
+        return
+    _set_download_state(appid, {"stage": "launcher"})
+    _forward_add_job(job, "launcher")
 
-                try:
-                    if _is_download_cancelled(appid):
-                        logger.log(f"LuaTools: Processing aborted due to cancellation for appid={appid}")
-                        raise RuntimeError("cancelled")
-                    _set_download_state(appid, {"status": "processing"})
-                    _process_and_install_lua(appid, dest_path)
-                    if _is_download_cancelled(appid):
-                        logger.log(f"LuaTools: Installation complete but marked cancelled for appid={appid}")
-                        raise RuntimeError("cancelled")
-                    try:
-                        fetched_name = _fetch_app_name(appid) or f"UNKNOWN ({appid})"
-                        _append_loaded_app(appid, fetched_name)
-                        _log_appid_event(f"ADDED - {name}", appid, fetched_name)
-                    except Exception:
-                        pass
-                    _set_download_state(appid, {"status": "done", "success": True, "api": name})
-                    return
-                except Exception as install_exc:
-                    if isinstance(install_exc, RuntimeError) and str(install_exc) == "cancelled":
-                        try:
-                            if os.path.exists(dest_path):
-                                os.remove(dest_path)
-                        except Exception:
-                            pass
-                        logger.log(f"LuaTools: Cancelled download cleanup complete for appid={appid}")
-                        return
-                    logger.warn(f"LuaTools: Processing failed -> {install_exc}")
-                    _set_download_state(
-                        appid, {"status": "failed", "error": f"Processing failed: {install_exc}"}
-                    )
-                    try:
-                        os.remove(dest_path)
-                    except Exception:
-                        pass
-                    return
-        except RuntimeError as cancel_exc:
-            if str(cancel_exc) == "cancelled":
-                try:
-                    if os.path.exists(dest_path):
-                        os.remove(dest_path)
-                except Exception:
-                    pass
-                logger.log(f"LuaTools: Download cancelled and cleaned up for appid={appid}")
-                return
-            logger.warn(f"LuaTools: Runtime error during download for appid={appid}: {cancel_exc}")
-            _set_download_state(appid, {"status": "failed", "error": str(cancel_exc)})
-            return
-        except Exception as err:
-            logger.warn(f"LuaTools: API '{name}' failed with error: {err}")
-            continue
 
-    _set_download_state(appid, {"status": "failed", "error": "Not available on any API"})
+def _launcher_stage(job: AddJob) -> None:
+    started = time.monotonic()
+    try:
+        _launcher_step(job.appid, job.fetched)
+    except Exception as exc:
+        _install_stage_failed(job, exc)
+        return
+    finally:
+        _time_add_stage(job, "launcher", started)
+    _set_download_state(job.appid, {"stage": "install"})
+    _forward_add_job(job, "install")
 
 
-def start_add_via_luatools(appid: int) -> str:
+def _install_stage(job: AddJob) -> None:
+    started = time.monotonic()
+    try:
+        _install_step(job.appid, job.fetched)
+    except Exception as exc:
+        _install_stage_failed(job, exc)
+        return
+    finally:
+        _time_add_stage(job, "install", started)
+    _finish_add_job(job)
+
+
+def _submit_add_job(appid: int, force_reprobe: bool, offline: bool = False) -> str:
+    """Queue an add for ``appid``.
+
+    Returns ``"queued"``, ``"joined"`` when an add for the same appid is
+    already in flight, or ``"cancelling"`` when that in-flight add was
+    cancelled but has not exited yet (both would write the same zip).
+    """
+    with ADD_JOBS_LOCK:
+        job = ADD_JOBS.get(appid)
+        if job is not None and not job.done():
+            return "cancelling" if _is_download_cancelled(appid) else "joined"
+        DOWNLOAD_JOBS.reset(appid, {"status": "queued", "stage": "download"})
+        job = AddJob(appid, force_reprobe, offline)
+        ADD_JOBS[appid] = job
+        _get_add_pipeline()
+    _forward_add_job(job, "download")
+    return "queued"
+
+
+def get_add_pipeline_stats() -> Dict[str, Dict[str, Any]]:
+    """Queue depth, worker use and timing for each add stage."""
+    pipeline = ADD_PIPELINE
+    if pipeline is None:
+        return {}
+    return {name: stage.stats() for name, stage in pipeline.items()}
+
+
+def start_add_via_luatools(appid: int, force_reprobe: bool = False, offline: bool = False) -> str:
     try:
         appid = int(appid)
     except Exception:
         return json.dumps({"success": False, "error": "Invalid appid"})
 
-    logger.log(f"LuaTools: StartAddViaLuaTools appid={appid}")
-    _set_download_state(appid, {"status": "queued", "bytesRead": 0, "totalBytes": 0})
-    thread = threading.Thread(target=_download_zip_for_app, args=(appid,), daemon=True)
-    thread.start()
+    force_reprobe = parse_flag(force_reprobe)
+    offline = parse_flag(offline)
+    logger.log(f"LuaTools: StartAddViaLuaTools appid={appid} forceReprobe={force_reprobe} offline={offline}")
+    result = _submit_add_job(appid, force_reprobe, offline)
+    if result == "cancelling":
+        return json.dumps({"success": False, "error": "Previous download is still being cancelled, try again"})
+    if result == "joined":
+        logger.log(f"LuaTools: Add for appid={appid} already in progress, joining it")
+        return json.dumps({"success": True, "deduplicated": True})
+    return json.dumps({"success": True})
+
+
+def start_add_via_luatools_batch(appids: Any, force_reprobe: bool = False, offline: bool = False) -> str:
+    parsed = parse_appid_list(appids)
+    if not parsed:
+        return json.dumps({"success": False, "error": "No valid appids"})
+
+    force_reprobe = parse_flag(force_reprobe)
+    offline = parse_flag(offline)
+    joined = [appid for appid in parsed if _submit_add_job(appid, force_reprobe, offline) != "queued"]
+    # Resolve the batch's names up front in a few multi-appid store requests;
+    # the install steps then find them cached (or join the pending lookup).
+    threading.Thread(target=fetch_app_names, args=(parsed,), daemon=True, name="LuaTools-batch-names").start()
+    batch_id = uuid.uuid4().hex[:12]
+    with ADD_JOBS_LOCK:
+        ADD_BATCHES[batch_id] = parsed
+        while len(ADD_BATCHES) > ADD_BATCH_HISTORY:
+            ADD_BATCHES.popitem(last=False)
+    logger.log(
+        f"LuaTools: StartAddViaLuaToolsBatch id={batch_id} appids={len(parsed)} "
+        f"joined={len(joined)} concurrency={ADD_MAX_CONCURRENCY}"
+    )
+    return json.dumps({"success": True, "batchId": batch_id, "appids": parsed, "deduplicated": joined})
+
+
+def get_add_batch_status(batch_id: str = "", appids: Any = None) -> str:
+    with ADD_JOBS_LOCK:
+        batch = list(ADD_BATCHES.get(str(batch_id or ""), []))
+    if not batch:
+        batch = parse_appid_list(appids) if appids else []
+    if not batch:
+        return json.dumps({"success": False, "error": "Unknown batch"})
+
+    by_status: Dict[str, int] = {}
+    totals: Dict[str, Any] = {"count": len(batch), "bytesRead": 0, "totalBytes": 0, "byStatus": by_status}
+    states: Dict[str, Dict[str, Any]] = {}
+    for appid in batch:
+        state = _get_download_state(appid)
+        status = str(state.get("status") or "unknown")
+        by_status[status] = by_status.get(status, 0) + 1
+        totals["bytesRead"] += int(state.get("bytesRead", 0) or 0)
+        totals["totalBytes"] += int(state.get("totalBytes", 0) or 0)
+        states[str(appid)] = state
+    finished = sum(by_status.get(status, 0) for status in ("done", "failed", "cancelled"))
+    totals["finished"] = finished
+    totals["pending"] = len(batch) - finished
+    return json.dumps(
+        {
+            "success": True,
+            "batchId": batch_id,
+            "states": states,
+            "totals": totals,
+            "pipeline": get_add_pipeline_stats(),
+        }
+    )
+
+
+def get_add_perf_stats() -> str:
+    """Rolling p50/p95/max per add phase and per API, plus pipeline stage stats."""
+    return json.dumps({"success": True, **get_perf_snapshot(), "pipeline": get_add_pipeline_stats()})
+
+
+def reset_add_perf_stats() -> str:
+    """Drop the recorded samples so the next GetAddPerfStats covers only later adds."""
+    reset_perf_stats()
     return json.dumps({"success": True})
 
 
+def shutdown_add_workers() -> None:
+    """Stop accepting add jobs and drop the ones still waiting in a stage queue."""
+    global ADD_PIPELINE
+    pipeline = ADD_PIPELINE
+    ADD_PIPELINE = None
+    if pipeline is not None:
+        for stage in pipeline.values():
+            stage.stop()
+
+
 def get_add_status(appid: int) -> str:
     try:
         appid = int(appid)
@@ -910,7 +1815,7 @@ def cancel_add_via_luatools(appid: int) -> str:
     if not state or state.get("status") in {"done", "failed"}:
         return json.dumps({"success": True, "message": "Nothing to cancel"})
 
-    _set_download_state(appid, {"status": "cancelled", "error": "Cancelled by user"})
+    DOWNLOAD_JOBS.cancel(appid, {"status": "cancelled", "error": "Cancelled by user"})
     logger.log(f"LuaTools: Cancellation requested for appid={appid}")
     return json.dumps({"success": True})
 
@@ -943,10 +1848,9 @@ def get_installed_lua_scripts() -> str:
                         # Check if it's disabled
                         is_disabled = filename.endswith(".lua.disabled")
 
-                        # Try to get game name from cache (no API calls during listing)
-                        game_name = ""
-                        with APP_NAME_CACHE_LOCK:
-                            game_name = APP_NAME_CACHE.get(appid, "")
+                        # Try to get game name from cache or Steam's appinfo (no API calls during listing)
+                        app_info = APPINFO_CACHE.info(appid)
+                        game_name = APP_NAME_STORE.get(appid) or (app_info or {}).get("name") or ""
 
                         # Fallback to loaded_apps file if not in cache
                         # (_get_loaded_app_name also checks applist as fallback)
@@ -976,6 +1880,9 @@ def get_installed_lua_scripts() -> str:
                             "modifiedDate": formatted_date,
                             "path": file_path
                         }
+                        if app_info:
+                            script_info["appType"] = app_info["type"]
+                            script_info["parentAppid"] = app_info["parent"]
 
                         installed_scripts.append(script_info)
 
@@ -1064,13 +1971,19 @@ __all__ = [
     "delete_luatools_for_app",
     "dismiss_loaded_apps",
     "fetch_app_name",
+    "fetch_app_names",
     "get_add_status",
     "get_icon_data_url",
     "get_installed_lua_scripts",
     "has_luatools_for_app",
     "init_applist",
+    "get_add_batch_status",
+    "get_add_perf_stats",
+    "reset_add_perf_stats",
     "read_loaded_apps",
+    "shutdown_add_workers",
     "start_add_via_luatools",
+    "start_add_via_luatools_batch",
     "save_ryu_cookie",
     "update_morrenus_key",
     "save_launcher_path_config",
@@ -1078,4 +1991,8 @@ __all__ = [
     "browse_for_launcher",
     "init_games_db",
     "get_games_database",
+    "get_games_database_version",
+    "get_game_status",
+    "get_game_statuses",
+    "query_games_db",
 ]
@@ -0,0 +1,155 @@
+"""Availability of Generic / Online fix archives, with a persistent TTL cache.
+
+Fixes are published as ``files.luatools.work/<folder>/<appid>.zip``; a HEAD
+request tells whether one exists. Answers are remembered per (fix kind,
+appid) in ``backend/data/fix_cache.json``: found archives for
+FIX_CACHE_TTL_SECONDS, 404s for FIX_CACHE_NEGATIVE_TTL_SECONDS. Errors and
+other statuses are not cached, so the next check asks again.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import httpx  # type: ignore
+
+from config import (
+    FIX_CACHE_FILE,
+    FIX_CACHE_FLUSH_SECONDS,
+    FIX_CACHE_MAX_ENTRIES,
+    FIX_CACHE_NEGATIVE_TTL_SECONDS,
+    FIX_CACHE_TTL_SECONDS,
+    FIX_PROBE_TIMEOUT_SECONDS,
+)
+from logger import logger
+from paths import data_path
+from utils import read_json, write_json_atomic
+
+FIX_BASE_URL = "https://files.luatools.work"
+# Response key of each fix kind -> folder on files.luatools.work
+FIX_KINDS = {"genericFix": "GameBypasses", "onlineFix": "OnlineFix1"}
+_NEGATIVE_STATUSES = (404, 410)
+
+
+def fix_url(kind: str, appid: int) -> str:
+    return f"{FIX_BASE_URL}/{FIX_KINDS[kind]}/{int(appid)}.zip"
+
+
+class FixCache:
+    """(kind, appid) -> ``{"status", "size", "etag", "checked"}`` with per-entry expiry."""
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # "<kind>|<appid>" -> [expires_at, status, size, etag, checked]
+        self._entries: Optional[Dict[str, list]] = None
+        self._dirty = False
+        self._last_flush = 0.0
+
+    @staticmethod
+    def _key(kind: str, appid: int) -> str:
+        return f"{kind}|{int(appid)}"
+
+    def _load_locked(self) -> Dict[str, list]:
+        if self._entries is None:
+            raw = read_json(self._path)
+            entries = raw.get("entries") if isinstance(raw, dict) else None
+            self._entries = {}
+            if isinstance(entries, dict):
+                now = time.time()
+                for key, value in entries.items():
+                    try:
+                        if float(value[0]) > now:
+                            self._entries[str(key)] = [
+                                float(value[0]), int(value[1]), int(value[2]), str(value[3]), float(value[4])
+                            ]
+                    except (TypeError, ValueError, IndexError):
+                        continue
+        return self._entries
+
+    def get(self, kind: str, appid: int) -> Optional[Dict[str, Any]]:
+        """The cached probe result, or None if unknown or expired."""
+        with self._lock:
+            entry = self._load_locked().get(self._key(kind, appid))
+            if entry is None or entry[0] <= time.time():
+                return None
+            return {"status": entry[1], "size": entry[2], "etag": entry[3], "checked": entry[4]}
+
+    def put(self, kind: str, appid: int, status: int, size: int = 0, etag: str = "") -> None:
+        if status == 200:
+            ttl = FIX_CACHE_TTL_SECONDS
+        elif status in _NEGATIVE_STATUSES:
+            ttl = FIX_CACHE_NEGATIVE_TTL_SECONDS
+        else:
+            return
+        now = time.time()
+        with self._lock:
+            entries = self._load_locked()
+            entries[self._key(kind, appid)] = [now + ttl, int(status), int(size), str(etag or ""), now]
+            if len(entries) > FIX_CACHE_MAX_ENTRIES:
+                for key in sorted(entries, key=lambda key: entries[key][0])[: len(entries) - FIX_CACHE_MAX_ENTRIES]:
+                    del entries[key]
+            self._dirty = True
+            due = now - self._last_flush >= FIX_CACHE_FLUSH_SECONDS
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the cache to disk if it changed since the last write."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty or self._entries is None:
+                    return
+                now = time.time()
+                entries = {key: value for key, value in self._entries.items() if value[0] > now}
+                self._dirty = False
+                self._last_flush = now
+            if not write_json_atomic(self._path, {"version": 1, "entries": entries}):
+                logger.warn("LuaTools: Failed to persist fix availability cache")
+
+    def stats(self) -> Dict[str, int]:
+        now = time.time()
+        with self._lock:
+            entries = [value for value in self._load_locked().values() if value[0] > now]
+        return {"entries": len(entries), "available": sum(1 for value in entries if value[1] == 200)}
+
+
+FIX_CACHE = FixCache(data_path(FIX_CACHE_FILE))
+
+
+def probe_fix(
+    client: httpx.Client, kind: str, appid: int, use_cache: bool = True, verbose: bool = True
+) -> Tuple[Dict[str, Any], bool]:
+    """HEAD the ``kind`` fix archive of ``appid``: ``(result, from_cache)``.
+
+    ``result`` has the HTTP ``status`` (0 when the request failed), the
+    archive ``size`` from Content-Length and its ``etag``. Batch callers pass
+    ``verbose=False`` to log only failures.
+    """
+    if use_cache:
+        cached = FIX_CACHE.get(kind, appid)
+        if cached is not None:
+            return cached, True
+    url = fix_url(kind, appid)
+    result: Dict[str, Any] = {"status": 0, "size": 0, "etag": ""}
+    try:
+        resp = client.head(url, follow_redirects=True, timeout=FIX_PROBE_TIMEOUT_SECONDS)
+        result["status"] = resp.status_code
+        try:
+            result["size"] = int(resp.headers.get("Content-Length") or 0)
+        except ValueError:
+            pass
+        result["etag"] = str(resp.headers.get("ETag", "") or "")
+        if verbose:
+            logger.log(f"LuaTools: {kind} check ({url}) for {appid} -> {resp.status_code}")
+    except Exception as exc:
+        logger.warn(f"LuaTools: {kind} check failed for {appid}: {exc}")
+    FIX_CACHE.put(kind, appid, result["status"], result["size"], result["etag"])
+    result["checked"] = time.time()
+    return result, False
+
+
+__all__ = ["FIX_CACHE", "FIX_KINDS", "FixCache", "fix_url", "probe_fix"]
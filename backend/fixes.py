@@ -5,32 +5,37 @@ from __future__ import annotations
 import json
 import os
 import threading
+import time
+import uuid
 import zipfile
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
+from config import FIX_SCAN_CONCURRENCY, FIX_SCAN_HISTORY
 from downloads import fetch_app_name
-from http_client import ensure_http_client
+from fix_cache import FIX_CACHE, FIX_KINDS, fix_url, probe_fix
+from http_client import HTTP2_AVAILABLE, create_pooled_client, ensure_http_client
+from job_progress import JobProgressTable
 from logger import logger
-from utils import ensure_temp_download_dir
-from steam_utils import get_game_install_path_response
+from utils import ensure_temp_download_dir, parse_appid_list, parse_flag
+from steam_utils import get_game_install_path_response, list_installed_apps
 
-FIX_DOWNLOAD_STATE: Dict[int, Dict[str, any]] = {}
-FIX_DOWNLOAD_LOCK = threading.Lock()
+FIX_DOWNLOAD_JOBS = JobProgressTable()
 UNFIX_STATE: Dict[int, Dict[str, any]] = {}
 UNFIX_LOCK = threading.Lock()
+# Runs the HEAD probes of check_for_fixes, one worker per fix kind; started on first use
+FIX_PROBE_POOL: Optional[ThreadPoolExecutor] = None
+FIX_PROBE_POOL_LOCK = threading.Lock()
 
 
 def _set_fix_download_state(appid: int, update: dict) -> None:
-    with FIX_DOWNLOAD_LOCK:
-        state = FIX_DOWNLOAD_STATE.get(appid) or {}
-        state.update(update)
-        FIX_DOWNLOAD_STATE[appid] = state
+    FIX_DOWNLOAD_JOBS.update(appid, update)
 
 
 def _get_fix_download_state(appid: int) -> dict:
-    with FIX_DOWNLOAD_LOCK:
-        return FIX_DOWNLOAD_STATE.get(appid, {}).copy()
+    return FIX_DOWNLOAD_JOBS.get(appid)
 
 
 def _set_unfix_state(appid: int, update: dict) -> None:
@@ -45,60 +50,232 @@ def _get_unfix_state(appid: int) -> dict:
         return UNFIX_STATE.get(appid, {}).copy()
 
 
-def check_for_fixes(appid: int) -> str:
+def _fix_status(kind: str, appid: int, probe: Dict[str, Any], cached: bool) -> Dict[str, Any]:
+    status = int(probe.get("status") or 0)
+    entry: Dict[str, Any] = {"status": status, "available": status == 200, "cached": cached}
+    if status == 200:
+        entry["url"] = fix_url(kind, appid)
+        if probe.get("size"):
+            entry["size"] = probe["size"]
+    return entry
+
+
+def _fix_probe_pool() -> ThreadPoolExecutor:
+    global FIX_PROBE_POOL
+    with FIX_PROBE_POOL_LOCK:
+        if FIX_PROBE_POOL is None:
+            FIX_PROBE_POOL = ThreadPoolExecutor(max_workers=len(FIX_KINDS), thread_name_prefix="LuaTools-fixcheck")
+        return FIX_PROBE_POOL
+
+
+def shutdown_fix_workers() -> None:
+    """Stop the fix probe pool; probes already running finish on their own."""
+    global FIX_PROBE_POOL
+    with FIX_PROBE_POOL_LOCK:
+        pool = FIX_PROBE_POOL
+        FIX_PROBE_POOL = None
+    if pool is not None:
+        pool.shutdown(wait=False, cancel_futures=True)
+
+
+def check_for_fixes(appid: int, refresh: bool = False) -> str:
+    """Whether Generic / Online fixes exist for ``appid``.
+
+    Cached HEAD results are answered without network access (``refresh``
+    skips them). The remaining HEADs run in parallel with the game name
+    lookup, so a cold check costs about one round trip.
+    """
     try:
         appid = int(appid)
     except Exception:
         return json.dumps({"success": False, "error": "Invalid appid"})
 
-    client = ensure_http_client("LuaTools: CheckForFixes")
-    result = {
-        "success": True,
-        "appid": appid,
-        "gameName": "",
-        "genericFix": {"status": 0, "available": False},
-        "onlineFix": {"status": 0, "available": False},
-    }
-
+    use_cache = not parse_flag(refresh)
+    probes: Dict[str, Tuple[Dict[str, Any], bool]] = {}
+    if use_cache:
+        for kind in FIX_KINDS:
+            cached = FIX_CACHE.get(kind, appid)
+            if cached is not None:
+                probes[kind] = (cached, True)
+    missing = [kind for kind in FIX_KINDS if kind not in probes]
+
+    futures = {}
+    if missing:
+        client = ensure_http_client("LuaTools: CheckForFixes")
+        pool = _fix_probe_pool()
+        futures = {kind: pool.submit(probe_fix, client, kind, appid, False) for kind in missing}
+
+    result = {"success": True, "appid": appid, "gameName": ""}
     try:
         result["gameName"] = fetch_app_name(appid) or f"Unknown Game ({appid})"
     except Exception as exc:
         logger.warn(f"LuaTools: Failed to fetch game name for {appid}: {exc}")
         result["gameName"] = f"Unknown Game ({appid})"
 
-    try:
-        generic_url = f"https://files.luatools.work/GameBypasses/{appid}.zip"
-        resp = client.head(generic_url, follow_redirects=True, timeout=10)
-        result["genericFix"]["status"] = resp.status_code
-        result["genericFix"]["available"] = resp.status_code == 200
-        if resp.status_code == 200:
-            result["genericFix"]["url"] = generic_url
-        logger.log(f"LuaTools: Generic fix check for {appid} -> {resp.status_code}")
-    except Exception as exc:
-        logger.warn(f"LuaTools: Generic fix check failed for {appid}: {exc}")
-
-    try:
-        online_url = f"https://files.luatools.work/OnlineFix1/{appid}.zip"
-        resp = client.head(online_url, follow_redirects=True, timeout=10)
-        logger.log(f"LuaTools: Online-fix check ({online_url}) for {appid} -> {resp.status_code}")
-        result["onlineFix"]["status"] = resp.status_code
-        result["onlineFix"]["available"] = resp.status_code == 200
-        if resp.status_code == 200:
-            result["onlineFix"]["url"] = online_url
-    except Exception as exc:
-        logger.warn(f"LuaTools: Online-fix check failed for {appid}: {exc}")
-        if result["onlineFix"]["status"] == 0:
-            result["onlineFix"]["status"] = 0
+    for kind, future in futures.items():
+        try:
+            probes[kind] = future.result()
+        except Exception as exc:
+            logger.warn(f"LuaTools: {kind} check failed for {appid}: {exc}")
+            probes[kind] = ({"status": 0}, False)
 
+    for kind in FIX_KINDS:
+        result[kind] = _fix_status(kind, appid, *probes[kind])
     return json.dumps(result)
 
 
+class FixScan:
+    """Progress and per-app results of one :func:`check_for_fixes_batch` run."""
+
+    def __init__(self, scan_id: str, appids: List[int], names: Dict[int, str]) -> None:
+        self.scan_id = scan_id
+        self.appids = appids
+        self.names = names
+        self.lock = threading.Lock()
+        self.results: Dict[int, Dict[str, Any]] = {appid: {} for appid in appids}
+        self.total = len(appids) * len(FIX_KINDS)
+        self.done = 0
+        self.from_cache = 0
+        self.errors = 0
+        self.status = "running"
+        self.started = time.monotonic()
+        self.elapsed = 0.0
+
+    def record(self, kind: str, appid: int, probe: Dict[str, Any], cached: bool) -> None:
+        entry = _fix_status(kind, appid, probe, cached)
+        with self.lock:
+            self.results[appid][kind] = entry
+            self.done += 1
+            self.from_cache += int(cached)
+            self.errors += int(entry["status"] == 0)
+
+    def finish(self) -> None:
+        with self.lock:
+            self.status = "done"
+            self.elapsed = time.monotonic() - self.started
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self.lock:
+            results = [
+                {"appid": appid, "name": self.names.get(appid, ""), **{kind: self.results[appid][kind] for kind in FIX_KINDS}}
+                for appid in self.appids
+                if len(self.results[appid]) == len(FIX_KINDS)
+            ]
+            elapsed = self.elapsed if self.status == "done" else time.monotonic() - self.started
+            return {
+                "success": True,
+                "scanId": self.scan_id,
+                "status": self.status,
+                "total": self.total,
+                "done": self.done,
+                "fromCache": self.from_cache,
+                "errors": self.errors,
+                "found": sum(1 for row in results if any(row[kind]["available"] for kind in FIX_KINDS)),
+                "elapsedSeconds": round(elapsed, 3),
+                "results": results,
+            }
+
+
+FIX_SCANS: "OrderedDict[str, FixScan]" = OrderedDict()
+FIX_SCANS_LOCK = threading.Lock()
+
+
+def _run_fix_scan(scan: FixScan, use_cache: bool) -> None:
+    missing: List[Tuple[str, int]] = []
+    for appid in scan.appids:
+        for kind in FIX_KINDS:
+            cached = FIX_CACHE.get(kind, appid) if use_cache else None
+            if cached is not None:
+                scan.record(kind, appid, cached, True)
+            else:
+                missing.append((kind, appid))
+
+    if missing:
+        workers = min(FIX_SCAN_CONCURRENCY, len(missing))
+        try:
+            with create_pooled_client(workers) as client, ThreadPoolExecutor(
+                max_workers=workers, thread_name_prefix="LuaTools-fixscan"
+            ) as pool:
+                futures = {
+                    pool.submit(probe_fix, client, kind, appid, False, False): (kind, appid)
+                    for kind, appid in missing
+                }
+                for future in as_completed(futures):
+                    kind, appid = futures[future]
+                    try:
+                        probe, cached = future.result()
+                    except Exception as exc:
+                        logger.warn(f"LuaTools: {kind} check failed for {appid}: {exc}")
+                        probe, cached = {"status": 0}, False
+                    scan.record(kind, appid, probe, cached)
+        except Exception as exc:
+            logger.warn(f"LuaTools: Fix scan {scan.scan_id} failed: {exc}")
+            for kind, appid in missing:
+                if kind not in scan.results[appid]:
+                    scan.record(kind, appid, {"status": 0}, False)
+        FIX_CACHE.flush()
+
+    scan.finish()
+    summary = scan.snapshot()
+    logger.log(
+        f"LuaTools: Fix scan {scan.scan_id} checked {len(scan.appids)} apps in {summary['elapsedSeconds']}s "
+        f"(requests={len(missing)} cached={summary['fromCache']} errors={summary['errors']} "
+        f"found={summary['found']} http2={HTTP2_AVAILABLE})"
+    )
+
+
+def check_for_fixes_batch(appids: Any = None, refresh: bool = False) -> str:
+    """Start a background fix availability scan; poll it with :func:`get_fix_scan_status`.
+
+    Without ``appids`` every app installed in a Steam library is scanned.
+    Cached answers are filled in first; the remaining HEADs run
+    FIX_SCAN_CONCURRENCY at a time on one pooled client and are written to
+    the fix availability cache.
+    """
+    if appids in (None, "", [], ()):
+        installed = list_installed_apps()
+        parsed = [app["appid"] for app in installed]
+        names = {app["appid"]: app["name"] for app in installed if app["name"]}
+        if not parsed:
+            return json.dumps({"success": False, "error": "No installed apps found"})
+    else:
+        parsed = parse_appid_list(appids)
+        names = {}
+        if not parsed:
+            return json.dumps({"success": False, "error": "No valid appids"})
+        if len(parsed) > 1:
+            wanted = set(parsed)
+            names = {app["appid"]: app["name"] for app in list_installed_apps() if app["appid"] in wanted and app["name"]}
+
+    scan = FixScan(uuid.uuid4().hex[:12], parsed, names)
+    with FIX_SCANS_LOCK:
+        FIX_SCANS[scan.scan_id] = scan
+        while len(FIX_SCANS) > FIX_SCAN_HISTORY:
+            FIX_SCANS.popitem(last=False)
+    threading.Thread(
+        target=_run_fix_scan, args=(scan, not parse_flag(refresh)), daemon=True, name="LuaTools-fixscan"
+    ).start()
+    logger.log(f"LuaTools: CheckForFixesBatch id={scan.scan_id} appids={len(parsed)} concurrency={FIX_SCAN_CONCURRENCY}")
+    return json.dumps({"success": True, "scanId": scan.scan_id, "appids": parsed, "total": scan.total})
+
+
+def get_fix_scan_status(scan_id: str) -> str:
+    """Progress of a fix scan plus the results of every app finished so far."""
+    with FIX_SCANS_LOCK:
+        scan = FIX_SCANS.get(str(scan_id or ""))
+    if scan is None:
+        return json.dumps({"success": False, "error": "Unknown scan"})
+    return json.dumps(scan.snapshot())
+
+
 def _download_and_extract_fix(appid: int, download_url: str, install_path: str, fix_type: str, game_name: str = ""):
     client = ensure_http_client("LuaTools: fix download")
     try:
         dest_root = ensure_temp_download_dir()
         dest_zip = os.path.join(dest_root, f"fix_{appid}.zip")
         _set_fix_download_state(appid, {"status": "downloading", "bytesRead": 0, "totalBytes": 0, "error": None})
+        progress = FIX_DOWNLOAD_JOBS.progress(appid)
+        cancelled = progress.cancelled
 
         logger.log(f"LuaTools: Downloading {fix_type} from {download_url}")
 
@@ -111,16 +288,11 @@ def _download_and_extract_fix(appid: int, download_url: str, install_path: str,
                 for chunk in resp.iter_bytes():
                     if not chunk:
                         continue
-                    state = _get_fix_download_state(appid)
-                    if state.get("status") == "cancelled":
+                    if cancelled.is_set():
                         logger.log(f"LuaTools: Fix download cancelled before writing chunk for {appid}")
                         raise RuntimeError("cancelled")
                     output.write(chunk)
-                    read = int(state.get("bytesRead", 0)) + len(chunk)
-                    _set_fix_download_state(appid, {"bytesRead": read})
-                    if _get_fix_download_state(appid).get("status") == "cancelled":
-                        logger.log(f"LuaTools: Fix download cancelled for {appid}")
-                        raise RuntimeError("cancelled")
+                    progress.bytes_read += len(chunk)
 
         logger.log(f"LuaTools: Download complete, extracting to {install_path}")
         _set_fix_download_state(appid, {"status": "extracting"})
@@ -135,7 +307,7 @@ def _download_and_extract_fix(appid: int, download_url: str, install_path: str,
                 parts = name.split("/")
                 if parts[0]:
                     top_level_entries.add(parts[0])
-            if _get_fix_download_state(appid).get("status") == "cancelled":
+            if cancelled.is_set():
                 logger.log(f"LuaTools: Fix extraction cancelled before start for {appid}")
                 raise RuntimeError("cancelled")
 
@@ -154,7 +326,7 @@ def _download_and_extract_fix(appid: int, download_url: str, install_path: str,
                                 output.write(source.read())
                             extracted_files.append(target_path.replace("\\", "/"))
                         source.close()
-                        if _get_fix_download_state(appid).get("status") == "cancelled":
+                        if cancelled.is_set():
                             logger.log(f"LuaTools: Fix extraction cancelled mid-process for {appid}")
                             raise RuntimeError("cancelled")
             else:
@@ -164,11 +336,11 @@ def _download_and_extract_fix(appid: int, download_url: str, install_path: str,
                         continue
                     archive.extract(member, install_path)
                     extracted_files.append(member.replace("\\", "/"))
-                    if _get_fix_download_state(appid).get("status") == "cancelled":
+                    if cancelled.is_set():
                         logger.log(f"LuaTools: Fix extraction cancelled mid-process for {appid}")
                         raise RuntimeError("cancelled")
 
-        if _get_fix_download_state(appid).get("status") == "cancelled":
+        if cancelled.is_set():
             logger.log(f"LuaTools: Fix cancelled after extraction for {appid}")
             raise RuntimeError("cancelled")
 
@@ -269,7 +441,7 @@ def apply_game_fix(appid: int, download_url: str, install_path: str, fix_type: s
 
     logger.log(f"LuaTools: ApplyGameFix appid={appid}, fixType={fix_type}")
 
-    _set_fix_download_state(appid, {"status": "queued", "bytesRead": 0, "totalBytes": 0, "error": None})
+    FIX_DOWNLOAD_JOBS.reset(appid, {"status": "queued", "bytesRead": 0, "totalBytes": 0, "error": None})
     thread = threading.Thread(
         target=_download_and_extract_fix, args=(appid, download_url, install_path, fix_type, game_name), daemon=True
     )
@@ -298,7 +470,7 @@ def cancel_apply_fix(appid: int) -> str:
     if not state or state.get("status") in {"done", "failed"}:
         return json.dumps({"success": True, "message": "Nothing to cancel"})
 
-    _set_fix_download_state(appid, {"status": "cancelled", "success": False, "error": "Cancelled by user"})
+    FIX_DOWNLOAD_JOBS.cancel(appid, {"status": "cancelled", "success": False, "error": "Cancelled by user"})
     logger.log(f"LuaTools: CancelApplyFix requested for appid={appid}")
     return json.dumps({"success": True})
 
@@ -663,9 +835,12 @@ __all__ = [
     "apply_game_fix",
     "cancel_apply_fix",
     "check_for_fixes",
+    "check_for_fixes_batch",
     "get_apply_fix_status",
+    "get_fix_scan_status",
     "get_installed_fixes",
     "get_unfix_status",
+    "shutdown_fix_workers",
     "unfix_game",
     "apply_linux_native_fix",
 ]
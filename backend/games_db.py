@@ -0,0 +1,189 @@
+"""Compact columnar form of the games database (``games.json``).
+
+``games.json`` maps appid strings to ``{"name", "playable", "denuvo",
+"of-available"}``. Held as parsed JSON that is one dict per game plus a
+string key; :class:`GamesTable` instead keeps a sorted ``uint32`` appid
+array, a signed byte ``playable`` column, one bitset per flag and a UTF-8
+names blob. Rows are turned back into the JSON shape only when asked for.
+"""
+
+from __future__ import annotations
+
+import json
+from array import array
+from bisect import bisect_left
+from typing import Any, Dict, Iterable, Iterator, List, Mapping, Optional, Sequence, Tuple
+
+# Stored in the playable column when the entry has no integer level
+_PLAYABLE_NONE = -128
+_FLAG_FIELDS = ("denuvo", "of-available")
+_KNOWN_FIELDS = ("name", "playable") + _FLAG_FIELDS
+_encode_string = json.encoder.encode_basestring_ascii  # type: ignore[attr-defined]
+
+
+class GamesTable:
+    """Read-only games database; build one with :meth:`from_json`."""
+
+    def __init__(
+        self,
+        appids: array,
+        playable: array,
+        flags: Dict[str, bytearray],
+        offsets: array,
+        names: bytes,
+        extras: Dict[int, Dict[str, Any]],
+    ) -> None:
+        self._appids = appids
+        self._playable = playable
+        self._flags = flags
+        self._offsets = offsets
+        self._names = names
+        # row -> fields that do not fit the columns (rare; kept verbatim)
+        self._extras = extras
+
+    @classmethod
+    def from_json(cls, data: Mapping[str, Any]) -> "GamesTable":
+        """Build a table from the parsed ``games.json`` object.
+
+        Keys that are not appids and values that are not objects are skipped;
+        when an appid repeats, the last entry wins. Missing fields read back
+        as ``playable: None`` and ``False`` flags.
+        """
+        rows: Dict[int, Dict[str, Any]] = {}
+        for key, entry in data.items():
+            if isinstance(entry, dict) and str(key).isdecimal() and int(key) <= 0xFFFFFFFF:
+                rows[int(key)] = entry
+
+        appids = array("I", sorted(rows))
+        playable = array("b")
+        flags = {field: bytearray((len(appids) + 7) // 8) for field in _FLAG_FIELDS}
+        offsets = array("I", [0])
+        names = bytearray()
+        extras: Dict[int, Dict[str, Any]] = {}
+        for row, appid in enumerate(appids):
+            entry = rows[appid]
+            extra = {key: value for key, value in entry.items() if key not in _KNOWN_FIELDS}
+
+            name = entry.get("name")
+            if not isinstance(name, str):
+                extra["name"] = name
+                name = ""
+            names += name.encode("utf-8")
+            offsets.append(len(names))
+
+            level = entry.get("playable")
+            if isinstance(level, int) and not isinstance(level, bool) and -127 <= level <= 127:
+                playable.append(level)
+            else:
+                playable.append(_PLAYABLE_NONE)
+                if "playable" in entry:
+                    extra["playable"] = level
+
+            for field in _FLAG_FIELDS:
+                value = entry.get(field, False)
+                if value is True:
+                    flags[field][row >> 3] |= 1 << (row & 7)
+                elif value is not False:
+                    extra[field] = value
+            if extra:
+                extras[row] = extra
+        return cls(appids, playable, flags, offsets, bytes(names), extras)
+
+    def __len__(self) -> int:
+        return len(self._appids)
+
+    def __contains__(self, appid: object) -> bool:
+        return self._row(appid) is not None
+
+    def _row(self, appid: Any) -> Optional[int]:
+        try:
+            appid = int(appid)
+        except (TypeError, ValueError):
+            return None
+        row = bisect_left(self._appids, appid)
+        if row < len(self._appids) and self._appids[row] == appid:
+            return row
+        return None
+
+    def _extra_level(self, row: int) -> Any:
+        return self._extras.get(row, {}).get("playable")
+
+    def _flag(self, field: str, row: int) -> bool:
+        return bool(self._flags[field][row >> 3] & (1 << (row & 7)))
+
+    def _name(self, row: int) -> str:
+        return self._names[self._offsets[row]:self._offsets[row + 1]].decode("utf-8")
+
+    def _entry(self, row: int) -> Dict[str, Any]:
+        level = self._playable[row]
+        entry: Dict[str, Any] = {
+            "name": self._name(row),
+            "playable": None if level == _PLAYABLE_NONE else level,
+        }
+        for field in _FLAG_FIELDS:
+            entry[field] = self._flag(field, row)
+        extra = self._extras.get(row)
+        if extra:
+            entry.update(extra)
+        return entry
+
+    def get(self, appid: Any) -> Optional[Dict[str, Any]]:
+        """The entry for ``appid`` in the ``games.json`` shape, or None."""
+        row = self._row(appid)
+        return None if row is None else self._entry(row)
+
+    def query(
+        self,
+        levels: Optional[Iterable[int]] = None,
+        denuvo: Optional[bool] = None,
+        of_available: Optional[bool] = None,
+        offset: int = 0,
+        limit: Optional[int] = None,
+    ) -> Tuple[int, List[Tuple[int, Dict[str, Any]]]]:
+        """Rows matching the filters in appid order: ``(total, page)``.
+
+        Filters are evaluated on the columns; only the rows on the requested
+        page are turned into dicts.
+        """
+        end = None if limit is None else offset + limit
+        rows: Sequence[int] = range(len(self._appids))
+        if levels is not None:
+            wanted = set(levels)
+            rows = [
+                row
+                for row, level in enumerate(self._playable)
+                if (level if level != _PLAYABLE_NONE else self._extra_level(row)) in wanted
+            ]
+        for field, value in zip(_FLAG_FIELDS, (denuvo, of_available)):
+            if value is not None:
+                bits, bit = self._flags[field], int(bool(value))
+                rows = [row for row in rows if (bits[row >> 3] >> (row & 7)) & 1 == bit]
+        page = [(self._appids[row], self._entry(row)) for row in rows[offset:end]]
+        return len(rows), page
+
+    def items(self) -> Iterator[Tuple[int, Dict[str, Any]]]:
+        for row in range(len(self._appids)):
+            yield self._appids[row], self._entry(row)
+
+    def to_json(self) -> str:
+        """Serialize back to the ``games.json`` object shape, keyed by appid."""
+        parts = []
+        for row, appid in enumerate(self._appids):
+            if row in self._extras:
+                body = json.dumps(self._entry(row))
+            else:
+                level = self._playable[row]
+                body = (
+                    f'{{"name": {_encode_string(self._name(row))}, '
+                    f'"playable": {"null" if level == _PLAYABLE_NONE else level}, '
+                    f'"denuvo": {"true" if self._flag("denuvo", row) else "false"}, '
+                    f'"of-available": {"true" if self._flag("of-available", row) else "false"}}}'
+                )
+            parts.append(f'"{appid}": {body}')
+        return "{" + ", ".join(parts) + "}"
+
+
+EMPTY_GAMES_TABLE = GamesTable.from_json({})
+
+
+__all__ = ["EMPTY_GAMES_TABLE", "GamesTable"]
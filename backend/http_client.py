@@ -1,12 +1,30 @@
 """Shared HTTP client management for the LuaTools backend."""
 
-from typing import Optional
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from email.utils import parsedate_to_datetime
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+from urllib.parse import urlsplit
 
 import httpx  # type: ignore
 
-from config import HTTP_TIMEOUT_SECONDS
+from config import (
+    HOST_RATE_LIMITS,
+    HTTP_TIMEOUT_SECONDS,
+    RATE_LIMIT_DEFAULT_BACKOFF_SECONDS,
+    RATE_LIMIT_MAX_WAIT_SECONDS,
+)
 from logger import logger
 
+try:
+    import h2  # type: ignore  # noqa: F401  (enables httpx's HTTP/2 support)
+
+    HTTP2_AVAILABLE = True
+except Exception:  # pragma: no cover - optional dependency
+    HTTP2_AVAILABLE = False
+
 _HTTP_CLIENT: Optional[httpx.Client] = None
 
 
@@ -45,3 +63,322 @@ def close_http_client(context: str = "") -> None:
         prefix = f"{context}: " if context else ""
         logger.log(f"{prefix}HTTPX client closed")
 
+
+def create_pooled_client(max_connections: int, timeout: float = HTTP_TIMEOUT_SECONDS) -> httpx.Client:
+    """A dedicated client for a burst of many small requests to the same host.
+
+    With the optional ``h2`` package the requests are multiplexed over one
+    HTTP/2 connection; without it they share a pool of up to
+    ``max_connections`` keep-alive HTTP/1.1 connections. The caller closes it.
+    """
+    max_connections = max(1, int(max_connections))
+    return httpx.Client(
+        http2=HTTP2_AVAILABLE,
+        timeout=timeout,
+        limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections),
+    )
+
+
+class RaceCancelledError(RuntimeError):
+    """Raised inside a race candidate's request once the race no longer needs it."""
+
+
+@dataclass
+class RaceOutcome:
+    """Result of :func:`race_streams`.
+
+    ``winner`` is the index of the accepted request (or ``None``) and
+    ``response`` its still-open streaming response, which the caller must
+    close. ``statuses``/``errors`` hold the definitive answers of the other
+    candidates; ``pending`` lists candidates that never answered because they
+    were not started or were cancelled once a winner was picked.
+    ``elapsed`` maps every answered candidate to its time to first byte, and
+    every cancelled candidate to how long it ran without answering.
+    """
+
+    winner: Optional[int] = None
+    response: Optional[httpx.Response] = None
+    statuses: Dict[int, int] = field(default_factory=dict)
+    errors: Dict[int, str] = field(default_factory=dict)
+    pending: Set[int] = field(default_factory=set)
+    elapsed: Dict[int, float] = field(default_factory=dict)
+
+
+def race_streams(
+    requests: List[httpx.Request],
+    accept: Callable[[int, httpx.Response], bool],
+    hedge_delay: Optional[float] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    on_start: Optional[Callable[[int], None]] = None,
+) -> RaceOutcome:
+    """Send ``requests`` on the shared client and keep the first accepted stream.
+
+    Candidates are started in order. The next one starts as soon as every
+    running candidate has answered without being accepted, or once
+    ``hedge_delay`` seconds have passed since the last start. ``None`` means
+    strictly sequential, ``0`` starts everything at once.
+
+    Once a winner is chosen (or ``should_stop`` ends the race) the other
+    candidates are cancelled: their sockets are shut down, which fails the
+    blocked request and drops its connection from the pool. Cancellation is
+    best-effort for a candidate that is still connecting or was sent on a
+    reused keep-alive connection: it stops at its next I/O step, or at its
+    own timeout. Responses that still arrive are closed immediately.
+    """
+    client = ensure_http_client("LuaTools: race")
+    outcome = RaceOutcome(pending=set(range(len(requests))))
+    lock = threading.Lock()
+    wake = threading.Event()
+    finished: Set[int] = set()
+    # Network stream each candidate is using, reported by httpcore's trace hook
+    streams: Dict[int, Any] = {}
+    cancelled = threading.Event()
+
+    def _tracer(index: int, chained: Optional[Callable[[str, Dict[str, Any]], None]]) -> Callable:
+        def _trace(event: str, info: Dict[str, Any]) -> None:
+            if chained is not None:
+                chained(event, info)
+            # Only raise before an I/O step starts, so httpcore still cleans up the connection.
+            if (
+                cancelled.is_set()
+                and index != outcome.winner
+                and event.endswith(".started")
+                and "response_closed" not in event
+            ):
+                raise RaceCancelledError(f"race candidate {index} cancelled")
+            stream = info.get("return_value")
+            if event.endswith(".complete") and hasattr(stream, "get_extra_info"):
+                # connect_tcp, then start_tls for https; the latest one owns the socket.
+                with lock:
+                    streams[index] = stream
+
+        return _trace
+
+    def _cancel_losers() -> None:
+        cancelled.set()
+        with lock:
+            targets = [
+                stream for index, stream in streams.items() if index not in finished and index != outcome.winner
+            ]
+        for stream in targets:
+            try:
+                stream.get_extra_info("socket").shutdown(socket.SHUT_RDWR)
+            except Exception:
+                pass
+
+    for index, request in enumerate(requests):
+        request.extensions["trace"] = _tracer(index, request.extensions.get("trace"))
+
+    def _attempt(index: int) -> None:
+        response: Optional[httpx.Response] = None
+        error = ""
+        started = time.monotonic()
+        try:
+            response = client.send(requests[index], stream=True, follow_redirects=True)
+        except Exception as exc:
+            error = str(exc) or exc.__class__.__name__
+        took = time.monotonic() - started
+
+        keep = False
+        with lock:
+            finished.add(index)
+            if outcome.winner is None:
+                outcome.elapsed[index] = took
+            if outcome.winner is not None:
+                # Lost the race: the answer is discarded and the candidate
+                # stays pending so a later round may still try it.
+                pass
+            elif response is None:
+                outcome.errors[index] = error
+                outcome.pending.discard(index)
+            elif not (should_stop and should_stop()) and accept(index, response):
+                keep = True
+                outcome.winner = index
+                outcome.response = response
+                outcome.pending.discard(index)
+            else:
+                outcome.statuses[index] = response.status_code
+                outcome.pending.discard(index)
+        if response is not None and not keep:
+            try:
+                response.close()
+            except Exception:
+                pass
+        wake.set()
+
+    next_index = 0
+    last_start = 0.0
+    start_times: Dict[int, float] = {}
+    while True:
+        with lock:
+            if outcome.winner is not None:
+                break
+            running = next_index - len(finished)
+        if should_stop and should_stop():
+            break
+        if next_index < len(requests):
+            due = running == 0
+            if not due and hedge_delay is not None:
+                due = time.monotonic() - last_start >= hedge_delay
+            if due:
+                index = next_index
+                next_index += 1
+                last_start = time.monotonic()
+                start_times[index] = last_start
+                if on_start:
+                    on_start(index)
+                threading.Thread(
+                    target=_attempt, args=(index,), daemon=True, name=f"LuaTools-race-{index}"
+                ).start()
+                continue
+        elif running == 0:
+            break
+
+        timeout = 0.2
+        if hedge_delay is not None and next_index < len(requests):
+            timeout = max(0.0, min(timeout, hedge_delay - (time.monotonic() - last_start)))
+        wake.wait(timeout)
+        wake.clear()
+
+    _cancel_losers()
+    with lock:
+        now = time.monotonic()
+        for index in outcome.pending:
+            if index in start_times and index not in outcome.elapsed:
+                outcome.elapsed[index] = now - start_times[index]
+        return RaceOutcome(
+            winner=outcome.winner,
+            response=outcome.response,
+            statuses=dict(outcome.statuses),
+            errors=dict(outcome.errors),
+            pending=set(outcome.pending),
+            elapsed=dict(outcome.elapsed),
+        )
+
+
+class RateLimitedError(RuntimeError):
+    """Raised when a host's rate limit would make a request wait too long."""
+
+
+class _TokenBucket:
+    __slots__ = ("rate", "burst", "tokens", "updated", "blocked_until", "lock")
+
+    def __init__(self, rate: float, burst: float) -> None:
+        self.rate = max(0.001, float(rate))
+        self.burst = max(1.0, float(burst))
+        self.tokens = self.burst
+        self.updated = time.monotonic()
+        self.blocked_until = 0.0
+        self.lock = threading.Lock()
+
+
+class HostRateLimiter:
+    """Token-bucket rate limits per host, shared by every caller of that host.
+
+    ``acquire`` reserves a token under the bucket's own lock and sleeps
+    outside it, so waiting for one host never blocks other hosts or any
+    unrelated lock held by the caller's module. A 429 (or a 503 with
+    ``Retry-After``) pauses the host for the advertised time.
+    """
+
+    def __init__(self, limits: Dict[str, Tuple[float, float]]) -> None:
+        self._limits = dict(limits)
+        self._buckets: Dict[str, _TokenBucket] = {}
+        self._lock = threading.Lock()
+
+    def _bucket(self, host: str) -> Optional[_TokenBucket]:
+        host = (host or "").lower()
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is not None:
+                return bucket
+            # "www.protondb.com" falls back to a limit configured for "protondb.com".
+            labels = host.split(".")
+            for index in range(len(labels) - 1):
+                limit = self._limits.get(".".join(labels[index:]))
+                if limit is not None:
+                    bucket = self._buckets[host] = _TokenBucket(*limit)
+                    return bucket
+        return None
+
+    def acquire(self, host: str, max_wait: Optional[float] = None) -> float:
+        """Wait for a request slot on ``host`` and return the seconds waited.
+
+        Raises :class:`RateLimitedError` instead of waiting longer than
+        ``max_wait`` (RATE_LIMIT_MAX_WAIT_SECONDS by default).
+        """
+        bucket = self._bucket(host)
+        if bucket is None:
+            return 0.0
+        limit = RATE_LIMIT_MAX_WAIT_SECONDS if max_wait is None else max_wait
+        with bucket.lock:
+            now = time.monotonic()
+            bucket.tokens = min(bucket.burst, bucket.tokens + (now - bucket.updated) * bucket.rate)
+            bucket.updated = now
+            wait = max(0.0, bucket.blocked_until - now)
+            # Tokens may go negative: each caller reserves the next free slot.
+            after_block = bucket.tokens + wait * bucket.rate
+            if after_block < 1.0:
+                wait += (1.0 - after_block) / bucket.rate
+            if wait > limit:
+                raise RateLimitedError(f"{host} is rate limited for another {wait:.1f}s")
+            bucket.tokens -= 1.0
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def penalize(self, host: str, seconds: float) -> None:
+        """Hold back every request to ``host`` for ``seconds``."""
+        bucket = self._bucket(host)
+        if bucket is None:
+            return
+        with bucket.lock:
+            bucket.blocked_until = max(bucket.blocked_until, time.monotonic() + max(0.0, seconds))
+        logger.warn(f"LuaTools: {host} asked to slow down, pausing requests for {seconds:.1f}s")
+
+    def observe(self, host: str, response: httpx.Response) -> Optional[float]:
+        """Apply a 429/503 ``Retry-After`` from ``response``; returns the pause, if any."""
+        if response.status_code != 429 and not (
+            response.status_code == 503 and "Retry-After" in response.headers
+        ):
+            return None
+        delay = parse_retry_after(response.headers.get("Retry-After"))
+        if delay is None:
+            delay = RATE_LIMIT_DEFAULT_BACKOFF_SECONDS
+        self.penalize(host, delay)
+        return delay
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds from a ``Retry-After`` header (delta-seconds or HTTP-date)."""
+    if not value:
+        return None
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except Exception:
+        return None
+
+
+RATE_LIMITER = HostRateLimiter(HOST_RATE_LIMITS)
+
+
+def limited_get(client: httpx.Client, url: str, **kwargs: Any) -> httpx.Response:
+    """``client.get`` paced by the shared per-host rate limiter.
+
+    A 429 is retried once if the host's ``Retry-After`` is short enough to
+    wait for; otherwise the 429 response is returned to the caller.
+    """
+    host = urlsplit(url).hostname or ""
+    for attempt in range(2):
+        RATE_LIMITER.acquire(host)
+        resp = client.get(url, **kwargs)
+        delay = RATE_LIMITER.observe(host, resp)
+        if delay is None or resp.status_code != 429 or attempt or delay > RATE_LIMIT_MAX_WAIT_SECONDS:
+            return resp
+        resp.close()
+    return resp
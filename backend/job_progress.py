@@ -0,0 +1,96 @@
+"""Per-job progress counters and cancellation flags for background workers."""
+
+from __future__ import annotations
+
+import threading
+from typing import Any, Dict
+
+
+class JobProgress:
+    """Byte counters and a cancellation flag for one download job.
+
+    Only the worker running the job writes the counters, so its chunk loop
+    updates them without taking a lock; status pollers read them through
+    :meth:`snapshot`. Cancellation is an :class:`threading.Event` so checking
+    it per chunk is a single flag read.
+    """
+
+    __slots__ = ("bytes_read", "total_bytes", "cancelled")
+
+    def __init__(self) -> None:
+        self.bytes_read = 0
+        self.total_bytes = 0
+        self.cancelled = threading.Event()
+
+    def is_cancelled(self) -> bool:
+        return self.cancelled.is_set()
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {"bytesRead": self.bytes_read, "totalBytes": self.total_bytes}
+
+
+class JobProgressTable:
+    """Status dicts plus :class:`JobProgress` counters keyed by appid.
+
+    Status transitions (queued, downloading, done, ...) are rare and go
+    through the lock; byte counters are written straight to the job's
+    :class:`JobProgress` and merged into the status only when polled.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self._states: Dict[int, Dict[str, Any]] = {}
+        self._progress: Dict[int, JobProgress] = {}
+
+    def progress(self, appid: int) -> JobProgress:
+        progress = self._progress.get(appid)
+        if progress is None:
+            with self._lock:
+                progress = self._progress.setdefault(appid, JobProgress())
+        return progress
+
+    def reset(self, appid: int, state: Dict[str, Any]) -> JobProgress:
+        """Start a new job for ``appid`` with fresh counters and cancel flag."""
+        progress = JobProgress()
+        update = dict(state)
+        progress.bytes_read = int(update.pop("bytesRead", 0) or 0)
+        progress.total_bytes = int(update.pop("totalBytes", 0) or 0)
+        with self._lock:
+            self._states[appid] = update
+            self._progress[appid] = progress
+        return progress
+
+    def update(self, appid: int, update: Dict[str, Any]) -> None:
+        update = dict(update)
+        if "bytesRead" in update or "totalBytes" in update:
+            progress = self.progress(appid)
+            if "bytesRead" in update:
+                progress.bytes_read = int(update.pop("bytesRead") or 0)
+            if "totalBytes" in update:
+                progress.total_bytes = int(update.pop("totalBytes") or 0)
+        with self._lock:
+            state = self._states.get(appid) or {}
+            state.update(update)
+            self._states[appid] = state
+
+    def get(self, appid: int) -> Dict[str, Any]:
+        with self._lock:
+            state = self._states.get(appid)
+            if state is None:
+                return {}
+            snapshot = dict(state)
+            progress = self._progress.get(appid)
+        if progress is not None:
+            snapshot.update(progress.snapshot())
+        return snapshot
+
+    def is_cancelled(self, appid: int) -> bool:
+        progress = self._progress.get(appid)
+        return progress is not None and progress.is_cancelled()
+
+    def cancel(self, appid: int, update: Dict[str, Any]) -> None:
+        self.update(appid, update)
+        self.progress(appid).cancelled.set()
+
+
+__all__ = ["JobProgress", "JobProgressTable"]
@@ -0,0 +1,165 @@
+"""Run the external manifest launcher (ACCELA run.sh / Bifrost) under supervision.
+
+Launcher processes are capped at LAUNCHER_MAX_CONCURRENCY, get a deadline
+after which they are terminated (then killed), and have their output read
+line by line so callers can surface progress while the launcher runs.
+"""
+
+from __future__ import annotations
+
+import os
+import signal
+import subprocess
+import threading
+import time
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Deque, List, Optional
+
+from config import (
+    LAUNCHER_KILL_GRACE_SECONDS,
+    LAUNCHER_MAX_CONCURRENCY,
+    LAUNCHER_OUTPUT_TAIL_LINES,
+    LAUNCHER_TIMEOUT_SECONDS,
+)
+from logger import logger
+
+_LAUNCHER_SLOTS = threading.BoundedSemaphore(max(1, int(LAUNCHER_MAX_CONCURRENCY)))
+# Poll interval for the deadline / cancellation check while the launcher runs.
+_POLL_SECONDS = 0.2
+
+
+@dataclass
+class LauncherResult:
+    returncode: Optional[int]
+    timed_out: bool = False
+    cancelled: bool = False
+    seconds: float = 0.0
+    output: List[str] = field(default_factory=list)
+
+
+def launcher_environment() -> dict:
+    """Environment for the launcher without the Steam runtime's libraries.
+
+    LD_LIBRARY_PATH breaks the launcher's Qt6, LD_PRELOAD injects the
+    Millennium overlay (ld.so spam) and STEAM_RUNTIME makes it prefer the
+    runtime's libraries over the system ones.
+    """
+    clean_env = os.environ.copy()
+    clean_env.pop("LD_LIBRARY_PATH", None)
+    clean_env.pop("LD_PRELOAD", None)
+    clean_env.pop("STEAM_RUNTIME", None)
+    return clean_env
+
+
+def _signal_process(proc: subprocess.Popen, sig: int) -> None:
+    """Signal the launcher and anything it spawned (run.sh starts children)."""
+    try:
+        if hasattr(os, "killpg"):
+            os.killpg(proc.pid, sig)
+        elif sig == getattr(signal, "SIGKILL", None):
+            proc.kill()
+        else:
+            proc.terminate()
+    except (ProcessLookupError, PermissionError):
+        pass
+    except Exception as exc:
+        logger.warn(f"LuaTools: Failed to signal launcher pid={proc.pid}: {exc}")
+
+
+def _stop_process(proc: subprocess.Popen) -> None:
+    _signal_process(proc, signal.SIGTERM)
+    try:
+        proc.wait(timeout=LAUNCHER_KILL_GRACE_SECONDS)
+        return
+    except subprocess.TimeoutExpired:
+        pass
+    logger.warn(f"LuaTools: Launcher pid={proc.pid} ignored SIGTERM, killing it")
+    _signal_process(proc, getattr(signal, "SIGKILL", signal.SIGTERM))
+    try:
+        proc.wait(timeout=LAUNCHER_KILL_GRACE_SECONDS)
+    except subprocess.TimeoutExpired:
+        logger.warn(f"LuaTools: Launcher pid={proc.pid} did not exit after SIGKILL")
+
+
+def _pump(stream, name: str, tail: Deque[str], on_line: Optional[Callable[[str, str], None]]) -> None:
+    try:
+        for raw in iter(stream.readline, ""):
+            line = raw.rstrip("\r\n")
+            if not line:
+                continue
+            tail.append(line)
+            if on_line is not None:
+                try:
+                    on_line(name, line)
+                except Exception:
+                    pass
+    except Exception:
+        pass
+    finally:
+        try:
+            stream.close()
+        except Exception:
+            pass
+
+
+def run_launcher(
+    launcher_bin: str,
+    args: List[str],
+    on_line: Optional[Callable[[str, str], None]] = None,
+    should_stop: Optional[Callable[[], bool]] = None,
+    timeout: Optional[float] = None,
+) -> LauncherResult:
+    """Run ``launcher_bin`` with ``args`` and wait for it within the deadline.
+
+    ``on_line(stream, line)`` is called for every stdout/stderr line as it
+    arrives. ``should_stop`` is polled while the launcher runs; when it
+    returns True the launcher is stopped like a timed-out one. Blocks while
+    LAUNCHER_MAX_CONCURRENCY launchers are already running.
+    """
+    deadline_seconds = LAUNCHER_TIMEOUT_SECONDS if timeout is None else timeout
+    tail: Deque[str] = deque(maxlen=max(1, int(LAUNCHER_OUTPUT_TAIL_LINES)))
+    with _LAUNCHER_SLOTS:
+        started = time.monotonic()
+        proc = subprocess.Popen(
+            [launcher_bin, *args],
+            stdout=subprocess.PIPE,
+            stderr=subprocess.PIPE,
+            stdin=subprocess.DEVNULL,
+            text=True,
+            errors="replace",
+            env=launcher_environment(),
+            start_new_session=hasattr(os, "killpg"),
+        )
+        readers = [
+            threading.Thread(target=_pump, args=(proc.stdout, "stdout", tail, on_line), daemon=True),
+            threading.Thread(target=_pump, args=(proc.stderr, "stderr", tail, on_line), daemon=True),
+        ]
+        for reader in readers:
+            reader.start()
+
+        result = LauncherResult(returncode=None)
+        while True:
+            try:
+                proc.wait(timeout=_POLL_SECONDS)
+                break
+            except subprocess.TimeoutExpired:
+                pass
+            if should_stop is not None and should_stop():
+                result.cancelled = True
+            elif deadline_seconds and time.monotonic() - started > deadline_seconds:
+                result.timed_out = True
+            else:
+                continue
+            _stop_process(proc)
+            break
+
+        for reader in readers:
+            reader.join(timeout=1.0)
+        result.returncode = proc.poll()
+        result.seconds = time.monotonic() - started
+        result.output = list(tail)
+        return result
+
+
+__all__ = ["LauncherResult", "launcher_environment", "run_launcher"]
@@ -21,6 +21,7 @@ from api_manifest import (
     init_apis as api_init_apis,
     store_last_message,
 )
+from app_search import search_apps
 from auto_update import (
     apply_pending_update_if_any,
     check_for_updates_now as auto_check_for_updates_now,
@@ -32,13 +33,18 @@ from downloads import (
     cancel_add_via_luatools,
     delete_luatools_for_app,
     dismiss_loaded_apps,
+    get_add_batch_status,
+    get_add_perf_stats,
     get_add_status,
     get_icon_data_url,
     get_installed_lua_scripts,
     has_luatools_for_app,
     init_applist,
     read_loaded_apps,
+    reset_add_perf_stats,
+    shutdown_add_workers,
     start_add_via_luatools,
+    start_add_via_luatools_batch,
     # --- NOVOS IMPORTS DE DOWNLOADS ---
     save_ryu_cookie,
     update_morrenus_key,
@@ -46,24 +52,34 @@ from downloads import (
     load_launcher_path,
     browse_for_launcher,
     # --- STATUS PILL IMPORTS ---
+    get_game_status,
+    get_game_statuses,
     get_games_database,
+    get_games_database_version,
     init_games_db,
+    query_games_db,
 )
 from fixes import (
     apply_game_fix,
     cancel_apply_fix,
     check_for_fixes,
+    check_for_fixes_batch,
     get_apply_fix_status,
+    get_fix_scan_status,
     get_installed_fixes,
     get_unfix_status,
+    shutdown_fix_workers,
     unfix_game,
     # --- NOVO IMPORT DE FIXES ---
     apply_linux_native_fix,
 )
 from utils import ensure_temp_download_dir
-from http_client import close_http_client, ensure_http_client
+from fix_cache import FIX_CACHE
+from http_client import close_http_client, ensure_http_client, limited_get
 from logger import logger as shared_logger
+from name_store import APP_NAME_STORE
 from paths import get_plugin_dir, public_path
+from remote_resources import get_remote_resource_stats
 from settings.manager import (
     apply_settings_changes,
     get_available_locales,
@@ -735,14 +751,40 @@ def HasLuaToolsForApp(appid: int, contentScriptQuery: str = "") -> str:
     return has_luatools_for_app(appid)
 
 
-def StartAddViaLuaTools(appid: int, contentScriptQuery: str = "") -> str:
-    return start_add_via_luatools(appid)
+def StartAddViaLuaTools(appid: int, forceReprobe: bool = False, offline: bool = False, contentScriptQuery: str = "") -> str:
+    return start_add_via_luatools(appid, forceReprobe, offline)
+
+
+def StartAddViaLuaToolsBatch(
+    appids: Any, forceReprobe: bool = False, offline: bool = False, contentScriptQuery: str = ""
+) -> str:
+    return start_add_via_luatools_batch(appids, forceReprobe, offline)
 
 
 def GetAddViaLuaToolsStatus(appid: int, contentScriptQuery: str = "") -> str:
     return get_add_status(appid)
 
 
+def GetAddViaLuaToolsBatchStatus(batchId: str = "", appids: Any = None, contentScriptQuery: str = "") -> str:
+    return get_add_batch_status(batchId, appids)
+
+
+def GetAddPerfStats(contentScriptQuery: str = "") -> str:
+    return get_add_perf_stats()
+
+
+def ResetAddPerfStats(contentScriptQuery: str = "") -> str:
+    return reset_add_perf_stats()
+
+
+def GetRemoteResourceStats(refresh: bool = False, contentScriptQuery: str = "") -> str:
+    return get_remote_resource_stats(refresh)
+
+
+def SearchApps(query: str, limit: int = 20, wait: bool = False, contentScriptQuery: str = "") -> str:
+    return search_apps(query, limit, wait)
+
+
 def CancelAddViaLuaTools(appid: int, contentScriptQuery: str = "") -> str:
     return cancel_add_via_luatools(appid)
 
@@ -763,8 +805,16 @@ def DeleteLuaToolsForApp(appid: int, contentScriptQuery: str = "") -> str:
     return delete_luatools_for_app(appid)
 
 
-def CheckForFixes(appid: int, contentScriptQuery: str = "") -> str:
-    return check_for_fixes(appid)
+def CheckForFixes(appid: int, refresh: bool = False, contentScriptQuery: str = "") -> str:
+    return check_for_fixes(appid, refresh)
+
+
+def CheckForFixesBatch(appids: Any = None, refresh: bool = False, contentScriptQuery: str = "") -> str:
+    return check_for_fixes_batch(appids, refresh)
+
+
+def GetFixScanStatus(scanId: str, contentScriptQuery: str = "") -> str:
+    return get_fix_scan_status(scanId)
 
 
 def ApplyGameFix(appid: int, downloadUrl: str, installPath: str, fixType: str = "", gameName: str = "", contentScriptQuery: str = "") -> str:
@@ -916,8 +966,31 @@ def GetTranslations(contentScriptQuery: str = "", language: str = "", **kwargs:
 #  API EXPOSTA PARA O FRONTEND (PILL)
 # ==========================================
 
-def GetGamesDatabase(contentScriptQuery: str = "") -> str:
-    return get_games_database()
+def GetGamesDatabase(knownVersion: str = "", contentScriptQuery: str = "") -> str:
+    return get_games_database(knownVersion)
+
+
+def GetGamesDatabaseVersion(contentScriptQuery: str = "") -> str:
+    return get_games_database_version()
+
+
+def GetGameStatus(appid: int, contentScriptQuery: str = "") -> str:
+    return get_game_status(appid)
+
+
+def GetGameStatuses(appids: Any, contentScriptQuery: str = "") -> str:
+    return get_game_statuses(appids)
+
+
+def QueryGamesDatabase(
+    playable: Any = None,
+    denuvo: Any = None,
+    ofAvailable: Any = None,
+    offset: int = 0,
+    limit: int = 50,
+    contentScriptQuery: str = "",
+) -> str:
+    return query_games_db(playable, denuvo, ofAvailable, offset, limit)
 
 # ==========================================
 
@@ -979,6 +1052,10 @@ class Plugin:
 
     def _unload(self):
         logger.log("unloading")
+        shutdown_add_workers()
+        APP_NAME_STORE.flush()
+        shutdown_fix_workers()
+        FIX_CACHE.flush()
         close_http_client("InitApis")
 
         # ... (no final do arquivo main.py, antes de "class Plugin:") ...
@@ -990,7 +1067,7 @@ def GetProtonDBStatus(appid: int, contentScriptQuery: str = "") -> str:
         client = ensure_http_client("ProtonDB")
 
         # Timeout curto (3s) para ser rápido. Se demorar, falha logo.
-        resp = client.get(url, timeout=3)
+        resp = limited_get(client, url, timeout=3)
 
         if resp.status_code == 200:
             return json.dumps({"success": True, "data": resp.json()})
@@ -1012,7 +1089,7 @@ def _fetch_dlc_list(appid: int):
         client = ensure_http_client("LuaTools: DLC Fetcher")
 
         url_list = f"https://store.steampowered.com/api/appdetails?appids={appid}&filters=basic,dlc"
-        resp = client.get(url_list, timeout=10)
+        resp = limited_get(client, url_list, timeout=10)
         data = resp.json()
 
         if not data or str(appid) not in data or not data[str(appid)]['success']:
@@ -1032,7 +1109,7 @@ def _fetch_dlc_list(appid: int):
 
             try:
                 url_names = f"https://store.steampowered.com/api/appdetails?appids={ids_str}&filters=basic"
-                resp_names = client.get(url_names, timeout=10)
+                resp_names = limited_get(client, url_names, timeout=10)
                 names_data = resp_names.json()
 
                 for d_id in chunk:
@@ -1220,7 +1297,7 @@ def CheckGameUpdate(appid: int, contentScriptQuery: str = "") -> str:
         # 4. Consultar API SteamCMD
         client = ensure_http_client("LuaTools: Update Checker")
         url = f"https://api.steamcmd.net/v1/info/{appid}"
-        resp = client.get(url, timeout=5)
+        resp = limited_get(client, url, timeout=5)
 
         if resp.status_code != 200:
             return json.dumps({"success": False, "status": "API Error", "color": "#FF5252"})
@@ -0,0 +1,119 @@
+"""Coalescing, batching resolver for app names that need a network lookup."""
+
+from __future__ import annotations
+
+import threading
+import time
+from concurrent.futures import Future
+from typing import Callable, Dict, Iterable, List, Optional
+
+from logger import logger
+
+
+class NameResolver:
+    """Resolve app names through ``fetch_batch`` with de-duplication and batching.
+
+    Concurrent requests for the same appid share one lookup (singleflight).
+    Requests arriving within ``window`` seconds of each other are gathered
+    and handed to ``fetch_batch`` in chunks of at most ``batch_size``
+    appids. ``fetch_batch`` returns ``{appid: name}`` with ``""`` for apps
+    the source answered for but has no name; appids missing from its result
+    could not be looked up this time and resolve to None.
+    """
+
+    def __init__(
+        self,
+        fetch_batch: Callable[[List[int]], Dict[int, str]],
+        window: float,
+        batch_size: int,
+    ) -> None:
+        self._fetch_batch = fetch_batch
+        self._window = max(0.0, float(window))
+        self._batch_size = max(1, int(batch_size))
+        self._cond = threading.Condition()
+        self._inflight: Dict[int, Future] = {}
+        self._pending: List[int] = []
+        self._thread: Optional[threading.Thread] = None
+        self._batches = 0
+        self._resolved = 0
+
+    def submit(self, appids: Iterable[int]) -> Dict[int, Future]:
+        """Queue lookups for ``appids`` and return their futures without waiting."""
+        futures: Dict[int, Future] = {}
+        with self._cond:
+            for appid in appids:
+                appid = int(appid)
+                future = self._inflight.get(appid)
+                if future is None:
+                    future = Future()
+                    self._inflight[appid] = future
+                    self._pending.append(appid)
+                futures[appid] = future
+            if self._pending:
+                if self._thread is None or not self._thread.is_alive():
+                    self._thread = threading.Thread(target=self._run, daemon=True, name="LuaTools-names")
+                    self._thread.start()
+                self._cond.notify()
+        return futures
+
+    def resolve(self, appid: int, timeout: Optional[float] = None) -> Optional[str]:
+        """The name, ``""`` if the source has none, or None if the lookup failed."""
+        try:
+            return self.submit([appid])[int(appid)].result(timeout)
+        except Exception:
+            return None
+
+    def resolve_many(self, appids: Iterable[int], timeout: Optional[float] = None) -> Dict[int, Optional[str]]:
+        futures = self.submit(appids)
+        deadline = None if timeout is None else time.monotonic() + timeout
+        names: Dict[int, Optional[str]] = {}
+        for appid, future in futures.items():
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            try:
+                names[appid] = future.result(remaining)
+            except Exception:
+                names[appid] = None
+        return names
+
+    def stats(self) -> Dict[str, int]:
+        with self._cond:
+            return {
+                "batches": self._batches,
+                "resolved": self._resolved,
+                "pending": len(self._pending),
+                "inflight": len(self._inflight),
+            }
+
+    def _next_batch(self) -> List[int]:
+        with self._cond:
+            while not self._pending:
+                self._cond.wait()
+            # Give callers that arrive together a moment to join the batch.
+            deadline = time.monotonic() + self._window
+            while len(self._pending) < self._batch_size:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._pending[:self._batch_size]
+            del self._pending[:self._batch_size]
+            return batch
+
+    def _run(self) -> None:
+        while True:
+            batch = self._next_batch()
+            try:
+                names = self._fetch_batch(batch) or {}
+            except Exception as exc:
+                logger.warn(f"LuaTools: Name lookup failed for {batch}: {exc}")
+                names = {}
+            with self._cond:
+                self._batches += 1
+                futures = [(appid, self._inflight.pop(appid, None)) for appid in batch]
+                self._resolved += sum(1 for appid in batch if names.get(appid))
+            for appid, future in futures:
+                if future is not None and not future.done():
+                    future.set_result(names.get(appid))
+
+
+__all__ = ["NameResolver"]
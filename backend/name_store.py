@@ -0,0 +1,144 @@
+"""Persistent, size-bounded cache of resolved app names.
+
+Names found by a lookup are kept for APP_NAME_TTL_SECONDS; failed lookups
+are remembered as ``""`` for only APP_NAME_NEGATIVE_TTL_SECONDS so a
+transient error does not hide a name for long. The most recently used
+APP_NAME_CACHE_MAX_ENTRIES entries stay in memory and are written to
+``backend/data/app_names.json`` so the cache is warm on the next boot.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Tuple
+
+from config import (
+    APP_NAME_CACHE_MAX_ENTRIES,
+    APP_NAME_FLUSH_SECONDS,
+    APP_NAME_NEGATIVE_TTL_SECONDS,
+    APP_NAME_STORE_FILE,
+    APP_NAME_TTL_SECONDS,
+)
+from logger import logger
+from paths import data_path
+from utils import read_json, write_json_atomic
+
+
+class NameStore:
+    """LRU map of appid -> name with per-entry expiry, loaded lazily from ``path``."""
+
+    def __init__(self, path: str) -> None:
+        self._path = path
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        # appid -> (name, expires_at); "" marks a failed lookup
+        self._entries: "OrderedDict[int, Tuple[str, float]]" = OrderedDict()
+        self._loaded = False
+        self._persisted = False
+        self._dirty = False
+        self._last_flush = 0.0
+
+    def _load_locked(self) -> None:
+        if self._loaded:
+            return
+        self._loaded = True
+        raw = read_json(self._path)
+        names = raw.get("names") if isinstance(raw, dict) else None
+        if not isinstance(names, dict):
+            return
+        self._persisted = True
+        now = time.time()
+        rows = []
+        for appid, row in names.items():
+            try:
+                name, expires, used = str(row[0]), float(row[1]), float(row[2])
+                rows.append((used, int(appid), name, expires))
+            except (TypeError, ValueError, IndexError):
+                continue
+        for _, appid, name, expires in sorted(rows):
+            if expires > now:
+                self._entries[appid] = (name, expires)
+        self._evict_locked()
+
+    def _evict_locked(self) -> None:
+        while len(self._entries) > max(1, int(APP_NAME_CACHE_MAX_ENTRIES)):
+            self._entries.popitem(last=False)
+
+    @property
+    def persisted(self) -> bool:
+        """True once the store has been loaded from (or written to) disk."""
+        with self._lock:
+            self._load_locked()
+            return self._persisted
+
+    def get(self, appid: int) -> Optional[str]:
+        """The cached name, ``""`` for a recent failed lookup, or None if unknown/expired."""
+        appid = int(appid)
+        with self._lock:
+            self._load_locked()
+            entry = self._entries.get(appid)
+            if entry is None:
+                return None
+            if entry[1] <= time.time():
+                del self._entries[appid]
+                self._dirty = True
+                return None
+            self._entries.move_to_end(appid)
+            return entry[0]
+
+    def put(self, appid: int, name: str) -> None:
+        self.put_many([(appid, name)])
+
+    def put_many(self, items: Iterable[Tuple[int, str]]) -> None:
+        """Store resolved names; an empty name records a failed lookup."""
+        now = time.time()
+        with self._lock:
+            self._load_locked()
+            for appid, name in items:
+                appid = int(appid)
+                name = (name or "").strip()
+                if not name:
+                    current = self._entries.get(appid)
+                    if current is not None and current[0] and current[1] > now:
+                        continue  # a failed refresh does not hide a known name
+                ttl = APP_NAME_TTL_SECONDS if name else APP_NAME_NEGATIVE_TTL_SECONDS
+                self._entries[appid] = (name, now + ttl)
+                self._entries.move_to_end(appid)
+            self._evict_locked()
+            self._dirty = True
+            due = now - self._last_flush >= APP_NAME_FLUSH_SECONDS
+        if due:
+            self.flush()
+
+    def flush(self) -> None:
+        """Write the store to disk if it changed since the last write."""
+        with self._flush_lock:
+            with self._lock:
+                if not self._dirty:
+                    return
+                now = time.time()
+                # LRU order is kept through a per-entry rank so it survives the reload.
+                names: Dict[str, list] = {
+                    str(appid): [name, expires, rank]
+                    for rank, (appid, (name, expires)) in enumerate(self._entries.items())
+                    if expires > now
+                }
+                self._dirty = False
+                self._last_flush = now
+                self._persisted = True
+            if not write_json_atomic(self._path, {"version": 1, "names": names}):
+                logger.warn("LuaTools: Failed to persist app name cache")
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            self._load_locked()
+            negative = sum(1 for name, _ in self._entries.values() if not name)
+            return {"entries": len(self._entries), "negative": negative}
+
+
+APP_NAME_STORE = NameStore(data_path(APP_NAME_STORE_FILE))
+
+
+__all__ = ["APP_NAME_STORE", "NameStore"]
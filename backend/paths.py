@@ -19,6 +19,11 @@ def backend_path(filename: str) -> str:
     return os.path.join(get_backend_dir(), filename)
 
 
+def data_path(filename: str) -> str:
+    """Return an absolute path to a file inside the backend data directory."""
+    return os.path.join(get_backend_dir(), "data", filename)
+
+
 def public_path(filename: str) -> str:
     """Return an absolute path to a file inside the public directory."""
     return os.path.join(get_plugin_dir(), "public", filename)
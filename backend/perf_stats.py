@@ -0,0 +1,65 @@
+"""Rolling timing histograms for the add flow."""
+
+from __future__ import annotations
+
+import threading
+from collections import deque
+from typing import Any, Deque, Dict, Tuple
+
+from config import PERF_STATS_WINDOW
+
+_LOCK = threading.Lock()
+# (metric, key) -> most recent samples
+_SAMPLES: Dict[Tuple[str, str], Deque[float]] = {}
+
+
+def record_sample(metric: str, value: float, key: str = "") -> None:
+    """Add one sample of ``metric`` (optionally per ``key``, e.g. an API name)."""
+    if value < 0:
+        return
+    with _LOCK:
+        samples = _SAMPLES.get((metric, key))
+        if samples is None:
+            samples = deque(maxlen=max(1, int(PERF_STATS_WINDOW)))
+            _SAMPLES[(metric, key)] = samples
+        samples.append(float(value))
+
+
+def _percentile(ordered, fraction: float) -> float:
+    index = min(len(ordered) - 1, max(0, int(round(fraction * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def _summary(samples) -> Dict[str, Any]:
+    ordered = sorted(samples)
+    return {
+        "count": len(ordered),
+        "p50": round(_percentile(ordered, 0.5), 3),
+        "p95": round(_percentile(ordered, 0.95), 3),
+        "max": round(ordered[-1], 3),
+    }
+
+
+def get_perf_snapshot() -> Dict[str, Dict[str, Any]]:
+    """Summaries (count/p50/p95/max) of the last PERF_STATS_WINDOW samples.
+
+    Returns ``{"phases": {metric: summary}, "apis": {api: {metric: summary}}}``.
+    """
+    with _LOCK:
+        items = [(metric, key, list(samples)) for (metric, key), samples in _SAMPLES.items() if samples]
+    phases: Dict[str, Any] = {}
+    apis: Dict[str, Dict[str, Any]] = {}
+    for metric, key, samples in items:
+        if key:
+            apis.setdefault(key, {})[metric] = _summary(samples)
+        else:
+            phases[metric] = _summary(samples)
+    return {"phases": phases, "apis": apis}
+
+
+def reset_perf_stats() -> None:
+    with _LOCK:
+        _SAMPLES.clear()
+
+
+__all__ = ["get_perf_snapshot", "record_sample", "reset_perf_stats"]
@@ -0,0 +1,137 @@
+"""Small worker-pool stages connected by bounded queues."""
+
+from __future__ import annotations
+
+import queue
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional
+
+from logger import logger
+
+_STOP = object()
+
+
+class PipelineStage:
+    """A named pool of worker threads fed by a queue.
+
+    ``handler`` is called with each item on a worker thread and is
+    responsible for passing its result to the next stage. A bounded
+    ``queue_size`` makes :meth:`put` block while the stage is saturated, so
+    a fast upstream stage cannot pile up work (and memory) in front of a
+    slow one.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        handler: Callable[[Any], None],
+        workers: int = 1,
+        queue_size: int = 0,
+        on_drop: Optional[Callable[[Any], None]] = None,
+    ) -> None:
+        self.name = name
+        self._handler = handler
+        self._on_drop = on_drop
+        self._queue: "queue.Queue[Any]" = queue.Queue(maxsize=max(0, int(queue_size)))
+        self._workers = max(1, int(workers))
+        self._threads: List[threading.Thread] = []
+        self._lock = threading.Lock()
+        self._stopped = False
+        self._busy = 0
+        self._processed = 0
+        self._failed = 0
+        self._total_seconds = 0.0
+        self._max_seconds = 0.0
+        self._last_seconds = 0.0
+        self._max_depth = 0
+
+    def start(self) -> "PipelineStage":
+        for index in range(self._workers):
+            thread = threading.Thread(
+                target=self._run, name=f"luatools-{self.name}-{index}", daemon=True
+            )
+            thread.start()
+            self._threads.append(thread)
+        return self
+
+    def put(self, item: Any) -> bool:
+        """Queue ``item``, blocking while the stage is full. False once stopped."""
+        while not self._stopped:
+            try:
+                self._queue.put(item, timeout=0.5)
+            except queue.Full:
+                continue
+            depth = self._queue.qsize()
+            with self._lock:
+                self._max_depth = max(self._max_depth, depth)
+            return True
+        return False
+
+    def _run(self) -> None:
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                return
+            if self._stopped:
+                self._drop(item)
+                continue
+            with self._lock:
+                self._busy += 1
+            started = time.monotonic()
+            failed = False
+            try:
+                self._handler(item)
+            except Exception as exc:
+                failed = True
+                logger.warn(f"LuaTools: Pipeline stage '{self.name}' failed: {exc}")
+            elapsed = time.monotonic() - started
+            with self._lock:
+                self._busy -= 1
+                self._processed += 1
+                self._failed += 1 if failed else 0
+                self._total_seconds += elapsed
+                self._last_seconds = elapsed
+                self._max_seconds = max(self._max_seconds, elapsed)
+
+    def _drop(self, item: Any) -> None:
+        if self._on_drop is not None:
+            try:
+                self._on_drop(item)
+            except Exception:
+                pass
+
+    def stop(self) -> None:
+        """Stop accepting work and drop anything still queued."""
+        self._stopped = True
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                self._drop(item)
+        for _ in self._threads:
+            try:
+                self._queue.put_nowait(_STOP)
+            except queue.Full:
+                break
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            processed = self._processed
+            return {
+                "workers": self._workers,
+                "queued": self._queue.qsize(),
+                "maxQueued": self._max_depth,
+                "queueLimit": self._queue.maxsize,
+                "busy": self._busy,
+                "processed": processed,
+                "failed": self._failed,
+                "avgSeconds": round(self._total_seconds / processed, 3) if processed else 0.0,
+                "lastSeconds": round(self._last_seconds, 3),
+                "maxSeconds": round(self._max_seconds, 3),
+            }
+
+
+__all__ = ["PipelineStage"]
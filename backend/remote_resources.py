@@ -0,0 +1,370 @@
+"""Local-first copies of the remote files LuaTools depends on.
+
+A :class:`RemoteResource` always answers from what is on disk: the local copy,
+or the snapshot bundled in ``backend/`` until a download has succeeded. Fresh
+copies are fetched with conditional requests (If-None-Match /
+If-Modified-Since), streamed to a ``.part`` file, validated by the owning
+module and renamed over the local copy, so readers never see a torn file.
+Failed fetches back off exponentially and the backoff is persisted, so an
+offline boot does not retry every source on the way up.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Sequence, Tuple, Union
+
+from config import REMOTE_RETRY_BASE_SECONDS, REMOTE_RETRY_MAX_SECONDS
+from http_client import ensure_http_client
+from logger import logger
+from paths import data_path
+from utils import parse_flag, read_json, write_json_atomic
+
+PathSpec = Union[str, Callable[[], str]]
+
+# Shortest and longest sleep of the background refresher
+_MIN_POLL_SECONDS = 60.0
+_MAX_POLL_SECONDS = 60.0 * 60
+
+_RESOURCES: Dict[str, "RemoteResource"] = {}
+_REFRESH_THREAD: Optional[threading.Thread] = None
+_REFRESH_LOCK = threading.Lock()
+
+
+def _resolve(spec: PathSpec) -> str:
+    return spec() if callable(spec) else spec
+
+
+def _remove(path: str) -> None:
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+
+def _file_digest(path: str) -> str:
+    digest = hashlib.sha1()
+    with open(path, "rb") as handle:
+        for chunk in iter(lambda: handle.read(1024 * 1024), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+class RemoteResource:
+    """One remote file with a local copy, an optional bundled snapshot and refresh state.
+
+    ``validate(part_path)`` runs on every downloaded copy before it replaces
+    the local one and raises (e.g. ValueError) to reject it; its return value
+    is passed to ``on_change(local_path, prepared)`` once the new copy is in
+    place. With ``max_age=None`` the resource is only refreshed on demand.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        urls: Sequence[str],
+        local_path: PathSpec,
+        snapshot_path: PathSpec = "",
+        meta_file: str = "",
+        max_age: Optional[float] = None,
+        timeout: float = 60,
+        headers: Optional[Dict[str, str]] = None,
+        validate: Optional[Callable[[str], Any]] = None,
+        on_change: Optional[Callable[[str, Any], None]] = None,
+    ) -> None:
+        self.name = name
+        self.urls: List[str] = [url for url in urls if url]
+        self.headers: Dict[str, str] = dict(headers or {})
+        self.max_age = max_age
+        self.timeout = timeout
+        self._local_path = local_path
+        self._snapshot_path = snapshot_path
+        self._meta_path = data_path(meta_file or f"{name}_meta.json")
+        self._validate = validate
+        self._on_change = on_change
+        self._refresh_lock = threading.Lock()
+        self._lock = threading.Lock()
+        self._meta: Optional[Dict[str, Any]] = None
+        self._counters = {"fetches": 0, "notModified": 0, "unchanged": 0, "updated": 0, "failed": 0}
+        self._last_result = ""
+        _RESOURCES[name] = self
+
+    # --- paths and persisted state ---
+
+    @property
+    def local_path(self) -> str:
+        return _resolve(self._local_path)
+
+    def path(self) -> str:
+        """The copy to read: the local one, else the bundled snapshot, else ''."""
+        local = self.local_path
+        if os.path.exists(local):
+            return local
+        snapshot = _resolve(self._snapshot_path) if self._snapshot_path else ""
+        if snapshot and os.path.exists(snapshot):
+            return snapshot
+        return ""
+
+    def _meta_locked(self) -> Dict[str, Any]:
+        if self._meta is None:
+            self._meta = read_json(self._meta_path)
+        return self._meta
+
+    def _update_meta(self, **changes: Any) -> None:
+        with self._lock:
+            meta = self._meta_locked()
+            meta.update({key: value for key, value in changes.items() if value is not None})
+            for key, value in changes.items():
+                if value is None:
+                    meta.pop(key, None)
+            snapshot = dict(meta)
+        if not write_json_atomic(self._meta_path, snapshot):
+            logger.warn(f"LuaTools: Failed to persist {self.name} metadata")
+
+    def configure(self, urls: Sequence[str], headers: Optional[Dict[str, str]] = None) -> None:
+        """Point the resource at new URLs (validators of another URL are not reused)."""
+        self.urls = [url for url in urls if url]
+        self.headers = dict(headers or {})
+
+    def checked_at(self) -> float:
+        """When the local copy was last downloaded or revalidated (its mtime for older installs)."""
+        with self._lock:
+            checked = self._meta_locked().get("checked")
+        if isinstance(checked, (int, float)):
+            return float(checked)
+        try:
+            return os.path.getmtime(self.local_path)
+        except OSError:
+            return 0.0
+
+    def retry_at(self) -> float:
+        with self._lock:
+            retry = self._meta_locked().get("nextAttempt")
+        return float(retry) if isinstance(retry, (int, float)) else 0.0
+
+    def due_at(self) -> Optional[float]:
+        """When the background refresher should next revalidate (None: on demand only)."""
+        if self.max_age is None or not self.urls:
+            return None
+        due = 0.0 if not os.path.exists(self.local_path) else self.checked_at() + self.max_age
+        return max(due, self.retry_at())
+
+    # --- refreshing ---
+
+    def _conditional_headers(self, url: str) -> Dict[str, str]:
+        with self._lock:
+            meta = dict(self._meta_locked())
+        if meta.get("url") not in (None, url) or not os.path.exists(self.local_path):
+            return {}
+        headers: Dict[str, str] = {}
+        if meta.get("etag"):
+            headers["If-None-Match"] = str(meta["etag"])
+        if meta.get("lastModified"):
+            headers["If-Modified-Since"] = str(meta["lastModified"])
+        return headers
+
+    def _download(self, url: str, conditional: bool) -> Tuple[Optional[str], Dict[str, str]]:
+        """Stream ``url`` into ``<local>.part``; returns (None, validators) on 304."""
+        client = ensure_http_client(f"LuaTools: Download {self.name}")
+        headers = dict(self.headers)
+        if conditional:
+            headers.update(self._conditional_headers(url))
+        part_path = f"{self.local_path}.part"
+        os.makedirs(os.path.dirname(part_path), exist_ok=True)
+        with client.stream("GET", url, headers=headers, follow_redirects=True, timeout=self.timeout) as resp:
+            validators = {
+                "etag": str(resp.headers.get("ETag", "") or "").strip(),
+                "lastModified": str(resp.headers.get("Last-Modified", "") or "").strip(),
+            }
+            if resp.status_code == 304:
+                return None, validators
+            resp.raise_for_status()
+            try:
+                with open(part_path, "wb") as output:
+                    for chunk in resp.iter_bytes():
+                        if chunk:
+                            output.write(chunk)
+            except Exception:
+                _remove(part_path)
+                raise
+        return part_path, validators
+
+    def _record(self, result: str) -> str:
+        with self._lock:
+            self._last_result = result
+            counter = {"not-modified": "notModified"}.get(result, result)
+            if counter in self._counters:
+                self._counters[counter] += 1
+        return result
+
+    def _fail(self, error: str) -> str:
+        with self._lock:
+            failures = int(self._meta_locked().get("failures") or 0) + 1
+        delay = min(REMOTE_RETRY_MAX_SECONDS, REMOTE_RETRY_BASE_SECONDS * 2 ** min(failures - 1, 16))
+        self._update_meta(failures=failures, nextAttempt=time.time() + delay, lastError=error)
+        logger.warn(f"LuaTools: Refreshing {self.name} failed ({error}); retrying in {int(delay)}s")
+        return self._record("failed")
+
+    def refresh(self, force: bool = False, wait: bool = True) -> str:
+        """Revalidate the local copy against the remote one.
+
+        Unless ``force`` is set, a copy younger than ``max_age`` is left alone
+        and a resource in backoff is not retried. ``force`` also skips the
+        conditional headers. Returns ``"fresh"``, ``"backoff"``, ``"skipped"``
+        (another refresh is running and ``wait`` is False), ``"not-modified"``,
+        ``"unchanged"``, ``"updated"`` or ``"failed"``.
+        """
+        if not self.urls:
+            return "skipped"
+        if not self._refresh_lock.acquire(blocking=wait):
+            return "skipped"
+        try:
+            now = time.time()
+            local = self.local_path
+            if not force:
+                if now < self.retry_at():
+                    return "backoff"
+                if (
+                    self.max_age is not None
+                    and os.path.exists(local)
+                    and now - self.checked_at() < self.max_age
+                ):
+                    return "fresh"
+
+            errors = []
+            for url in self.urls:
+                with self._lock:
+                    self._counters["fetches"] += 1
+                try:
+                    part_path, validators = self._download(url, conditional=not force)
+                    break
+                except Exception as exc:
+                    errors.append(f"{url}: {exc}")
+            else:
+                return self._fail("; ".join(errors) or "no URL")
+
+            checked = {
+                "url": url,
+                "checked": time.time(),
+                "failures": None,
+                "nextAttempt": None,
+                "lastError": None,
+            }
+            if part_path is None:
+                self._update_meta(**checked, **{key: value for key, value in validators.items() if value})
+                logger.log(f"LuaTools: {self.name} not modified since last check")
+                return self._record("not-modified")
+
+            fresh_validators = {key: value or None for key, value in validators.items()}
+            try:
+                if os.path.exists(local) and _file_digest(part_path) == _file_digest(local):
+                    self._update_meta(**checked, **fresh_validators)
+                    logger.log(f"LuaTools: {self.name} refreshed, content unchanged")
+                    return self._record("unchanged")
+                try:
+                    prepared = self._validate(part_path) if self._validate else None
+                except Exception as exc:
+                    return self._fail(f"invalid download: {exc}")
+                os.replace(part_path, local)
+            finally:
+                _remove(part_path)
+            self._update_meta(**checked, **fresh_validators, changed=time.time())
+            logger.log(f"LuaTools: {self.name} updated from {url}")
+            if self._on_change:
+                try:
+                    self._on_change(local, prepared)
+                except Exception as exc:
+                    logger.warn(f"LuaTools: Applying refreshed {self.name} failed: {exc}")
+            return self._record("updated")
+        finally:
+            self._refresh_lock.release()
+
+    def stats(self) -> Dict[str, Any]:
+        now = time.time()
+        path = self.path()
+        source = "none" if not path else ("local" if path == self.local_path else "snapshot")
+        try:
+            age: Optional[float] = round(now - os.path.getmtime(path), 1) if path else None
+        except OSError:
+            age = None
+        checked = self.checked_at() if source == "local" else 0.0
+        retry_at = self.retry_at()
+        with self._lock:
+            meta = dict(self._meta_locked())
+            counters = dict(self._counters)
+            last_result = self._last_result
+        return {
+            "name": self.name,
+            "url": meta.get("url", ""),
+            "source": source,
+            "path": path,
+            "ageSeconds": age,
+            "checkedSecondsAgo": round(now - checked, 1) if checked else None,
+            "maxAgeSeconds": self.max_age,
+            "fresh": bool(checked) and (self.max_age is None or now - checked < self.max_age),
+            "hasValidator": bool(meta.get("etag") or meta.get("lastModified")),
+            "failures": int(meta.get("failures") or 0),
+            "retryInSeconds": round(retry_at - now, 1) if retry_at > now else 0,
+            "lastError": meta.get("lastError", ""),
+            "lastResult": last_result,
+            **counters,
+        }
+
+
+def get_resource(name: str) -> Optional[RemoteResource]:
+    return _RESOURCES.get(name)
+
+
+def resource_stats() -> List[Dict[str, Any]]:
+    return [resource.stats() for resource in list(_RESOURCES.values())]
+
+
+def get_remote_resource_stats(refresh: bool = False) -> str:
+    """Age, freshness and fetch counters of every resource, optionally revalidating them first."""
+    results: Dict[str, str] = {}
+    if parse_flag(refresh):
+        for resource in list(_RESOURCES.values()):
+            results[resource.name] = resource.refresh()
+    return json.dumps({"success": True, "resources": resource_stats(), "refreshed": results})
+
+
+def _refresh_worker() -> None:
+    while True:
+        now = time.time()
+        next_due: Optional[float] = None
+        for resource in list(_RESOURCES.values()):
+            due = resource.due_at()
+            if due is None:
+                continue
+            if due <= now:
+                try:
+                    resource.refresh(wait=False)
+                except Exception as exc:
+                    logger.warn(f"LuaTools: Background refresh of {resource.name} failed: {exc}")
+                due = resource.due_at()
+            if due is not None:
+                next_due = due if next_due is None else min(next_due, due)
+        delay = _MAX_POLL_SECONDS if next_due is None else next_due - time.time()
+        time.sleep(min(_MAX_POLL_SECONDS, max(_MIN_POLL_SECONDS, delay)))
+
+
+def start_background_refresh() -> None:
+    """Start the thread that revalidates stale resources (idempotent)."""
+    global _REFRESH_THREAD
+    with _REFRESH_LOCK:
+        if _REFRESH_THREAD is None or not _REFRESH_THREAD.is_alive():
+            _REFRESH_THREAD = threading.Thread(target=_refresh_worker, daemon=True, name="LuaTools-resources")
+            _REFRESH_THREAD.start()
+
+
+__all__ = [
+    "RemoteResource",
+    "get_remote_resource_stats",
+    "get_resource",
+    "resource_stats",
+    "start_background_refresh",
+]
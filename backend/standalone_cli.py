@@ -10,6 +10,7 @@ from __future__ import annotations
 import argparse
 import json
 import sys
+import time
 
 from main import (
     AddFakeAppId,
@@ -19,11 +20,19 @@ from main import (
     CheckGameDLCsStatus,
     CheckGameTokenStatus,
     CheckForFixes,
+    CheckForFixesBatch,
+    GetAddViaLuaToolsBatchStatus,
+    GetFixScanStatus,
     GetGameInstallPath,
+    GetGameStatuses,
+    GetRemoteResourceStats,
     InitApis,
+    QueryGamesDatabase,
     RemoveFakeAppId,
     RemoveGameDLCs,
     RemoveGameToken,
+    SearchApps,
+    StartAddViaLuaToolsBatch,
 )
 
 
@@ -39,12 +48,63 @@ def _emit(result: str) -> int:
         return 0
 
 
+def _add_games(appids, force_reprobe: bool, offline: bool) -> int:
+    started = json.loads(StartAddViaLuaToolsBatch(appids, force_reprobe, offline))
+    if not started.get("success"):
+        return _emit(json.dumps(started))
+    while True:
+        status = GetAddViaLuaToolsBatchStatus(started["batchId"])
+        parsed = json.loads(status)
+        if not parsed.get("success") or parsed["totals"]["pending"] == 0:
+            break
+        time.sleep(0.5)
+    code = _emit(status)
+    failed = parsed.get("totals", {}).get("finished", 0) - parsed.get("totals", {}).get("byStatus", {}).get("done", 0)
+    return 1 if code or failed else 0
+
+
+def _scan_fixes(appids, refresh: bool) -> int:
+    started = json.loads(CheckForFixesBatch(appids or None, refresh))
+    if not started.get("success"):
+        return _emit(json.dumps(started))
+    while True:
+        status = GetFixScanStatus(started["scanId"])
+        parsed = json.loads(status)
+        if not parsed.get("success") or parsed["status"] == "done":
+            break
+        print(f"Checked {parsed['done']}/{parsed['total']} fixes ({parsed['found']} apps with fixes)", file=sys.stderr)
+        time.sleep(0.5)
+    return _emit(status)
+
+
 def build_parser() -> argparse.ArgumentParser:
     parser = argparse.ArgumentParser(description="LuaTools standalone CLI")
     sub = parser.add_subparsers(dest="command", required=True)
 
     sub.add_parser("init-apis", help="Initialize free API list")
 
+    p = sub.add_parser("add", help="Download and install manifests for one or more apps")
+    p.add_argument("appids", type=int, nargs="+")
+    p.add_argument("--force-reprobe", action="store_true", help="Ignore cached bundles and API misses")
+    p.add_argument("--offline", action="store_true", help="Install only from the local bundle cache")
+
+    p = sub.add_parser("search", help="Search apps by name (or appid)")
+    p.add_argument("query", nargs="+")
+    p.add_argument("--limit", type=int, default=20)
+
+    p = sub.add_parser("game-status", help="Show games DB status for one or more apps")
+    p.add_argument("appids", type=int, nargs="+")
+
+    p = sub.add_parser("games-db", help="List games DB entries matching filters")
+    p.add_argument("--playable", help="Playable level(s), e.g. 1 or 1,2")
+    p.add_argument("--denuvo", choices=["yes", "no"])
+    p.add_argument("--of-available", choices=["yes", "no"])
+    p.add_argument("--offset", type=int, default=0)
+    p.add_argument("--limit", type=int, default=50)
+
+    p = sub.add_parser("resources", help="Show age and freshness of cached remote files")
+    p.add_argument("--refresh", action="store_true", help="Revalidate files that are due first")
+
     p = sub.add_parser("add-fakeappid", help="Add FakeAppId mapping to SLSsteam config")
     p.add_argument("appid", type=int)
 
@@ -78,6 +138,10 @@ def build_parser() -> argparse.ArgumentParser:
     p = sub.add_parser("check-fixes", help="Check available fixes for an app")
     p.add_argument("appid", type=int)
 
+    p = sub.add_parser("check-fixes-batch", help="Check available fixes for many apps (default: installed apps)")
+    p.add_argument("appids", type=int, nargs="*")
+    p.add_argument("--refresh", action="store_true", help="Ignore cached fix availability")
+
     return parser
 
 
@@ -87,6 +151,16 @@ def main() -> int:
 
     if args.command == "init-apis":
         return _emit(InitApis("standalone-cli"))
+    if args.command == "add":
+        return _add_games(args.appids, args.force_reprobe, args.offline)
+    if args.command == "search":
+        return _emit(SearchApps(" ".join(args.query), args.limit, True))
+    if args.command == "game-status":
+        return _emit(GetGameStatuses(args.appids))
+    if args.command == "games-db":
+        return _emit(QueryGamesDatabase(args.playable, args.denuvo, args.of_available, args.offset, args.limit))
+    if args.command == "resources":
+        return _emit(GetRemoteResourceStats(args.refresh))
     if args.command == "add-fakeappid":
         return _emit(AddFakeAppId(args.appid))
     if args.command == "remove-fakeappid":
@@ -109,6 +183,8 @@ def main() -> int:
         return _emit(GetGameInstallPath(args.appid))
     if args.command == "check-fixes":
         return _emit(CheckForFixes(args.appid))
+    if args.command == "check-fixes-batch":
+        return _scan_fixes(args.appids, args.refresh)
 
     parser.print_help()
     return 2
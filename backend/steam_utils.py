@@ -6,7 +6,7 @@ import os
 import re
 import subprocess
 import sys
-from typing import Dict, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
 from platform_bridge import Millennium
 
@@ -223,6 +223,67 @@ def get_game_install_path_response(appid: int) -> Dict[str, any]:
     }
 
 
+def _library_folders(steam_path: str) -> List[Tuple[str, List[str]]]:
+    """``(library path, appids listed for it)`` for every library in libraryfolders.vdf."""
+    library_vdf_path = os.path.join(steam_path, "config", "libraryfolders.vdf")
+    try:
+        with open(library_vdf_path, "r", encoding="utf-8") as handle:
+            library_data = _parse_vdf_simple(handle.read())
+    except Exception as exc:
+        logger.warn(f"LuaTools: Failed to read libraryfolders.vdf: {exc}")
+        return [(steam_path, [])]
+
+    libraries: List[Tuple[str, List[str]]] = []
+    for folder_data in library_data.get("libraryfolders", {}).values():
+        if not isinstance(folder_data, dict):
+            continue
+        folder_path = folder_data.get("path", "").replace("\\\\", "\\")
+        if not folder_path:
+            continue
+        apps = folder_data.get("apps", {})
+        libraries.append((folder_path, list(apps) if isinstance(apps, dict) else []))
+    return libraries or [(steam_path, [])]
+
+
+def list_installed_apps() -> List[Dict[str, Any]]:
+    """Apps installed in any Steam library, from libraryfolders.vdf and the appmanifests.
+
+    Each entry has ``appid``, ``name``, ``installDir`` and ``libraryPath``;
+    apps listed in libraryfolders.vdf without a readable appmanifest keep an
+    empty name and install dir.
+    """
+    steam_path = _find_steam_path() or detect_steam_install_path()
+    if not steam_path:
+        return []
+
+    installed: Dict[int, Dict[str, Any]] = {}
+    for library_path, listed in _library_folders(steam_path):
+        for appid in listed:
+            if appid.isdigit():
+                installed.setdefault(int(appid), {"appid": int(appid), "name": "", "installDir": "", "libraryPath": library_path})
+        steamapps = os.path.join(library_path, "steamapps")
+        try:
+            manifests = [name for name in os.listdir(steamapps) if name.startswith("appmanifest_") and name.endswith(".acf")]
+        except OSError:
+            continue
+        for manifest in manifests:
+            appid = manifest[len("appmanifest_"):-len(".acf")]
+            if not appid.isdigit():
+                continue
+            try:
+                with open(os.path.join(steamapps, manifest), "r", encoding="utf-8", errors="replace") as handle:
+                    app_state = _parse_vdf_simple(handle.read()).get("AppState", {})
+            except Exception:
+                app_state = {}
+            installed[int(appid)] = {
+                "appid": int(appid),
+                "name": app_state.get("name", "") if isinstance(app_state, dict) else "",
+                "installDir": app_state.get("installdir", "") if isinstance(app_state, dict) else "",
+                "libraryPath": library_path,
+            }
+    return [installed[appid] for appid in sorted(installed)]
+
+
 def open_game_folder(path: str) -> bool:
     """Open the game folder using the platform default file explorer."""
     try:
@@ -245,6 +306,7 @@ __all__ = [
     "detect_steam_install_path",
     "get_game_install_path_response",
     "has_lua_for_app",
+    "list_installed_apps",
     "open_game_folder",
 ]
 
@@ -190,6 +190,222 @@ except ImportError as e:
     print(f"  ⚠️  Skipped (requires Millennium/PluginUtils): {e}")
 
 
+# ─── 5. appinfo.vdf Parser ──────────────────────────────────────────
+
+print("\n── appinfo_vdf.py ──")
+
+import struct
+import tempfile
+
+import appinfo_vdf
+from appinfo_vdf import iter_appinfo
+
+
+def _kv_app(key, appid, fields):
+    """Binary KeyValues for ``appinfo { appid, common { fields } }``."""
+    out = bytearray(b"\x00" + key("appinfo"))
+    out += b"\x02" + key("appid") + struct.pack("<i", appid)
+    out += b"\x00" + key("common")
+    for kind, name, value in fields:
+        out += bytes([kind]) + key(name) + value
+    out += b"\x08\x08\x08"
+    return bytes(out)
+
+
+def _appinfo_file(magic, apps, strings=None):
+    """appinfo.vdf bytes; v29 (``strings`` given) keys are string table indexes."""
+    header_size = 40 if magic == 0x07564427 else 60
+    if strings is None:
+        key = lambda name: name.encode() + b"\x00"
+    else:
+        key = lambda name: struct.pack("<I", strings.index(name))
+    entries = bytearray()
+    for appid, fields in apps:
+        blob = bytes(header_size) + _kv_app(key, appid, fields)
+        entries += struct.pack("<II", appid, len(blob)) + blob
+    entries += struct.pack("<I", 0)
+    if strings is None:
+        return struct.pack("<II", magic, 1) + bytes(entries)
+    table = struct.pack("<I", len(strings)) + b"".join(name.encode() + b"\x00" for name in strings)
+    return struct.pack("<IIQ", magic, 1, 16 + len(entries)) + bytes(entries) + table
+
+
+def _parse_appinfo(data):
+    with tempfile.NamedTemporaryFile(suffix=".vdf", delete=False) as handle:
+        handle.write(data)
+    try:
+        return [(a.appid, a.name, a.type, a.parent) for a in iter_appinfo(handle.name)]
+    finally:
+        os.remove(handle.name)
+
+
+_APPINFO_APPS = [
+    (440, [(0x01, "name", b"Team Fortress 2\x00"), (0x01, "type", b"Game\x00")]),
+    (441, [(0x01, "name", b"TF2 Soundtrack\x00"), (0x01, "type", b"Music\x00"), (0x02, "parent", struct.pack("<i", 440))]),
+]
+_APPINFO_EXPECTED = [(440, "Team Fortress 2", "Game", 0), (441, "TF2 Soundtrack", "Music", 440)]
+
+
+def test_appinfo_v28():
+    assert _parse_appinfo(_appinfo_file(0x07564428, _APPINFO_APPS)) == _APPINFO_EXPECTED
+
+test("iter_appinfo v28", test_appinfo_v28)
+
+
+def test_appinfo_v29():
+    strings = ["appinfo", "appid", "common", "name", "type", "parent"]
+    assert _parse_appinfo(_appinfo_file(0x07564429, _APPINFO_APPS, strings)) == _APPINFO_EXPECTED
+
+test("iter_appinfo v29 (string table)", test_appinfo_v29)
+
+
+def test_appinfo_unknown_type():
+    apps = [(10, [(0x01, "name", b"Broken\x00"), (0x09, "odd", b"\x00")])] + _APPINFO_APPS
+    warnings = []
+    original = appinfo_vdf.logger.warn
+    appinfo_vdf.logger.warn = warnings.append
+    try:
+        parsed = _parse_appinfo(_appinfo_file(0x07564428, apps))
+    finally:
+        appinfo_vdf.logger.warn = original
+    assert parsed == _APPINFO_EXPECTED, parsed
+    assert len(warnings) == 1 and "10" in warnings[0], warnings
+
+test("iter_appinfo skips unreadable entries", test_appinfo_unknown_type)
+
+
+# ─── 6. Applist JSON Streaming ──────────────────────────────────────
+
+print("\n── applist_index.py ──")
+
+import io
+import json
+
+from applist_index import iter_json_array
+
+_TRICKY_APPS = [
+    {"appid": 1, "name": 'Quote "unquote"'},
+    {"appid": 22, "name": "Brackets ] and [ inside"},
+    {"appid": 333, "name": "Commas, everywhere,"},
+    {"appid": 4444, "name": "Braces { and } too"},
+    {"appid": 55555, "name": "Escaped \\\" ],{ mix"},
+    12345,
+    "plain string",
+    [],
+]
+
+
+def test_iter_json_array_chunks():
+    text = json.dumps(_TRICKY_APPS)
+    for chunk_size in (1, 2, 7):
+        parsed = list(iter_json_array(io.StringIO(text), chunk_size=chunk_size))
+        assert parsed == _TRICKY_APPS, f"chunk_size={chunk_size}: {parsed}"
+    assert list(iter_json_array(io.StringIO(" [ ] "), chunk_size=1)) == []
+
+test("iter_json_array across chunk boundaries", test_iter_json_array_chunks)
+
+
+def test_iter_json_array_errors():
+    text = json.dumps(_TRICKY_APPS)
+    for bad in (text[:-1], text[: len(text) // 2], '{"applist": []}', "", '[1 2]'):
+        for chunk_size in (1, 7):
+            try:
+                list(iter_json_array(io.StringIO(bad), chunk_size=chunk_size))
+            except ValueError:
+                continue
+            raise AssertionError(f"no ValueError for {bad[:30]!r} (chunk_size={chunk_size})")
+
+test("iter_json_array rejects truncated / non-array input", test_iter_json_array_errors)
+
+
+# ─── 7. Games Database Table ────────────────────────────────────────
+
+print("\n── games_db.py ──")
+
+from games_db import GamesTable
+
+_ODD_GAMES = {
+    "7": {"name": "Extras", "playable": 1, "denuvo": False, "of-available": True, "notes": "kept", "tags": [1, 2]},
+    "8": {"name": None, "playable": "2", "denuvo": "maybe", "of-available": 1},
+    "9": {"name": "Big level", "playable": 500, "denuvo": True, "of-available": False},
+    "11": {"name": "Ünïcode ✓ \"quoted\"", "playable": None, "denuvo": False, "of-available": False},
+}
+
+
+def test_games_table_round_trip():
+    with open(os.path.join(os.path.dirname(os.path.abspath(__file__)), "games.json"), encoding="utf-8") as handle:
+        data = json.load(handle)
+    assert json.loads(GamesTable.from_json(data).to_json()) == data
+    table = GamesTable.from_json(_ODD_GAMES)
+    assert json.loads(table.to_json()) == _ODD_GAMES, table.to_json()
+    assert table.get(8) == _ODD_GAMES["8"] and table.get("7") == _ODD_GAMES["7"] and table.get(12) is None
+    minimal = GamesTable.from_json({"10": {"name": "Minimal"}}).get(10)
+    odd_keys = GamesTable.from_json({"²": {"name": "Superscript"}, "x1": {"name": "Bad"}, "12": {"name": "Good"}})
+    assert len(odd_keys) == 1 and odd_keys.get(12)["name"] == "Good"
+    assert minimal == {"name": "Minimal", "playable": None, "denuvo": False, "of-available": False}, minimal
+    print(f"       → {len(data)} games")
+
+test("GamesTable JSON round trip", test_games_table_round_trip)
+
+
+def test_games_table_query():
+    data = {
+        str(appid): {"name": f"Game {appid}", "playable": appid % 3, "denuvo": appid % 2 == 0, "of-available": appid % 5 == 0}
+        for appid in range(1, 61)
+    }
+    table = GamesTable.from_json(data)
+
+    def expected(levels=None, denuvo=None, of_available=None):
+        return [
+            appid for appid in range(1, 61)
+            if (levels is None or data[str(appid)]["playable"] in levels)
+            and (denuvo is None or data[str(appid)]["denuvo"] == denuvo)
+            and (of_available is None or data[str(appid)]["of-available"] == of_available)
+        ]
+
+    for filters in ({}, {"levels": [1]}, {"levels": [0, 2], "denuvo": False}, {"denuvo": True, "of_available": True}):
+        matching = expected(**filters)
+        total, page = table.query(**filters, offset=2, limit=5)
+        assert total == len(matching), (filters, total)
+        assert [appid for appid, _ in page] == matching[2:7], (filters, page)
+        assert all(entry == data[str(appid)] for appid, entry in page)
+    assert table.query(levels=[1], offset=100, limit=5) == (20, [])
+    assert table.query(levels=[9])[0] == 0
+
+test("GamesTable.query filters and paging", test_games_table_query)
+
+
+# ─── 8. API Health Ranking ──────────────────────────────────────────
+
+print("\n── api_health.py ──")
+
+import api_health
+
+
+def test_losing_races_never_improves_rank():
+    saved_health, saved_save = api_health._HEALTH, api_health._save_locked
+    api_health._HEALTH = {}
+    api_health._save_locked = lambda force=False: None
+    try:
+        for name in ("winner", "loser"):
+            for _ in range(20):
+                api_health.record_api_result(name, "success", 0.5)
+        apis = [{"name": "loser"}, {"name": "winner"}]
+        previous = api_health.get_api_health_snapshot()["loser"]["expectedSecondsToSuccess"]
+        for _ in range(5):
+            # A loser is abandoned when the winner answers, so its elapsed time is shorter.
+            api_health.record_api_result("winner", "success", 0.5)
+            api_health.record_api_result("loser", "slow", 0.3)
+            score = api_health.get_api_health_snapshot()["loser"]["expectedSecondsToSuccess"]
+            assert score >= previous, (score, previous)
+            previous = score
+        assert [api["name"] for api in api_health.rank_apis(apis)] == ["winner", "loser"]
+    finally:
+        api_health._HEALTH, api_health._save_locked = saved_health, saved_save
+
+test("losing races never improves an API's rank", test_losing_races_never_improves_rank)
+
+
 # ─── Summary ─────────────────────────────────────────────────────────
 
 print(f"\n{'═' * 40}")
@@ -5,7 +5,7 @@ from __future__ import annotations
 import json
 import os
 import re
-from typing import Any, Dict
+from typing import Any, Dict, List
 
 from paths import backend_path, get_plugin_dir
 
@@ -39,6 +39,19 @@ def write_json(path: str, data: Dict[str, Any]) -> None:
         pass
 
 
+def write_json_atomic(path: str, data: Any) -> bool:
+    """Write ``data`` to a temp file next to ``path`` and rename it into place."""
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as handle:
+            json.dump(data, handle, separators=(",", ":"))
+        os.replace(tmp_path, path)
+        return True
+    except Exception:
+        return False
+
+
 def count_apis(text: str) -> int:
     try:
         data = json.loads(text)
@@ -97,6 +110,32 @@ def ensure_temp_download_dir() -> str:
     return root
 
 
+def parse_flag(value: Any) -> bool:
+    """Truthiness of an RPC flag that may arrive as a bool or a string."""
+    return str(value).strip().lower() in {"true", "1", "yes"}
+
+
+def parse_appid_list(appids: Any) -> List[int]:
+    """Accept a list, a JSON array string or a comma separated string of appids."""
+    if isinstance(appids, str):
+        text = appids.strip()
+        try:
+            appids = json.loads(text) if text.startswith("[") else re.split(r"[\s,]+", text)
+        except Exception:
+            appids = re.split(r"[\s,]+", text)
+    if not isinstance(appids, (list, tuple)):
+        appids = [appids]
+    parsed: List[int] = []
+    for value in appids:
+        try:
+            appid = int(str(value).strip())
+        except Exception:
+            continue
+        if appid > 0 and appid not in parsed:
+            parsed.append(appid)
+    return parsed
+
+
 __all__ = [
     "backend_path",
     "ensure_temp_download_dir",
@@ -104,10 +143,13 @@ __all__ = [
     "get_plugin_dir",
     "get_plugin_version",
     "normalize_manifest_text",
+    "parse_appid_list",
+    "parse_flag",
     "parse_version",
     "read_json",
     "read_text",
     "write_json",
+    "write_json_atomic",
     "write_text",
 ]
 
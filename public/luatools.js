@@ -4235,16 +4235,16 @@
 
         // Executa as duas verificações em paralelo
         Promise.all([
-            Millennium.callServerMethod('luatools', 'GetGamesDatabase', { contentScriptQuery: '' }),
+            Millennium.callServerMethod('luatools', 'GetGameStatus', { appid: appid, contentScriptQuery: '' }),
                     Millennium.callServerMethod('luatools', 'CheckForFixes', { appid: appid, contentScriptQuery: '' })
         ]).then(function(results) {
             try {
                 // Bloqueio secundário
                 if (container.querySelector('.luatools-status-pill')) return;
 
-                // Resultado 0: Banco de Dados Estático
+                // Resultado 0: Status do jogo no Banco de Dados
                 const dbRes = typeof results[0] === 'string' ? JSON.parse(results[0]) : results[0];
-                const gameData = (dbRes && dbRes[String(appid)]) ? dbRes[String(appid)] : null;
+                const gameData = (dbRes && dbRes.success && dbRes.status) ? dbRes.status : null;
 
                 // Resultado 1: Verificação em Tempo Real
                 const fixRes = typeof results[1] === 'string' ? JSON.parse(results[1]) : results[1];